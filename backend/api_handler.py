@@ -1,19 +1,23 @@
 """
     Handles request against the api endpoint.
 """
-import json
 from flask import Request
 from firebase_admin import auth, exceptions
-from auth_utils import UserInfo
+from auth_utils import UserInfo, invalidate_user_name
 from enums import Role
 from request_helper import get_body
+from db_operator import DatabaseOperator
 from logger_utils import Logger
+from request_context import AUTH, track_rpc
+from serialization import dumps
+from ticket_stats import count_tickets, parse_stats_request
+from versioning import USER_VERSION, etag_matches, get_cache_headers, get_etag
 
 logger = Logger(component="api_handler")
 MISSING_PERMISSIONS = "User does not have required rights to perform request!"
 
 
-def api_handler(  # pylint: disable=too-many-return-statements, too-many-branches, too-many-statements
+def api_handler(  # pylint: disable=too-many-return-statements, too-many-branches, too-many-statements, too-many-locals
     request: Request, path_segments: list[str], headers: dict, user_info: UserInfo
 ) -> tuple:
     """Handles all non-data related requests.
@@ -68,14 +72,17 @@ def api_handler(  # pylint: disable=too-many-return-statements, too-many-branche
                     }
 
             try:
-                auth.set_custom_user_claims(body["target_user_id"], claims)
+                with track_rpc(AUTH):
+                    auth.set_custom_user_claims(body["target_user_id"], claims)
             except ValueError as error:
                 logger.error(f"Error while setting custom claims: {error}")
                 return ("User ID or custom claim invalid!", 400, headers)
             except exceptions.FirebaseError as error:
                 logger.error(f"Error while setting custom claims: {error}")
                 return (error.code, 500, headers)
-            return (json.dumps({"id": body["target_user_id"]}), 200, headers)
+            invalidate_user_name(body["target_user_id"])
+            DatabaseOperator(user_info).increment_versions(USER_VERSION)
+            return (dumps({"id": body["target_user_id"]}), 200, headers)
         case "PUT" if path_segments[1] == "updateUser":
             headers["Access-Control-Allow-Methods"] = "PUT"
             body = get_body(request)
@@ -98,18 +105,21 @@ def api_handler(  # pylint: disable=too-many-return-statements, too-many-branche
                 logger.error(MISSING_PERMISSIONS)
                 return (MISSING_PERMISSIONS, 403, headers)
             try:
-                auth.update_user(
-                    body["target_user_id"],
-                    display_name=body["display_name"],
-                    email=body["email"],
-                )
+                with track_rpc(AUTH):
+                    auth.update_user(
+                        body["target_user_id"],
+                        display_name=body["display_name"],
+                        email=body["email"],
+                    )
             except ValueError as error:
                 logger.error(f"Error while setting display name: {error}")
                 return ("User ID invalid!", 400, headers)
             except exceptions.FirebaseError as error:
                 logger.error(f"Error while setting display name: {error}")
                 return (error.code, 500, headers)
-            return (json.dumps({"id": body["target_user_id"]}), 200, headers)
+            invalidate_user_name(body["target_user_id"])
+            DatabaseOperator(user_info).increment_versions(USER_VERSION)
+            return (dumps({"id": body["target_user_id"]}), 200, headers)
         case "GET" if path_segments[1] == "user":
             headers["Access-Control-Allow-Methods"] = "GET"
             if len(path_segments) != 3 and not any(
@@ -120,8 +130,8 @@ def api_handler(  # pylint: disable=too-many-return-statements, too-many-branche
 
             try:
                 if len(path_segments) != 3:
-                    exported_user_records = auth.list_users()
-                    exported_user_records = exported_user_records.users
+                    with track_rpc(AUTH):
+                        exported_user_records = auth.list_users().users
                 # For loading only one user
                 else:
                     if (
@@ -130,7 +140,8 @@ def api_handler(  # pylint: disable=too-many-return-statements, too-many-branche
                     ):
                         logger.error(MISSING_PERMISSIONS)
                         return (MISSING_PERMISSIONS, 403, headers)
-                    exported_user_records = [auth.get_user(path_segments[2])]
+                    with track_rpc(AUTH):
+                        exported_user_records = [auth.get_user(path_segments[2])]
 
                 users = []
                 for record in exported_user_records:
@@ -148,9 +159,9 @@ def api_handler(  # pylint: disable=too-many-return-statements, too-many-branche
                     }
                     users.append(parsed_user)
                 return (
-                    (users, 200, headers)
+                    (dumps(users), 200, headers)
                     if len(path_segments) != 3
-                    else (users[0], 200, headers)
+                    else (dumps(users[0]), 200, headers)
                 )
             except ValueError as error:
                 logger.error(f"Error while loading users: {error}")
@@ -162,5 +173,24 @@ def api_handler(  # pylint: disable=too-many-return-statements, too-many-branche
             except exceptions.FirebaseError as error:
                 logger.error(f"Error while retrieving the user accounts: {error}")
                 return (error.code, 500, headers)
+        case "GET" if path_segments[1:] == ["stats", "tickets"]:
+            headers["Access-Control-Allow-Methods"] = "GET"
+            stats_request, error_message = parse_stats_request(request.args)
+            if error_message:
+                logger.error(error_message)
+                return (error_message, 400, headers)
+
+            database_operator = DatabaseOperator(user_info)
+            # The counts depend on the tickets, the courses and the assignees.
+            etag = get_etag(request, "ticket", database_operator)
+            if etag and etag_matches(request.headers.get("If-None-Match"), etag):
+                return ("", 304, {**headers, **get_cache_headers(etag)})
+            response_code, response_message = count_tickets(
+                database_operator, stats_request
+            )
+            if response_code != 200:
+                return (response_message, response_code, headers)
+            headers.update(get_cache_headers(etag))
+            return (dumps(response_message), response_code, headers)
 
     return ("Invalid Request", 400, headers)
@@ -1,12 +1,34 @@
 """Utilities related to authentication and authorization."""
+from collections.abc import Iterable
 from dataclasses import dataclass
+from hashlib import sha256
 from os import getenv
+from time import time
 from flask import Request
 from firebase_admin import auth, exceptions
+from firebase_admin._token_gen import ID_TOKEN_CERT_URI
+from google.auth.exceptions import TransportError
 from enums import Role
+from cache_utils import TTLCache
+from enrichment import enrichment_executor
 from logger_utils import Logger
+from request_context import AUTH, track_rpc
 
 logger = Logger(component="auth_utils")
+MAX_USERS_PER_LOOKUP = 100
+UNKNOWN_USER_NAME = "Unknown"
+
+user_name_cache = TTLCache(
+    max_size=int(getenv("USER_NAME_CACHE_SIZE", "1000")),
+    ttl_seconds=float(getenv("USER_NAME_CACHE_TTL", "300")),
+)
+UNKNOWN_USER_NAME_TTL = float(getenv("USER_NAME_CACHE_UNKNOWN_TTL", "60"))
+
+# Verified tokens are cached until they expire, but at most for the configured time.
+token_cache = TTLCache(
+    max_size=int(getenv("TOKEN_CACHE_SIZE", "1000")),
+    ttl_seconds=float(getenv("TOKEN_CACHE_MAX_TTL", "300")),
+)
 
 
 @dataclass
@@ -36,10 +58,22 @@ def is_authenticated(request: Request) -> tuple[UserInfo | None, int, str]:
         return None, 401, error_message
     id_token = bearer.split()[1]
 
+    token_hash = sha256(id_token.encode("utf-8")).hexdigest()
+    cached_user_info = token_cache.get(token_hash)
+    if cached_user_info is not None:
+        logger.debug("Token cache statistics: %s", args=(token_cache.stats(),))
+        logger.info(
+            "Successfully Authenticated user with ID: %s",
+            args=(cached_user_info.user_id,),
+            sampled=True,
+        )
+        return cached_user_info, None, None
+
     user_id = ""
     try:
-        decoded_token = auth.verify_id_token(id_token)
-        logger.debug(f"Decoded JWT Token: {decoded_token}")
+        with track_rpc(AUTH):
+            decoded_token = auth.verify_id_token(id_token)
+        logger.debug("Decoded JWT Token: %s", args=(decoded_token,))
         user_id = decoded_token["user_id"]
         roles = []
         if decoded_token.get("admin", False) is True:
@@ -52,22 +86,114 @@ def is_authenticated(request: Request) -> tuple[UserInfo | None, int, str]:
         logger.error(f"Not able to authenticate user: {str(error)}")
         return None, 403, f"Invalid Token: {str(error)}"
 
-    logger.info(f"Successfully Authenticated user with ID: {user_id}")
-    return UserInfo(user_id, roles), None, None
+    user_info = UserInfo(user_id, roles)
+    expires_in = decoded_token.get("exp", 0) - time()
+    if expires_in > 0:
+        token_cache.set(token_hash, user_info, min(expires_in, token_cache.ttl_seconds))
+    logger.debug("Token cache statistics: %s", args=(token_cache.stats(),))
+    logger.info(
+        "Successfully Authenticated user with ID: %s", args=(user_id,), sampled=True
+    )
+    return user_info, None, None
 
 
-def get_user_name_by_id(user_id: str) -> str:
-    """Gets the user name of the given user ID.
+def get_user_names_by_ids(user_ids: Iterable[str]) -> dict[str, str]:
+    """Gets the user names of the given user IDs with as few requests as possible.
 
     Args:
-        user_id - The identifier of the user.
+        user_ids - The identifiers of the users, duplicates and empty values are ignored.
     Returns:
-        The display name (user name) of the given user.
+        A mapping of the user IDs to their display names (user names).
+    """
+    user_names = {}
+    missing_user_ids = []
+    for user_id in dict.fromkeys(user_id for user_id in user_ids if user_id):
+        cached_user_name = user_name_cache.get(user_id)
+        if cached_user_name is None:
+            missing_user_ids.append(user_id)
+        else:
+            user_names[user_id] = cached_user_name
+
+    chunks = [
+        missing_user_ids[start : start + MAX_USERS_PER_LOOKUP]
+        for start in range(0, len(missing_user_ids), MAX_USERS_PER_LOOKUP)
+    ]
+    # The chunks are independent, so they are looked up concurrently.
+    for chunk, loaded_user_names in zip(
+        chunks, enrichment_executor.map(load_user_names, chunks)
+    ):
+        if loaded_user_names is None:
+            user_names.update({user_id: UNKNOWN_USER_NAME for user_id in chunk})
+        else:
+            user_names.update(loaded_user_names)
+
+    logger.debug("User name cache statistics: %s", args=(user_name_cache.stats(),))
+    return user_names
+
+
+def load_user_names(user_ids: list[str]) -> dict[str, str] | None:
+    """Loads the user names of at most MAX_USERS_PER_LOOKUP users with one request.
+
+    Args:
+        user_ids - The identifiers of the users, which are not cached.
+    Returns:
+        A mapping of the user IDs to their user names, None if the request failed.
     """
     try:
-        user = auth.get_user(user_id)
-    except (ValueError, exceptions.FirebaseError, auth.UserNotFoundError) as error:
-        logger.error(f"Not able to get user name: {str(error)}")
-        return "Unknown"
+        with track_rpc(AUTH):
+            result = auth.get_users(
+                [auth.UidIdentifier(user_id) for user_id in user_ids]
+            )
+    except (ValueError, exceptions.FirebaseError) as error:
+        logger.error(f"Not able to get user names: {str(error)}")
+        return None
+    user_names = {
+        user.uid: cache_user_name(user.uid, user.display_name) for user in result.users
+    }
+    for user_id in user_ids:
+        if user_id not in user_names:
+            user_names[user_id] = cache_user_name(user_id, None)
+    return user_names
+
+
+def cache_user_name(user_id: str, display_name: str | None) -> str:
+    """Stores the user name of the given user ID in the user name cache.
+    Users without a display name are cached for a shorter time.
 
-    return user.display_name or "Unknown"
+    Args:
+        user_id - The identifier of the user.
+        display_name - The display name of the user, if any.
+    Returns:
+        The cached user name.
+    """
+    if display_name:
+        user_name_cache.set(user_id, display_name)
+        return display_name
+    user_name_cache.set(user_id, UNKNOWN_USER_NAME, UNKNOWN_USER_NAME_TTL)
+    return UNKNOWN_USER_NAME
+
+
+def invalidate_user_name(user_id: str) -> None:
+    """Removes the cached user name of the given user ID.
+
+    Args:
+        user_id - The identifier of the user.
+    """
+    user_name_cache.invalidate(user_id)
+
+
+def prefetch_certificates() -> None:
+    """Loads the public keys of the ID tokens into the HTTP cache of firebase,
+    so that the first authenticated request does not need to wait for them.
+    """
+    if getenv("DISABLE_AUTH", "false").lower() in ("1", "true"):
+        return
+    try:
+        # The token verifier caches the certificates according to their Cache-Control.
+        auth_client = auth._get_client(None)  # pylint: disable=protected-access
+        token_verifier = auth_client._token_verifier  # pylint: disable=protected-access
+        token_verifier.request(ID_TOKEN_CERT_URI)
+    except (ValueError, AttributeError, exceptions.FirebaseError, TransportError) as error:
+        logger.warn(f"Not able to prefetch the token certificates: {error}")
+        return
+    logger.debug("Prefetched the token certificates.")
@@ -0,0 +1,355 @@
+"""
+    End-to-end benchmarks of all routes of the request handler.
+    The requests run against in-memory fakes of Firestore and firebase auth filled
+    with a synthetic dataset, whose size is configured via environment variables.
+    Run `pytest benchmark/bench_request_handler.py` in the backend folder.
+"""
+from collections.abc import Callable
+from itertools import count
+from os import getenv
+import tracemalloc
+from unittest import mock
+import flask
+import pytest
+from auth_utils import user_name_cache
+from enrichment import ENRICHMENT_WORKERS, enrichment_executor
+import main
+from unique_keys import UNIQUE_KEY_COLLECTION, get_unique_key
+
+BENCHMARK_ROUNDS = int(getenv("BENCHMARK_ROUNDS", "20"))
+BENCHMARK_CONCURRENCY_LATENCY_MS = float(
+    getenv("BENCHMARK_CONCURRENCY_LATENCY_MS", "20")
+)
+BENCHMARK_BULK_ITEMS = int(getenv("BENCHMARK_BULK_ITEMS", "100"))
+
+app = flask.Flask(__name__)
+
+
+def send_request(
+    path: str, method: str = "GET", role: str = "admin", **kwargs
+) -> tuple:
+    """Sends a request through the request handler.
+    Args:
+        path -- The path of the request.
+        method -- The HTTP method of the request.
+        role -- The role of the authenticated user.
+        kwargs -- Further arguments of the test request, like json or headers.
+    Returns:
+        The response with a completely consumed body.
+    """
+    headers = {"Authorization": f"Bearer token-{role}", **kwargs.pop("headers", {})}
+    with app.test_request_context(path, method=method, headers=headers, **kwargs):
+        body, status_code, response_headers = main.request_handler(flask.request)
+        if not isinstance(body, (str, bytes, dict, list)):
+            body = b"".join(body)
+        return body, status_code, response_headers
+
+
+def run_benchmark(
+    benchmark, dataset, create_request: Callable[[], dict], expected_status: int
+) -> None:
+    """Benchmarks a route and reports the RPCs and peak memory of a cold request.
+    Args:
+        benchmark -- The fixture of pytest-benchmark.
+        dataset -- The fake backends with the synthetic dataset.
+        create_request -- Creates the arguments of send_request for every round.
+        expected_status -- The expected status code of the responses.
+    """
+    tracemalloc.start()
+    response = send_request(**create_request())
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert response[1] == expected_status, response[0]
+
+    benchmark.extra_info["firestore_rpcs"] = dict(dataset.firestore_client.rpc_counts)
+    benchmark.extra_info["documents_read"] = dataset.firestore_client.documents_read
+    benchmark.extra_info["auth_rpcs"] = dict(dataset.auth.rpc_counts)
+    benchmark.extra_info["peak_memory_kb"] = round(peak_memory / 1024, 1)
+
+    response = benchmark.pedantic(
+        send_request,
+        setup=lambda: ((), create_request()),
+        rounds=BENCHMARK_ROUNDS,
+        iterations=1,
+    )
+    assert response[1] == expected_status, response[0]
+
+
+@pytest.mark.parametrize(
+    ("path", "role"),
+    [
+        ("/data/course", "admin"),
+        ("/data/ticket", "editor"),
+        ("/data/ticket", "requester"),
+        ("/data/ticket?limit=50", "editor"),
+        ("/data/ticket?limit=50&order_by=-modified_at", "editor"),
+        ("/data/ticket?fields=title,status", "editor"),
+        ("/data/ticket/ticket_0", "editor"),
+        ("/data/ticket?q=missing%20formula&limit=50", "editor"),
+        ("/data/ticket?q=broken%20video%20link", "requester"),
+        ("/data/comment?ticket_id=ticket_0", "editor"),
+        ("/data/ticket_history?ticket_id=ticket_0", "editor"),
+        ("/api/user", "admin"),
+        ("/api/user/user_0", "admin"),
+        ("/api/stats/tickets", "editor"),
+        ("/api/stats/tickets?group_by=type&status=OPEN", "editor"),
+        ("/api/stats/tickets?group_by=priority", "requester"),
+    ],
+)
+def test_get(benchmark, dataset, path: str, role: str) -> None:
+    """Benchmarks the reading routes."""
+    run_benchmark(
+        benchmark,
+        dataset,
+        lambda: {"path": path, "role": role, "headers": {"Accept-Encoding": "gzip"}},
+        200,
+    )
+
+
+@pytest.mark.parametrize("workers", [1, ENRICHMENT_WORKERS])
+def test_get_enrichment(benchmark, dataset, workers: int) -> None:
+    """Benchmarks the user name lookups of a ticket list without cached names,
+    sequentially with one worker and concurrently with the configured workers."""
+    dataset.auth.latency_seconds = BENCHMARK_CONCURRENCY_LATENCY_MS / 1000
+
+    def create_request() -> dict:
+        user_name_cache.clear()
+        return {"path": "/data/ticket?limit=1000", "role": "editor"}
+
+    with mock.patch.object(enrichment_executor, "max_workers", workers):
+        run_benchmark(benchmark, dataset, create_request, 200)
+
+
+def test_get_not_modified(benchmark, dataset) -> None:
+    """Benchmarks a conditional request of an unchanged ticket list."""
+    etag = send_request("/data/ticket?limit=50", role="editor")[2]["ETag"]
+    run_benchmark(
+        benchmark,
+        dataset,
+        lambda: {
+            "path": "/data/ticket?limit=50",
+            "role": "editor",
+            "headers": {"If-None-Match": etag},
+        },
+        304,
+    )
+
+
+def test_create_course(benchmark, dataset) -> None:
+    """Benchmarks the creation of courses with a unique abbreviation."""
+    numbers = count()
+    run_benchmark(
+        benchmark,
+        dataset,
+        lambda: {
+            "path": "/data/course",
+            "method": "POST",
+            "json": {"course_abbreviation": f"NEW{next(numbers)}", "name": "New"},
+        },
+        201,
+    )
+
+
+def create_ticket_body(dataset, title: str, status: str = "OPEN") -> dict:
+    """Creates the body of a ticket request.
+    Args:
+        dataset -- The fake backends with the synthetic dataset.
+        title -- The title of the ticket, equal tickets are rejected as duplicates.
+        status -- The status of the ticket.
+    Returns:
+        The ticket with all required fields.
+    """
+    return {
+        "title": title,
+        "description": "The formula on page 12 is missing a factor.",
+        "course_id": dataset.course_id,
+        "status": status,
+        "priority": "HIGH",
+        "type": "ERROR",
+        "assignee_id": "user_0",
+    }
+
+
+def test_create_ticket(benchmark, dataset) -> None:
+    """Benchmarks the creation of tickets by a requester."""
+    numbers = count()
+    run_benchmark(
+        benchmark,
+        dataset,
+        lambda: {
+            "path": "/data/ticket",
+            "method": "POST",
+            "role": "requester",
+            "json": create_ticket_body(dataset, f"New ticket {next(numbers)}"),
+        },
+        201,
+    )
+
+
+def test_create_courses_bulk(benchmark, dataset) -> None:
+    """Benchmarks the creation of many courses with one bulk request."""
+    numbers = count()
+    run_benchmark(
+        benchmark,
+        dataset,
+        lambda: {
+            "path": "/data/course/_bulk",
+            "method": "POST",
+            "json": [
+                {"course_abbreviation": f"BULK{next(numbers)}", "name": "Bulk"}
+                for _ in range(BENCHMARK_BULK_ITEMS)
+            ],
+        },
+        200,
+    )
+
+
+def test_create_tickets_bulk(benchmark, dataset) -> None:
+    """Benchmarks the creation of many tickets with one bulk request."""
+    numbers = count()
+    run_benchmark(
+        benchmark,
+        dataset,
+        lambda: {
+            "path": "/data/ticket/_bulk",
+            "method": "POST",
+            "role": "requester",
+            "json": [
+                create_ticket_body(dataset, f"Bulk ticket {next(numbers)}")
+                for _ in range(BENCHMARK_BULK_ITEMS)
+            ],
+        },
+        200,
+    )
+
+
+def test_update_ticket(benchmark, dataset) -> None:
+    """Benchmarks updates of a ticket, which also write its history."""
+    numbers = count()
+    run_benchmark(
+        benchmark,
+        dataset,
+        lambda: {
+            "path": f"/data/ticket/{dataset.ticket_id}",
+            "method": "PUT",
+            "role": "editor",
+            "json": create_ticket_body(
+                dataset,
+                "Updated ticket",
+                "IN PROGRESS" if next(numbers) % 2 else "OPEN",
+            ),
+        },
+        200,
+    )
+
+
+@pytest.mark.parametrize("target", ["ids", "filter"])
+def test_update_tickets_bulk(benchmark, dataset, target: str) -> None:
+    """Benchmarks the triage of many tickets with one bulk request, which writes
+    the changed tickets and their history in batches."""
+    numbers = count()
+    targets = {
+        "ids": [f"ticket_{index}" for index in range(BENCHMARK_BULK_ITEMS)],
+        # The tickets created by other benchmarks belong to dataset.course_id.
+        "filter": {"course_id": "course_1"},
+    }
+    run_benchmark(
+        benchmark,
+        dataset,
+        lambda: {
+            "path": "/data/ticket/_bulk",
+            "method": "PATCH",
+            "role": "editor",
+            "json": {
+                target: targets[target],
+                "update": {"priority": "HIGH" if next(numbers) % 2 else "LOW"},
+            },
+        },
+        200,
+    )
+
+
+@pytest.mark.parametrize("workers", [1, ENRICHMENT_WORKERS])
+def test_update_ticket_concurrency(benchmark, dataset, workers: int) -> None:
+    """Benchmarks the duplicate check and the read of a ticket update,
+    sequentially with one worker and concurrently with the configured workers."""
+    dataset.firestore_client.latency_seconds = BENCHMARK_CONCURRENCY_LATENCY_MS / 1000
+    numbers = count()
+    with mock.patch.object(enrichment_executor, "max_workers", workers):
+        run_benchmark(
+            benchmark,
+            dataset,
+            lambda: {
+                "path": f"/data/ticket/{dataset.ticket_id}",
+                "method": "PUT",
+                "role": "editor",
+                "json": create_ticket_body(
+                    dataset, f"Concurrently updated ticket {next(numbers)}"
+                ),
+            },
+            200,
+        )
+
+
+def test_update_course(benchmark, dataset) -> None:
+    """Benchmarks updates of the unique abbreviation of a course."""
+    numbers = count()
+    run_benchmark(
+        benchmark,
+        dataset,
+        lambda: {
+            "path": f"/data/course/{dataset.course_id}",
+            "method": "PUT",
+            "json": {
+                "course_abbreviation": f"UPDATED{next(numbers)}",
+                "name": "Updated",
+            },
+        },
+        200,
+    )
+
+
+def test_delete_course(benchmark, dataset) -> None:
+    """Benchmarks the deletion of courses including their unique keys."""
+    numbers = count()
+
+    def create_request() -> dict:
+        course_id = f"deleted_course_{next(numbers)}"
+        course = {"course_abbreviation": course_id, "name": "Deleted"}
+        dataset.firestore_client.add_documents("course", {course_id: course})
+        dataset.firestore_client.add_documents(
+            UNIQUE_KEY_COLLECTION,
+            {
+                get_unique_key("course", ["course_abbreviation"], course): {
+                    "collection": "course",
+                    "document_id": course_id,
+                }
+            },
+        )
+        return {"path": f"/data/course/{course_id}", "method": "DELETE"}
+
+    run_benchmark(benchmark, dataset, create_request, 204)
+
+
+@pytest.mark.parametrize(
+    ("path", "body"),
+    [
+        ("/api/setRole", {"target_user_id": "user_0", "role": "editor"}),
+        (
+            "/api/updateUser",
+            {
+                "target_user_id": "user_0",
+                "display_name": "User 0",
+                "email": "user_0@example.com",
+            },
+        ),
+    ],
+)
+def test_update_user(benchmark, dataset, path: str, body: dict) -> None:
+    """Benchmarks the user administration."""
+    run_benchmark(
+        benchmark,
+        dataset,
+        lambda: {"path": path, "method": "PUT", "json": body},
+        200,
+    )
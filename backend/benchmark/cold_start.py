@@ -0,0 +1,79 @@
+"""
+    Measures the cold start of the request handler in fresh interpreters.
+    Run `python -m benchmark.cold_start` in the backend folder.
+"""
+import json
+import os
+from statistics import median
+import subprocess
+import sys
+from time import perf_counter
+
+RUNS = int(os.getenv("COLD_START_RUNS", "5"))
+METRICS = ["import_ms", "preflight_ms", "first_request_ms"]
+
+
+def measure_cold_start() -> dict[str, float]:
+    """Imports the handler and sends a preflight and a first request.
+    Needs to run in a fresh interpreter, as the modules are only loaded once.
+    Returns:
+        The duration of the import and the requests in milliseconds.
+    """
+    start = perf_counter()
+    # pylint: disable=import-outside-toplevel
+    from main import request_handler
+    import flask
+
+    imported = perf_counter()
+    app = flask.Flask(__name__)
+    with app.test_request_context("/data/course", method="OPTIONS"):
+        request_handler(flask.request)
+    preflight = perf_counter()
+    # Loads all handlers without calling Firestore.
+    with app.test_request_context("/data/unknown", method="GET"):
+        request_handler(flask.request)
+    first_request = perf_counter()
+    return {
+        "import_ms": (imported - start) * 1000,
+        "preflight_ms": (preflight - imported) * 1000,
+        "first_request_ms": (first_request - preflight) * 1000,
+    }
+
+
+def run_cold_start() -> dict[str, float]:
+    """Runs measure_cold_start in a new interpreter.
+    Returns:
+        The measured durations in milliseconds.
+    """
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmark.cold_start", "--child"],
+        capture_output=True,
+        check=True,
+        env={
+            **os.environ,
+            "DISABLE_AUTH": "true",
+            "PREFETCH_CERTIFICATES": "false",
+            "LOG_LEVEL": "ERROR",
+        },
+        text=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    """Prints the median, min and max of each duration over all runs."""
+    results = [run_cold_start() for _ in range(RUNS)]
+    print(f"Cold start over {RUNS} runs:")
+    for metric in METRICS:
+        values = [result[metric] for result in results]
+        print(
+            f"{metric:>16}: {median(values):8.2f} ms "
+            + f"(min {min(values):.2f} ms, max {max(values):.2f} ms)"
+        )
+
+
+if __name__ == "__main__":
+    if "--child" in sys.argv:
+        print(json.dumps(measure_cold_start()))
+    else:
+        main()
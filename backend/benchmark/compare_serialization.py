@@ -0,0 +1,71 @@
+"""
+    Compares the JSON backends of the serialization module on a large ticket list.
+    Run `python -m benchmark.compare_serialization` in the backend folder.
+"""
+from timeit import repeat
+from serialization import dumps_orjson, dumps_stdlib, orjson
+
+TICKET_COUNT = 10000
+REPETITIONS = 5
+
+
+def create_tickets(count: int) -> list[dict]:
+    """Creates resolved tickets like they are returned by a list request.
+    Args:
+        count -- The number of tickets to create.
+    Returns:
+        The list of tickets.
+    """
+    return [
+        {
+            "id": f"ticket_{index}",
+            "title": f"Mistake in script chapter {index % 20}",
+            "description": "The formula on page 12 is missing a factor. " * 4,
+            "course_id": f"course_{index % 50}",
+            "course_name": f"Course {index % 50}",
+            "course_abbreviation": f"C{index % 50}",
+            "status": "OPEN",
+            "priority": "MEDIUM",
+            "type": "SCRIPT",
+            "assignee_id": f"user_{index % 30}",
+            "assignee_name": f"User {index % 30}",
+            "created_at": "2023-11-01T12:30:15.123456Z",
+            "created_by": f"user_{index % 200}",
+            "created_by_name": f"User {index % 200}",
+            "modified_at": "2023-11-02T08:00:00.000000Z",
+            "modified_by": f"user_{index % 30}",
+            "modified_by_name": f"User {index % 30}",
+        }
+        for index in range(count)
+    ]
+
+
+def measure(dumps, tickets: list[dict]) -> float:
+    """Measures the fastest serialization of the tickets.
+    Args:
+        dumps -- The serialization method to measure.
+        tickets -- The tickets to serialize.
+    Returns:
+        The fastest run in milliseconds.
+    """
+    return min(repeat(lambda: dumps(tickets), number=1, repeat=REPETITIONS)) * 1000
+
+
+def main() -> None:
+    """Prints the duration and payload size of both backends."""
+    tickets = create_tickets(TICKET_COUNT)
+    backends = {"stdlib": dumps_stdlib}
+    if orjson:
+        backends["orjson"] = dumps_orjson
+    else:
+        print("orjson is not installed, only the standard library is measured.")
+
+    for name, dumps in backends.items():
+        print(
+            f"{name:>6}: {measure(dumps, tickets):8.2f} ms "
+            + f"for {TICKET_COUNT} tickets ({len(dumps(tickets)) / 1024:.0f} KiB)"
+        )
+
+
+if __name__ == "__main__":
+    main()
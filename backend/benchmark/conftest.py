@@ -0,0 +1,173 @@
+"""
+    Fixtures of the end-to-end benchmarks, which run against in-memory fakes.
+"""
+from dataclasses import dataclass
+from os import getenv
+import random
+from unittest import mock
+import pytest
+from backend.test.fakes import (
+    FakeAuth,
+    FakeFirestoreClient,
+    FakeUserRecord,
+    clear_instance_caches,
+)
+from data_model import Ticket
+from search_index import backfill_search_index
+from unique_keys import UNIQUE_KEY_COLLECTION, get_unique_key
+
+BENCHMARK_TICKETS = int(getenv("BENCHMARK_TICKETS", "10000"))
+BENCHMARK_COURSES = int(getenv("BENCHMARK_COURSES", "100"))
+BENCHMARK_USERS = int(getenv("BENCHMARK_USERS", "200"))
+BENCHMARK_COMMENTS = int(getenv("BENCHMARK_COMMENTS", "50"))
+BENCHMARK_LATENCY_MS = float(getenv("BENCHMARK_LATENCY_MS", "0"))
+
+STATUSES = ["OPEN", "IN PROGRESS", "FEEDBACK", "IN REVIEW", "DONE", "REJECTED"]
+PRIORITIES = ["HIGH", "MEDIUM", "LOW", "UNDEFINED"]
+TYPES = ["ERROR", "IMPROVEMENT", "ADDITION", "UNDEFINED"]
+DESCRIPTIONS = [
+    "The formula on page 12 is missing a factor.",
+    "The link to the video of the lecture is broken.",
+    "There is a typo in the summary of the chapter.",
+    "The solution of the third exercise is wrong.",
+]
+ROLE_USERS = {"admin": "admin", "editor": "editor", "requester": "requester"}
+
+
+@dataclass
+class BenchmarkDataset:
+    """The fake backends with a synthetic dataset."""
+
+    firestore_client: FakeFirestoreClient
+    auth: FakeAuth
+    course_id: str
+    ticket_id: str
+
+    def reset_rpc_counts(self) -> None:
+        """Resets the counted calls of both fakes."""
+        self.firestore_client.reset_rpc_counts()
+        self.auth.reset_rpc_counts()
+
+
+def get_metadata(user_id: str, index: int) -> dict:
+    """Creates the metadata of a synthetic document.
+    Args:
+        user_id -- The creator of the document.
+        index -- The position of the document, used for distinct timestamps.
+    Returns:
+        The metadata fields.
+    """
+    timestamp = f"2023-{index % 12 + 1:02d}-{index % 28 + 1:02d}T12:00:00.000000Z"
+    return {
+        "created_at": timestamp,
+        "created_by": user_id,
+        "modified_at": timestamp,
+        "modified_by": user_id,
+    }
+
+
+def create_dataset() -> BenchmarkDataset:
+    """Creates the fakes and fills them with the configured number of documents.
+    Returns:
+        The dataset, the users of ROLE_USERS authenticate with "token-<role>".
+    """
+    randomizer = random.Random(42)
+    firestore_client = FakeFirestoreClient(BENCHMARK_LATENCY_MS / 1000)
+    fake_auth = FakeAuth(BENCHMARK_LATENCY_MS / 1000)
+
+    for role, user_id in ROLE_USERS.items():
+        fake_auth.add_user(
+            FakeUserRecord(
+                user_id,
+                f"{user_id}@example.com",
+                role.title(),
+                custom_claims={role: True},
+            ),
+            f"token-{role}",
+        )
+    user_ids = [*ROLE_USERS.values()]
+    for index in range(BENCHMARK_USERS):
+        user_id = f"user_{index}"
+        fake_auth.add_user(
+            FakeUserRecord(user_id, f"{user_id}@example.com", f"User {index}")
+        )
+        user_ids.append(user_id)
+
+    courses = {
+        f"course_{index}": {
+            "course_abbreviation": f"C{index}",
+            "name": f"Course {index}",
+            **get_metadata("admin", index),
+        }
+        for index in range(BENCHMARK_COURSES)
+    }
+    firestore_client.add_documents("course", courses)
+    firestore_client.add_documents(
+        UNIQUE_KEY_COLLECTION,
+        {
+            get_unique_key("course", ["course_abbreviation"], course): {
+                "collection": "course",
+                "document_id": course_id,
+            }
+            for course_id, course in courses.items()
+        },
+    )
+
+    firestore_client.add_documents(
+        "ticket",
+        {
+            f"ticket_{index}": {
+                "title": f"Mistake in chapter {index % 20}",
+                "description": " ".join([randomizer.choice(DESCRIPTIONS)] * 4),
+                "course_id": randomizer.choice(list(courses)),
+                "status": randomizer.choice(STATUSES),
+                "priority": randomizer.choice(PRIORITIES),
+                "type": randomizer.choice(TYPES),
+                "assignee_id": randomizer.choice(user_ids),
+                **get_metadata(randomizer.choice(user_ids), index),
+            }
+            for index in range(BENCHMARK_TICKETS)
+        },
+    )
+    backfill_search_index(firestore_client, "ticket", Ticket.search_fields)
+    firestore_client.add_documents(
+        "comment",
+        {
+            f"comment_{index}": {
+                "content": f"Comment {index}",
+                "ticket_id": "ticket_0",
+                **get_metadata(randomizer.choice(user_ids), index),
+            }
+            for index in range(BENCHMARK_COMMENTS)
+        },
+    )
+    firestore_client.add_documents(
+        "ticket_history",
+        {
+            f"ticket_history_{index}": {
+                "ticket_id": "ticket_0",
+                "changed_values": {"status": randomizer.choice(STATUSES)},
+                "previous_values": {"status": randomizer.choice(STATUSES)},
+                **get_metadata(randomizer.choice(user_ids), index),
+            }
+            for index in range(BENCHMARK_COMMENTS)
+        },
+    )
+    return BenchmarkDataset(firestore_client, fake_auth, "course_0", "ticket_0")
+
+
+@pytest.fixture(scope="session", name="_dataset")
+def fixture_dataset() -> BenchmarkDataset:
+    """Creates the synthetic dataset once, as it can get large."""
+    return create_dataset()
+
+
+@pytest.fixture(name="dataset")
+def fixture_backend(_dataset: BenchmarkDataset):
+    """Routes all database and auth calls to the fakes with a cold instance."""
+    clear_instance_caches()
+    _dataset.reset_rpc_counts()
+    with mock.patch.dict(
+        "os.environ", {"DISABLE_AUTH": "false", "LOCAL_TESTING": "true"}
+    ), _dataset.firestore_client.patch(), _dataset.auth.patch():
+        yield _dataset
@@ -0,0 +1,143 @@
+"""Utility methods for bulk requests, which create or update many entries at once."""
+from dataclasses import dataclass
+from os import getenv
+
+BULK_SEGMENT = "_bulk"
+MAX_BULK_ITEMS = int(getenv("MAX_BULK_ITEMS", "500"))
+
+
+@dataclass
+class BulkUpdate:
+    """Class to describe an update of the entries given by their ids or a filter."""
+
+    update_data: dict
+    document_ids: list[str] | None = None
+    filters: dict | None = None
+
+
+def get_bulk_update_fields(class_type: type) -> list[str] | None:
+    """Gets the fields, which can be updated for many entries at once.
+    Args:
+        class_type -- The dataclass type of the entity.
+    Returns:
+        The declared fields or None if the entity cannot be updated in bulk.
+    """
+    return getattr(class_type, "bulk_update_fields", None) or None
+
+
+def parse_bulk_items(
+    body: object, field_names: list[str]
+) -> tuple[list[dict | str] | None, str | None]:
+    """Parses the body of a bulk request, each item is validated on its own.
+    Args:
+        body -- The parsed JSON body, an array of entries.
+        field_names -- The required fields of the entity.
+    Returns:
+        (Per item the relevant fields or the reason why it is invalid.,
+         The error message if the whole body is invalid.)
+    """
+    if not isinstance(body, list) or not body:
+        return None, "Body must be a non-empty array of entries!"
+    if len(body) > MAX_BULK_ITEMS:
+        return None, f"At most {MAX_BULK_ITEMS} entries can be created at once!"
+
+    items = []
+    for item in body:
+        if isinstance(item, dict) and all(
+            field_name in item for field_name in field_names
+        ):
+            items.append({field_name: item[field_name] for field_name in field_names})
+        else:
+            items.append(
+                "Not all required fields are provided! Required fields are: "
+                + ", ".join(field_names)
+            )
+    return items, None
+
+
+def get_bulk_response(
+    items: list[dict | str], results: list[tuple[int, str]]
+) -> dict:
+    """Creates the response body of a bulk request.
+    Args:
+        items -- The parsed items, invalid items are their error message.
+        results -- The (response code, id or error) of the valid items.
+    Returns:
+        The status and the id or the error message of every item in request order.
+    """
+    valid_results = iter(results)
+    item_results = []
+    for item in items:
+        response_code, message = (
+            next(valid_results) if isinstance(item, dict) else (400, item)
+        )
+        item_results.append(
+            {"status": response_code, "id": message}
+            if response_code in (201, 409)
+            else {"status": response_code, "message": message}
+        )
+    return {"items": item_results}
+
+
+def parse_bulk_update(  # pylint: disable=too-many-return-statements
+    body: object, field_names: list[str]
+) -> tuple[BulkUpdate | None, str | None]:
+    """Parses the body of a bulk update, e.g.
+    `{"filter": {"status": "OPEN"}, "update": {"assignee_id": "..."}}`.
+    Args:
+        body -- The parsed JSON body with the update and either the ids or a filter.
+        field_names -- The fields, which can be updated and filtered.
+    Returns:
+        (The requested update., The error message if invalid.)
+    """
+    if not isinstance(body, dict):
+        return None, "Body must be an object with the update and the ids or filter!"
+    allowed_fields = ", ".join(field_names)
+    update_data = body.get("update")
+    if (
+        not isinstance(update_data, dict)
+        or not update_data
+        or any(field_name not in field_names for field_name in update_data)
+    ):
+        return None, f"Field update must only contain the fields: {allowed_fields}"
+    if ("ids" in body) == ("filter" in body):
+        return None, "Either ids or filter must be given!"
+
+    if "ids" in body:
+        document_ids = body["ids"]
+        if (
+            not isinstance(document_ids, list)
+            or not document_ids
+            or not all(isinstance(document_id, str) for document_id in document_ids)
+        ):
+            return None, "Field ids must be a non-empty array of ids!"
+        document_ids = list(dict.fromkeys(document_ids))
+        if len(document_ids) > MAX_BULK_ITEMS:
+            return None, f"At most {MAX_BULK_ITEMS} entries can be updated at once!"
+        return BulkUpdate(update_data, document_ids=document_ids), None
+
+    filters = body["filter"]
+    if (
+        not isinstance(filters, dict)
+        or not filters
+        or any(field_name not in field_names for field_name in filters)
+    ):
+        return None, f"Field filter must only contain the fields: {allowed_fields}"
+    return BulkUpdate(update_data, filters=filters), None
+
+
+def get_bulk_update_response(results: dict[str, tuple[int, str]]) -> dict:
+    """Creates the response body of a bulk update.
+    Args:
+        results -- The (response code, id or error) per id of the targeted entries.
+    Returns:
+        The id, the status and for failed updates the error message of every entry.
+    """
+    return {
+        "items": [
+            {"id": document_id, "status": response_code}
+            if response_code == 200
+            else {"id": document_id, "status": response_code, "message": message}
+            for document_id, (response_code, message) in results.items()
+        ]
+    }
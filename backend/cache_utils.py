@@ -0,0 +1,81 @@
+"""Provides an in-process cache shared by all requests of a warm instance."""
+from collections import OrderedDict
+from threading import Lock
+from time import monotonic
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded least recently used cache, whose entries expire after a time to live."""
+
+    def __init__(self, max_size: int = 1000, ttl_seconds: float = 300) -> None:
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=None):
+        """Gets the cached value of the given key.
+        Args:
+            key -- The key of the entry.
+            default -- The value returned if the entry is missing or expired.
+        Returns:
+            The cached value or the default.
+        """
+        with self._lock:
+            value, expires_at = self._entries.get(key, (_MISSING, 0))
+            if value is _MISSING or expires_at <= monotonic():
+                if value is not _MISSING:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl_seconds: float = None) -> None:
+        """Stores the value for the given key.
+        Args:
+            key -- The key of the entry.
+            value -- The value to cache.
+            ttl_seconds -- Optional time to live overwriting the default of the cache.
+        """
+        ttl_seconds = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (value, monotonic() + ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key) -> None:
+        """Removes the entry of the given key.
+        Args:
+            key -- The key of the entry.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Removes all entries and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> dict:
+        """Gets the usage counters of the cache.
+        Returns:
+            The number of hits, misses, evictions and the current size.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+        }
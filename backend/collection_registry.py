@@ -0,0 +1,89 @@
+"""Registry of the known database collections with a cached existence check."""
+from os import getenv
+from threading import Lock
+from time import monotonic
+from logger_utils import Logger
+from request_context import FIRESTORE_QUERY, track_rpc
+
+logger = Logger(component="collection_registry")
+
+
+class CollectionRegistry:
+    """Keeps track of the collections the backend is allowed to write to.
+
+    A collection is only considered to exist, if it is registered and contains
+    at least one document. The latter is checked by loading at most one document,
+    the result is cached for the configured time to live.
+    """
+
+    def __init__(self, ttl_seconds: float = 300) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._collections = set()
+        self._verified_at = {}
+        self._lock = Lock()
+
+    def register(self, *collections: str) -> None:
+        """Registers the given collection names.
+        Args:
+            collections -- The names of the collections to register.
+        """
+        with self._lock:
+            self._collections.update(collections)
+
+    def is_registered(self, collection: str) -> bool:
+        """Checks if the given collection is known.
+        Args:
+            collection -- The name of the collection.
+        Returns:
+            If the collection was registered.
+        """
+        return collection in self._collections
+
+    def exists(self, db_client, collection: str) -> bool:
+        """Checks if the given collection exists in the database.
+        Raises a TimeoutError if the database cannot be reached in time.
+        Args:
+            db_client -- The database client used to probe the collection.
+            collection -- The name of the collection.
+        Returns:
+            If the collection is registered and contains at least one document.
+        """
+        if not self.is_registered(collection):
+            logger.error(f"Collection is not registered: '{collection}'")
+            return False
+
+        verified_at = self._verified_at.get(collection)
+        if verified_at is not None and monotonic() - verified_at < self.ttl_seconds:
+            return True
+
+        with track_rpc(FIRESTORE_QUERY):
+            documents = db_client.collection(collection).limit(1).get(timeout=10)
+        if not documents:
+            return False
+
+        self.mark_existing(collection)
+        return True
+
+    def mark_existing(self, collection: str) -> None:
+        """Remembers that the given collection contains documents.
+        Args:
+            collection -- The name of the collection.
+        """
+        with self._lock:
+            self._verified_at[collection] = monotonic()
+
+    def invalidate(self, collection: str = None) -> None:
+        """Drops the cached existence check.
+        Args:
+            collection -- The name of the collection, all collections if not provided.
+        """
+        with self._lock:
+            if collection is None:
+                self._verified_at.clear()
+            else:
+                self._verified_at.pop(collection, None)
+
+
+collection_registry = CollectionRegistry(
+    ttl_seconds=float(getenv("COLLECTION_REGISTRY_TTL", "300"))
+)
@@ -0,0 +1,153 @@
+"""Compresses response bodies according to the Accept-Encoding of the request."""
+from collections.abc import Iterable, Iterator
+from os import getenv
+from time import perf_counter
+import zlib
+from logger_utils import Logger
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = Logger(component="compression")
+
+COMPRESSION_MIN_SIZE = int(getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(getenv("BROTLI_QUALITY", "5"))
+# gzip container instead of a raw zlib stream.
+GZIP_WBITS = 31
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Selects the content encoding of the response.
+    Args:
+        accept_encoding -- The Accept-Encoding header of the request.
+    Returns:
+        "br" or "gzip" if accepted by the client, None if not compressed.
+    """
+    accepted = {}
+    for value in (accept_encoding or "").split(","):
+        encoding, _, parameters = value.partition(";")
+        quality = 1.0
+        if parameters.strip().startswith("q="):
+            try:
+                quality = float(parameters.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[encoding.strip().lower()] = quality
+
+    supported = ["br", "gzip"] if brotli else ["gzip"]
+    candidates = [
+        encoding
+        for encoding in supported
+        if accepted.get(encoding, accepted.get("*", 0)) > 0
+    ]
+    if not candidates:
+        return None
+    return max(candidates, key=lambda encoding: accepted.get(encoding, 0))
+
+
+def create_compressor(encoding: str):
+    """Creates a streaming compressor for the given encoding.
+    Args:
+        encoding -- "br" or "gzip".
+    Returns:
+        A tuple of the method compressing a chunk and the method finishing the stream.
+    """
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.finish
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, GZIP_WBITS)
+    return compressor.compress, compressor.flush
+
+
+def compress_response(response: tuple, accept_encoding: str | None) -> tuple:
+    """Compresses the body of a handler response, if the client supports it.
+    Bodies below the configured minimum size are sent uncompressed, streamed
+    bodies are always compressed chunk by chunk.
+    Args:
+        response -- The (body, status code, headers) tuple of a handler.
+        accept_encoding -- The Accept-Encoding header of the request.
+    Returns:
+        The response with the compressed body and the matching headers.
+    """
+    body, status_code, headers = response
+    if not body or status_code in (204, 304) or "Content-Encoding" in headers:
+        return response
+    if isinstance(body, (dict, list)):
+        # Serialized by flask after the handler, sent uncompressed.
+        return response
+
+    headers = {**headers, "Vary": "Accept-Encoding"}
+    encoding = negotiate_encoding(accept_encoding)
+    if isinstance(body, str) and encoding:
+        body = body.encode("utf-8")
+    if not encoding or (isinstance(body, bytes) and len(body) < COMPRESSION_MIN_SIZE):
+        return body, status_code, headers
+
+    headers["Content-Encoding"] = encoding
+    if headers.get("ETag"):
+        # The compressed body is no byte-identical representation anymore.
+        headers["ETag"] = "W/" + headers["ETag"].removeprefix("W/")
+
+    if isinstance(body, bytes):
+        start = perf_counter()
+        compress, finish = create_compressor(encoding)
+        compressed_body = compress(body) + finish()
+        log_compression(
+            encoding, len(body), len(compressed_body), perf_counter() - start
+        )
+        return compressed_body, status_code, headers
+    return stream_compressed(body, encoding), status_code, headers
+
+
+def stream_compressed(chunks: Iterable, encoding: str) -> Iterator[bytes]:
+    """Compresses a streamed body chunk by chunk.
+    Args:
+        chunks -- The parts of the body.
+        encoding -- "br" or "gzip".
+    Returns:
+        The iterator over the compressed parts.
+    """
+    compress, finish = create_compressor(encoding)
+    original_size = compressed_size = 0
+    duration = 0.0
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        start = perf_counter()
+        compressed_chunk = compress(chunk)
+        duration += perf_counter() - start
+        original_size += len(chunk)
+        compressed_size += len(compressed_chunk)
+        if compressed_chunk:
+            yield compressed_chunk
+    start = perf_counter()
+    last_chunk = finish()
+    duration += perf_counter() - start
+    log_compression(
+        encoding, original_size, compressed_size + len(last_chunk), duration
+    )
+    yield last_chunk
+
+
+def log_compression(
+    encoding: str, original_size: int, compressed_size: int, duration: float
+) -> None:
+    """Records the duration and ratio of a compression.
+    Args:
+        encoding -- The used content encoding.
+        original_size -- The size of the uncompressed body in bytes.
+        compressed_size -- The size of the compressed body in bytes.
+        duration -- The time spent compressing in seconds.
+    """
+    logger.debug(
+        "Compressed response with %s from %s to %s bytes.",
+        additional_fields={
+            "compression_ms": round(duration * 1000, 3),
+            "original_size": original_size,
+            "compressed_size": compressed_size,
+        },
+        args=(encoding, original_size, compressed_size),
+    )
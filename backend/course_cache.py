@@ -0,0 +1,103 @@
+"""Caches the courses, which are referenced by tickets and ticket histories."""
+from os import getenv
+from threading import Lock
+from time import monotonic
+from google.api_core.exceptions import RetryError
+from db_client import db_client_holder
+from logger_utils import Logger
+from request_context import FIRESTORE_QUERY, track_stream
+
+logger = Logger(component="course_cache")
+
+
+class CourseCache:
+    """Holds a snapshot of the whole course collection for a warm instance.
+
+    The course collection is small and rarely changes, therefore it is loaded
+    at once and reused until the time to live expires or it gets invalidated.
+    After a failed load, it is not loaded again for min_refresh_seconds.
+    """
+
+    def __init__(self, ttl_seconds: float = 300, min_refresh_seconds: float = 10):
+        self.ttl_seconds = ttl_seconds
+        self.min_refresh_seconds = min_refresh_seconds
+        self._courses = None
+        self._loaded_at = 0
+        self._failed_at = None
+        self._lock = Lock()
+
+    def get(self, course_id: str) -> dict | None:
+        """Gets the name and abbreviation of a course.
+        Args:
+            course_id -- The id of the course.
+        Returns:
+            The course or None if it does not exist or cannot be loaded.
+        """
+        # Read once, as another request may invalidate the snapshot meanwhile.
+        courses = self._courses
+        if courses is None or self.is_expired():
+            courses = self.refresh()
+        elif (
+            course_id not in courses
+            and monotonic() - self._loaded_at >= self.min_refresh_seconds
+        ):
+            # The course might have been created by another instance.
+            courses = self.refresh()
+        return (courses or {}).get(course_id)
+
+    def get_ids(self) -> list[str] | None:
+        """Gets the ids of all courses.
+        Returns:
+            The course ids or None if the courses cannot be loaded.
+        """
+        courses = self._courses
+        if courses is None or self.is_expired():
+            courses = self.refresh()
+        return None if courses is None else list(courses)
+
+    def is_expired(self) -> bool:
+        """Checks if the courses need to be loaded before the next access."""
+        return self._courses is None or monotonic() - self._loaded_at >= self.ttl_seconds
+
+    def refresh(self) -> dict[str, dict] | None:
+        """Loads the current snapshot of the course collection.
+        Returns:
+            The courses by their id, the previous snapshot if they cannot be loaded
+            or the last load failed recently.
+        """
+        with self._lock:
+            if (
+                self._failed_at is not None
+                and monotonic() - self._failed_at < self.min_refresh_seconds
+            ):
+                # Every row would try again during an outage, each with a timeout.
+                return self._courses
+            try:
+                documents = track_stream(
+                    FIRESTORE_QUERY,
+                    db_client_holder.get().collection("course").stream(timeout=10),
+                )
+                courses = {}
+                for document in documents:
+                    course = document.to_dict()
+                    courses[document.id] = {
+                        "name": course.get("name"),
+                        "course_abbreviation": course.get("course_abbreviation"),
+                    }
+            except (TimeoutError, RetryError) as error:
+                logger.error(f"Timed out while trying to load the courses: {error}")
+                self._failed_at = monotonic()
+                return self._courses
+            self._courses = courses
+            self._loaded_at = monotonic()
+            self._failed_at = None
+        logger.info(f"Loaded {len(courses)} courses into the cache.")
+        return courses
+
+    def invalidate(self) -> None:
+        """Drops the snapshot, the courses are loaded again on the next access."""
+        with self._lock:
+            self._courses = None
+
+
+course_cache = CourseCache(ttl_seconds=float(getenv("COURSE_CACHE_TTL", "300")))
@@ -2,20 +2,35 @@
     Handles request against the data endpoint.
 """
 from dataclasses import fields
-import json
 from flask import Request
 from google.cloud.firestore_v1.base_query import FieldFilter
 from auth_utils import UserInfo
-from request_helper import get_body
+from bulk import (
+    BULK_SEGMENT,
+    MAX_BULK_ITEMS,
+    get_bulk_response,
+    get_bulk_update_fields,
+    get_bulk_update_response,
+    parse_bulk_items,
+    parse_bulk_update,
+)
+from request_helper import get_body, stream_json_array
 from enums import Role
 from data_model import Comment, Course, Ticket, ENTITY_MAPPINGS, TicketHistory
 from db_operator import DatabaseOperator
+from course_cache import course_cache
 from logger_utils import Logger
+from pagination import get_page_response, parse_page_request
+from projection import parse_field_selection
+from search_index import get_search_fields, parse_search_query
+from serialization import dumps
+from unique_keys import get_unique_fields
+from versioning import etag_matches, get_cache_headers, get_etag
 
 logger = Logger(component="data_handler")
 
 
-def data_handler(  # pylint: disable=too-many-return-statements, too-many-branches, too-many-statements
+def data_handler(  # pylint: disable=too-many-return-statements, too-many-branches, too-many-statements, too-many-locals
     request: Request, path_segments: list[str], headers: dict, user_info: UserInfo
 ) -> tuple:
     """Handles all data related requests.
@@ -30,7 +45,7 @@ def data_handler(  # pylint: disable=too-many-return-statements, too-many-branch
         Response object using `make_response`
     """
     entity_type = path_segments[1].strip().lower()
-    logger.debug(f"Request for entity type '{entity_type}'")
+    logger.debug("Request for entity type '%s'", args=(entity_type,))
 
     if entity_type not in ENTITY_MAPPINGS:
         return ("Invalid Entity Type", 400, headers)
@@ -47,38 +62,98 @@ def data_handler(  # pylint: disable=too-many-return-statements, too-many-branch
         logger.error(error_message)
         return (error_message, 403, headers)
 
+    # One operator per request, it shares the database client of the instance.
+    database_operator = DatabaseOperator(user_info)
+
     # For Requests against an entity, schema: https://<api>/<data>/<entity>
     if len(path_segments) == 2:
         match request.method:
             case "GET":
                 headers["Access-Control-Allow-Methods"] = "GET"
+                page, page_error = parse_page_request(
+                    request.args, ENTITY_MAPPINGS[entity_type]
+                )
+                field_names, fields_error = parse_field_selection(
+                    request.args, ENTITY_MAPPINGS[entity_type]
+                )
+                search_terms, search_error = parse_search_query(
+                    request.args, ENTITY_MAPPINGS[entity_type]
+                )
+                if search_terms and page and (page.order_by or page.start_after):
+                    # Search results are ordered by their relevance on a single page.
+                    search_error = "Parameter q cannot be used with order_by or cursor!"
+                if page_error or fields_error or search_error:
+                    logger.error(page_error or fields_error or search_error)
+                    return (page_error or fields_error or search_error, 400, headers)
+                if field_names and page and page.order_by:
+                    # The cursor to the next page is based on the ordered field.
+                    field_names.append(page.order_by)
+                etag = get_etag(request, entity_type, database_operator)
+                if etag and etag_matches(request.headers.get("If-None-Match"), etag):
+                    return ("", 304, {**headers, **get_cache_headers(etag)})
+
                 # Requesters are only allowed to view their created tickets.
+                filters = None
                 if not has_required_role(
                     entity_type, Ticket, Role.EDITOR, user_info.roles
                 ):
-                    response_code, response_message = DatabaseOperator(
-                        user_info
-                    ).find_all(
+                    filters = [FieldFilter("created_by", "==", user_info.user_id)]
+                elif ENTITY_MAPPINGS[entity_type] in (TicketHistory, Comment):
+                    ticket_id = request.args.get("ticket_id")
+                    filters = [FieldFilter("ticket_id", "==", ticket_id)]
+
+                if search_terms:
+                    response_code, response_message = database_operator.search(
                         entity_type,
                         ENTITY_MAPPINGS[entity_type],
-                        [FieldFilter("created_by", "==", user_info.user_id)],
+                        search_terms,
+                        filters,
+                        page.limit if page else None,
+                        field_names,
                     )
-                else:
-                    if ENTITY_MAPPINGS[entity_type] in (TicketHistory, Comment):
-                        ticket_id = request.args.get("ticket_id")
-                        response_code, response_message = DatabaseOperator(
-                            user_info
-                        ).find_all(
-                            entity_type,
-                            ENTITY_MAPPINGS[entity_type],
-                            [FieldFilter("ticket_id", "==", ticket_id)],
+                    if response_code == 200:
+                        return (
+                            dumps(
+                                {"items": response_message, "next_cursor": None}
+                                if page
+                                else response_message
+                            ),
+                            response_code,
+                            {**headers, **get_cache_headers(etag)},
                         )
-                    else:
-                        response_code, response_message = DatabaseOperator(
-                            user_info
-                        ).read_all(entity_type, ENTITY_MAPPINGS[entity_type])
+                    return (response_message, response_code, headers)
+
+                if not page:
+                    # Not paginated lists are streamed, as they can get very large.
+                    response_code, response_message = database_operator.stream_all(
+                        entity_type, ENTITY_MAPPINGS[entity_type], filters, field_names
+                    )
+                    if response_code == 200:
+                        return (
+                            stream_json_array(response_message),
+                            response_code,
+                            {**headers, **get_cache_headers(etag)},
+                        )
+                    return (response_message, response_code, headers)
+
+                if filters:
+                    response_code, response_message = database_operator.find_all(
+                        entity_type,
+                        ENTITY_MAPPINGS[entity_type],
+                        filters,
+                        page,
+                        field_names,
+                    )
+                else:
+                    response_code, response_message = database_operator.read_all(
+                        entity_type, ENTITY_MAPPINGS[entity_type], page, field_names
+                    )
                 if response_code == 200:
-                    return (json.dumps(response_message), response_code, headers)
+                    return (
+                        dumps(get_page_response(page, response_message)),
+                        response_code,
+                        {**headers, **get_cache_headers(etag)},
+                    )
                 return (response_message, response_code, headers)
             case "POST":
                 headers["Access-Control-Allow-Methods"] = "POST"
@@ -99,16 +174,99 @@ def data_handler(  # pylint: disable=too-many-return-statements, too-many-branch
                     key: body[key] for key in entity_field_names if key in body
                 }
 
-                duplication_filters = get_field_filters(only_relevant_attr)
-                response_code, response_message = DatabaseOperator(user_info).create(
+                # Entities with unique fields are checked by reserving a unique key.
+                unique_fields = get_unique_fields(ENTITY_MAPPINGS[entity_type])
+                duplication_filters = (
+                    None if unique_fields else get_field_filters(only_relevant_attr)
+                )
+                response_code, response_message = database_operator.create(
                     entity_type,
                     only_relevant_attr,
                     duplication_filters=duplication_filters,
+                    unique_fields=unique_fields,
+                    search_fields=get_search_fields(ENTITY_MAPPINGS[entity_type]),
                 )
 
                 if response_code not in (201, 409):
                     return (response_message, response_code, headers)
-                return (json.dumps({"id": response_message}), response_code, headers)
+                if response_code == 201 and ENTITY_MAPPINGS[entity_type] == Course:
+                    course_cache.invalidate()
+                return (dumps({"id": response_message}), response_code, headers)
+
+    # For bulk requests, schema: https://<api>/<data>/<entity>/_bulk
+    elif len(path_segments) == 3 and path_segments[2] == BULK_SEGMENT:
+        match request.method:
+            case "POST":
+                headers["Access-Control-Allow-Methods"] = "POST"
+                entity_field_names = get_field_names(ENTITY_MAPPINGS[entity_type])
+                items, error_message = parse_bulk_items(
+                    get_body(request), entity_field_names
+                )
+                if error_message:
+                    logger.error(error_message)
+                    return (error_message, 400, headers)
+
+                response_code, response_message = database_operator.create_many(
+                    entity_type,
+                    [item for item in items if isinstance(item, dict)],
+                    entity_field_names,
+                    get_unique_fields(ENTITY_MAPPINGS[entity_type]),
+                    get_search_fields(ENTITY_MAPPINGS[entity_type]),
+                )
+                if response_code != 200:
+                    return (response_message, response_code, headers)
+                if ENTITY_MAPPINGS[entity_type] == Course and any(
+                    result[0] == 201 for result in response_message
+                ):
+                    course_cache.invalidate()
+                return (
+                    dumps(get_bulk_response(items, response_message)),
+                    200,
+                    headers,
+                )
+            case "PATCH":
+                headers["Access-Control-Allow-Methods"] = "PATCH"
+                bulk_update_fields = get_bulk_update_fields(
+                    ENTITY_MAPPINGS[entity_type]
+                )
+                if not bulk_update_fields:
+                    error_message = "Entity cannot be updated in bulk!"
+                    logger.error(error_message)
+                    return (error_message, 405, headers)
+                # Only editors are allowed to update tickets of other users.
+                if not has_required_role(
+                    entity_type, Ticket, Role.EDITOR, user_info.roles
+                ):
+                    error_message = (
+                        "User does not have required rights to perform action!"
+                    )
+                    logger.error(error_message)
+                    return (error_message, 403, headers)
+
+                bulk_update, error_message = parse_bulk_update(
+                    get_body(request), bulk_update_fields
+                )
+                if error_message:
+                    logger.error(error_message)
+                    return (error_message, 400, headers)
+
+                response_code, response_message = database_operator.update_many(
+                    entity_type,
+                    bulk_update.update_data,
+                    bulk_update.document_ids,
+                    get_field_filters(bulk_update.filters)
+                    if bulk_update.filters
+                    else None,
+                    MAX_BULK_ITEMS,
+                    TicketHistory if ENTITY_MAPPINGS[entity_type] == Ticket else None,
+                )
+                if response_code != 200:
+                    return (response_message, response_code, headers)
+                return (
+                    dumps(get_bulk_update_response(response_message)),
+                    200,
+                    headers,
+                )
 
     # For Requests against specific elements, schema: https://<api>/<data>/<entity>/<id>
     elif len(path_segments) == 3:
@@ -123,8 +281,17 @@ def data_handler(  # pylint: disable=too-many-return-statements, too-many-branch
         match request.method:
             case "GET":
                 headers["Access-Control-Allow-Methods"] = "GET"
-                response_code, response_message = DatabaseOperator(user_info).read(
-                    entity_type, ENTITY_MAPPINGS[entity_type], entity_id
+                field_names, error_message = parse_field_selection(
+                    request.args, ENTITY_MAPPINGS[entity_type]
+                )
+                if error_message:
+                    logger.error(error_message)
+                    return (error_message, 400, headers)
+                etag = get_etag(request, entity_type, database_operator)
+                if etag and etag_matches(request.headers.get("If-None-Match"), etag):
+                    return ("", 304, {**headers, **get_cache_headers(etag)})
+                response_code, response_message = database_operator.read(
+                    entity_type, ENTITY_MAPPINGS[entity_type], entity_id, field_names
                 )
                 if response_code == 200:
                     # Requesters are only allowed to read their tickets.
@@ -139,7 +306,11 @@ def data_handler(  # pylint: disable=too-many-return-statements, too-many-branch
                         )
                         logger.error(error_message)
                         return (error_message, 403, headers)
-                    return (json.dumps(response_message), response_code, headers)
+                    return (
+                        dumps(response_message),
+                        response_code,
+                        {**headers, **get_cache_headers(etag)},
+                    )
                 return (response_message, response_code, headers)
             case "PUT":
                 headers["Access-Control-Allow-Methods"] = "PUT"
@@ -159,9 +330,12 @@ def data_handler(  # pylint: disable=too-many-return-statements, too-many-branch
                 only_relevant_attr = {
                     key: body[key] for key in entity_field_names if key in body
                 }
-                duplication_filters = get_field_filters(only_relevant_attr)
+                unique_fields = get_unique_fields(ENTITY_MAPPINGS[entity_type])
+                duplication_filters = (
+                    None if unique_fields else get_field_filters(only_relevant_attr)
+                )
 
-                response_code, response_message = DatabaseOperator(user_info).update(
+                response_code, response_message = database_operator.update(
                     entity_type,
                     only_relevant_attr,
                     path_segments[2],
@@ -172,10 +346,14 @@ def data_handler(  # pylint: disable=too-many-return-statements, too-many-branch
                     )
                     else None,
                     TicketHistory if ENTITY_MAPPINGS[entity_type] == Ticket else None,
+                    unique_fields,
+                    get_search_fields(ENTITY_MAPPINGS[entity_type]),
                 )
+                if response_code == 200 and ENTITY_MAPPINGS[entity_type] == Course:
+                    course_cache.invalidate()
                 if response_code in (200, 409):
                     return (
-                        json.dumps({"id": response_message}),
+                        dumps({"id": response_message}),
                         response_code,
                         headers,
                     )
@@ -188,9 +366,7 @@ def data_handler(  # pylint: disable=too-many-return-statements, too-many-branch
 
                 headers["Access-Control-Allow-Methods"] = "DELETE"
                 if ENTITY_MAPPINGS[entity_type] == Course:
-                    response_code, response_message = DatabaseOperator(
-                        user_info
-                    ).find_all(
+                    response_code, response_message = database_operator.find_all(
                         "ticket",
                         ENTITY_MAPPINGS["ticket"],
                         [FieldFilter("course_id", "==", path_segments[2])],
@@ -202,10 +378,14 @@ def data_handler(  # pylint: disable=too-many-return-statements, too-many-branch
                         logger.error(error_message)
                         return (error_message, 409, headers)
 
-                response_code, response_message = DatabaseOperator(user_info).delete(
-                    entity_type, path_segments[2]
+                response_code, response_message = database_operator.delete(
+                    entity_type,
+                    path_segments[2],
+                    get_unique_fields(ENTITY_MAPPINGS[entity_type]),
                 )
                 if response_code == 204:
+                    if ENTITY_MAPPINGS[entity_type] == Course:
+                        course_cache.invalidate()
                     return ("", response_code, headers)
                 return (response_message, response_code, headers)
     return ("Invalid Request", 400, headers)
@@ -1,7 +1,9 @@
 """The models for the db entities."""
 from dataclasses import dataclass
-from auth_utils import UserInfo, get_user_name_by_id
-from db_operator import DatabaseOperator
+from typing import ClassVar
+from auth_utils import get_user_names_by_ids
+from collection_registry import collection_registry
+from course_cache import course_cache
 
 
 @dataclass
@@ -11,6 +13,8 @@ class Course:
     course_abbreviation: str = ""
     name: str = ""
 
+    unique_fields: ClassVar[list[str]] = ["course_abbreviation"]
+
 
 @dataclass
 class Ticket:
@@ -24,20 +28,48 @@ class Ticket:
     assignee_id: str
     type: str
 
+    ref_fields: ClassVar[dict[str, list[str]]] = {
+        "course_name": ["course_id"],
+        "course_abbreviation": ["course_id"],
+        "assignee_name": ["assignee_id"],
+    }
+    ref_collections: ClassVar[list[str]] = ["course"]
+    search_fields: ClassVar[list[str]] = ["title", "description"]
+    bulk_update_fields: ClassVar[list[str]] = [
+        "status",
+        "priority",
+        "type",
+        "course_id",
+        "assignee_id",
+    ]
+
+    @classmethod
+    def get_user_refs(cls, element: dict) -> list[str]:
+        """Gets the IDs of the users referenced by the ticket.
+        Args:
+            element -- the ticket reference loaded
+        Returns:
+            The list of referenced user IDs.
+        """
+        return [element.get("assignee_id")]
+
     @classmethod
-    def resolve_refs(cls, element: dict, user_info: UserInfo) -> dict:
+    def resolve_refs(cls, element: dict, user_names: dict = None) -> dict:
         """Resolves the references to course and assignee.
         Args:
             element -- the ticket reference loaded
-            user_info -- the authenticated user information
+            user_names -- the already loaded names of the referenced users
         Returns:
             The element with resolved course and assignee.
         """
-        response, course = DatabaseOperator(user_info).read(
-            "course", Course, element["course_id"]
+        if user_names is None:
+            user_names = get_user_names_by_ids(cls.get_user_refs(element))
+
+        course = (
+            course_cache.get(element["course_id"]) if element.get("course_id") else None
         )
 
-        if response == 200:
+        if course:
             element = {
                 **element,
                 "course_name": course["name"],
@@ -45,7 +77,7 @@ class Ticket:
             }
 
         if element.get("assignee_id") is not None:
-            element["assignee_name"] = get_user_name_by_id(element["assignee_id"])
+            element["assignee_name"] = user_names.get(element["assignee_id"], "Unknown")
 
         return element
 
@@ -66,21 +98,41 @@ class TicketHistory:
     changed_values: dict
     previous_values: dict
 
+    ref_fields: ClassVar[dict[str, list[str]]] = {
+        "changed_values": ["changed_values"],
+        "previous_values": ["previous_values"],
+    }
+    ref_collections: ClassVar[list[str]] = ["course"]
+
     @classmethod
-    def resolve_refs(cls, element: dict, user_info: UserInfo) -> dict:
+    def get_user_refs(cls, element: dict) -> list[str]:
+        """Gets the IDs of the users referenced by the history entry.
+        Args:
+            element -- the ticket history reference loaded
+        Returns:
+            The list of referenced user IDs.
+        """
+        return [
+            element.get("previous_values", {}).get("assignee_id"),
+            element.get("changed_values", {}).get("assignee_id"),
+        ]
+
+    @classmethod
+    def resolve_refs(cls, element: dict, user_names: dict = None) -> dict:
         """Resolves the references to course and assignee.
         Args:
             element -- the ticket reference loaded
-            user_info -- the authenticated user information
+            user_names -- the already loaded names of the referenced users
         Returns:
             The element with resolved course and assignee.
         """
+        if user_names is None:
+            user_names = get_user_names_by_ids(cls.get_user_refs(element))
+
         if element.get("previous_values", {}).get("course_id"):
-            response, course = DatabaseOperator(user_info).read(
-                "course", Course, element["previous_values"]["course_id"]
-            )
+            course = course_cache.get(element["previous_values"]["course_id"])
 
-            if response == 200:
+            if course:
                 element["previous_values"] = {
                     **element["previous_values"],
                     "course_name": course["name"],
@@ -88,11 +140,9 @@ class TicketHistory:
                 }
 
         if element.get("changed_values", {}).get("course_id"):
-            response, course = DatabaseOperator(user_info).read(
-                "course", Course, element["changed_values"]["course_id"]
-            )
+            course = course_cache.get(element["changed_values"]["course_id"])
 
-            if response == 200:
+            if course:
                 element["changed_values"] = {
                     **element["changed_values"],
                     "course_name": course["name"],
@@ -100,13 +150,13 @@ class TicketHistory:
                 }
 
         if element.get("previous_values", {}).get("assignee_id") is not None:
-            element["previous_values"]["assignee_name"] = get_user_name_by_id(
-                element["previous_values"]["assignee_id"]
+            element["previous_values"]["assignee_name"] = user_names.get(
+                element["previous_values"]["assignee_id"], "Unknown"
             )
 
         if element.get("changed_values", {}).get("assignee_id") is not None:
-            element["changed_values"]["assignee_name"] = get_user_name_by_id(
-                element["changed_values"]["assignee_id"]
+            element["changed_values"]["assignee_name"] = user_names.get(
+                element["changed_values"]["assignee_id"], "Unknown"
             )
 
         return element
@@ -118,3 +168,5 @@ ENTITY_MAPPINGS = {
     "comment": Comment,
     "ticket_history": TicketHistory,
 }
+
+collection_registry.register(*ENTITY_MAPPINGS)
@@ -0,0 +1,34 @@
+"""Holds the Firestore client shared by all requests of an instance."""
+from threading import Lock
+from firebase_admin import firestore
+from google.cloud.firestore_v1.client import Client
+
+
+class DatabaseClientHolder:
+    """Creates the Firestore client once and shares it between all threads.
+
+    The client and its gRPC channel are thread-safe, so the database operators
+    of concurrent requests use the same client instead of looking it up each time.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._client = None
+
+    def get(self) -> Client:
+        """Gets the shared client, creates it on the first call."""
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = firestore.client()
+                client = self._client
+        return client
+
+    def reset(self) -> None:
+        """Drops the shared client, the next call of get creates a new one."""
+        with self._lock:
+            self._client = None
+
+
+db_client_holder = DatabaseClientHolder()
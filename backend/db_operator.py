@@ -1,36 +1,84 @@
+# pylint: disable=too-many-lines
 """Utility methods to run database operations."""
+from collections.abc import Iterable, Iterator
+from itertools import islice
+from os import getenv
 from uuid import uuid4
-from dataclasses import asdict, is_dataclass
 from datetime import datetime
-from firebase_admin import firestore
 from google.cloud.firestore_v1.base_query import (
     FieldFilter,
     BaseCompositeFilter,
     StructuredQuery,
 )
-from google.cloud.firestore_v1.base_document import BaseDocumentReference
+from google.cloud.firestore_v1.batch import WriteBatch
+from google.cloud.firestore_v1.transforms import Increment
+from google.cloud.firestore_v1.base_document import (
+    BaseDocumentReference,
+    DocumentSnapshot,
+)
 from google.cloud import exceptions
-from google.api_core.exceptions import RetryError
-from auth_utils import UserInfo, get_user_name_by_id
+from google.api_core.exceptions import (
+    AlreadyExists,
+    FailedPrecondition,
+    GoogleAPICallError,
+    RetryError,
+)
+from auth_utils import UserInfo, get_user_names_by_ids
+from collection_registry import collection_registry
+from course_cache import course_cache
+from db_client import db_client_holder
+from enrichment import enrichment_executor
+from pagination import PageRequest, apply_page
+from projection import get_source_fields, is_selected
+from search_index import (
+    SEARCH_TERMS_FIELD,
+    get_document_terms,
+    rank_documents,
+)
+from request_context import (
+    FIRESTORE_QUERY,
+    FIRESTORE_READ,
+    FIRESTORE_WRITE,
+    restart_deadline,
+    track_rpc,
+    track_stream,
+)
+from serialization import to_dict
+from unique_keys import UNIQUE_KEY_COLLECTION, get_duplication_key, get_unique_key
+from versioning import (
+    VERSION_COLLECTION,
+    get_random_version_shard,
+    get_version_shards,
+)
 
 from logger_utils import Logger
 
 logger = Logger(component="db_utils")
+STREAM_CHUNK_SIZE = int(getenv("STREAM_CHUNK_SIZE", "100"))
+# Limits of Firestore for the writes of a batch and the values of an in filter.
+MAX_BATCH_WRITES = 500
+MAX_IN_VALUES = 30
 
 
-class DatabaseOperator:
-    """Class that hold a connection to the database and runs CRUD operations on it."""
+class DatabaseOperator:  # pylint: disable=R0904
+    """Class that runs CRUD operations on the database for a single requester.
+    The operators are request-scoped, they share the client of the instance.
+    """
+
+    __slots__ = ("db_client", "user_info")
 
     def __init__(self, user_info: UserInfo) -> None:
-        self.db_client = firestore.client()
+        self.db_client = db_client_holder.get()
         self.user_info = user_info
 
-    def create(
+    def create(  # pylint: disable=too-many-arguments,too-many-locals
         self,
         collection: str,
         data: object,
         document_id=None,
         duplication_filters: list[FieldFilter] = None,
+        unique_fields: list[str] = None,
+        search_fields: list[str] = None,
     ) -> tuple[int, str]:
         """Creates a new database entry (document) on a given collection.
         Args:
@@ -38,13 +86,15 @@ class DatabaseOperator:
             data -- The data that should be used to create a new entry.
             document_id -- The id of the new document.
             duplication_filters -- The filters which should be used to check for duplicates.
+            unique_fields -- The fields identifying the entry, reserved by a unique key.
+            search_fields -- The fields, whose search terms are stored with the entry.
         Returns:
             (The response code., The response message.)
         """
         try:
             document_id = document_id or str(uuid4())
             coll_ref = self.db_client.collection(collection)
-            db_collection = coll_ref.get(timeout=10)
+            collection_exists = collection_registry.exists(self.db_client, collection)
         except TimeoutError as error:
             error_message = (
                 f"Timed out while trying to get reference for collection {collection}: "
@@ -53,7 +103,7 @@ class DatabaseOperator:
             logger.error(error_message)
             return 500, error_message
 
-        if not db_collection:
+        if not collection_exists:
             return (
                 500,
                 f"Cannot create document! Collection does not exist: '{collection}'",
@@ -66,25 +116,181 @@ class DatabaseOperator:
             if duplicate_or_error:
                 return 409 if successful else 500, duplicate_or_error
 
-        new_data = asdict(data) if is_dataclass(data) else data
-        new_data["created_at"] = f"{datetime.utcnow().isoformat()}Z"
-        new_data["created_by"] = self.user_info.user_id
-        new_data["modified_at"] = f"{datetime.utcnow().isoformat()}Z"
-        new_data["modified_by"] = self.user_info.user_id
+        new_data = to_dict(data)
+        new_data.update(self.get_metadata(created=True))
+        if search_fields:
+            new_data[SEARCH_TERMS_FIELD] = get_document_terms(search_fields, new_data)
 
         try:
+            batch = self.db_client.batch()
+            if unique_fields:
+                # Creating the unique key fails, if another entry already reserved it.
+                unique_key = get_unique_key(collection, unique_fields, new_data)
+                batch.create(
+                    self.db_client.collection(UNIQUE_KEY_COLLECTION).document(
+                        unique_key
+                    ),
+                    {"collection": collection, "document_id": document_id},
+                )
             # Element will be overwritten if exists
-            coll_ref.document(document_id).set(new_data, timeout=10)
+            batch.set(coll_ref.document(document_id), new_data)
+            self.add_version_increments(batch, collection)
+            with track_rpc(FIRESTORE_WRITE):
+                batch.commit(timeout=10)
+        except AlreadyExists:
+            return self.get_unique_key_owner(unique_key)
         except (TimeoutError, RetryError) as error:
             error_message = (
                 f"Timed out while trying to create entry in {collection}: {str(error)}"
             )
             logger.error(error_message)
             return 500, error_message
+        collection_registry.mark_existing(collection)
         logger.info(f"Created entry in collection: {collection}, ID: {document_id}")
         return 201, document_id
 
-    def update(  # pylint: disable=too-many-arguments
+    def create_many(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        collection: str,
+        items: list[dict],
+        duplication_fields: list[str],
+        unique_fields: list[str] = None,
+        search_fields: list[str] = None,
+    ) -> tuple[int, str | list[tuple[int, str]]]:
+        """Creates many database entries at once, duplicates are skipped.
+        The duplicates within the items and of stored entries are detected with
+        few requests, the new entries are written in batches of at most 500 writes.
+        Args:
+            collection -- The name of the entity.
+            items -- The data of the new entries.
+            duplication_fields -- The fields, which are equal for duplicates.
+            unique_fields -- The fields identifying the entry, reserved by a unique key.
+            search_fields -- The fields, whose search terms are stored with the entry.
+        Returns:
+            (The response code., Per item (The response code., The id or the error.)
+             or on error the reason.)
+        """
+        try:
+            collection_exists = collection_registry.exists(self.db_client, collection)
+        except TimeoutError as error:
+            error_message = (
+                f"Timed out while trying to get reference for collection {collection}: "
+                + str(error)
+            )
+            logger.error(error_message)
+            return 500, error_message
+        if not collection_exists:
+            return (
+                500,
+                f"Cannot create document! Collection does not exist: '{collection}'",
+            )
+
+        keys = [
+            get_unique_key(collection, unique_fields, item)
+            if unique_fields
+            else get_duplication_key(duplication_fields, item)
+            for item in items
+        ]
+        try:
+            existing_ids = (
+                self.get_unique_key_owners(keys)
+                if unique_fields
+                else self.find_duplicates(collection, duplication_fields, items)
+            )
+        except (TimeoutError, RetryError) as error:
+            logger.error(f"Timed out while trying to check for duplicates: {error}")
+            return 500, "Could not check for duplicates!"
+
+        results, new_entries, new_ids = [], [], {}
+        for item, key in zip(items, keys):
+            duplicate_id = existing_ids.get(key) or new_ids.get(key)
+            if duplicate_id:
+                results.append((409, duplicate_id))
+                continue
+            new_ids[key] = str(uuid4())
+            new_entries.append((new_ids[key], key, item))
+            results.append((201, new_ids[key]))
+
+        # Every entry is written with its unique key, the version is written once.
+        entries_per_batch = (MAX_BATCH_WRITES - 1) // (2 if unique_fields else 1)
+        batches = [
+            new_entries[start : start + entries_per_batch]
+            for start in range(0, len(new_entries), entries_per_batch)
+        ]
+        failed_ids = {}
+        for entries, error_message in zip(
+            batches,
+            enrichment_executor.map(
+                lambda entries: self.commit_entries(
+                    collection, entries, unique_fields, search_fields
+                ),
+                batches,
+                # A started commit may still succeed, so it is never reported failed.
+                wait_all=True,
+            ),
+        ):
+            if error_message:
+                failed_ids.update({entry[0]: error_message for entry in entries})
+        results = [
+            (500, failed_ids[message]) if message in failed_ids else (code, message)
+            for code, message in results
+        ]
+        if len(failed_ids) < len(new_entries):
+            collection_registry.mark_existing(collection)
+        logger.info(
+            f"Created {len(new_entries) - len(failed_ids)} of {len(items)} entries "
+            + f"in collection: {collection}"
+        )
+        return 200, results
+
+    def commit_entries(
+        self,
+        collection: str,
+        entries: list[tuple[str, str, dict]],
+        unique_fields: list[str] = None,
+        search_fields: list[str] = None,
+    ) -> str | None:
+        """Writes new entries with one batch.
+        Args:
+            collection -- The name of the entity.
+            entries -- The (document id, unique key, data) of the new entries.
+            unique_fields -- The fields identifying the entry, reserved by a unique key.
+            search_fields -- The fields, whose search terms are stored with the entry.
+        Returns:
+            The error message if the entries were not created.
+        """
+        batch = self.db_client.batch()
+        coll_ref = self.db_client.collection(collection)
+        metadata = self.get_metadata(created=True)
+        for document_id, unique_key, item in entries:
+            new_data = {**to_dict(item), **metadata}
+            if search_fields:
+                new_data[SEARCH_TERMS_FIELD] = get_document_terms(
+                    search_fields, new_data
+                )
+            if unique_fields:
+                batch.create(
+                    self.db_client.collection(UNIQUE_KEY_COLLECTION).document(
+                        unique_key
+                    ),
+                    {"collection": collection, "document_id": document_id},
+                )
+            batch.set(coll_ref.document(document_id), new_data)
+        self.add_version_increments(batch, collection)
+        try:
+            with track_rpc(FIRESTORE_WRITE):
+                batch.commit(timeout=10)
+        except AlreadyExists:
+            logger.error(f"Entries in {collection} were created concurrently.")
+            return "An equal entry was created concurrently!"
+        except (TimeoutError, RetryError) as error:
+            logger.error(
+                f"Timed out while trying to create entries in {collection}: {error}"
+            )
+            return "Timed out while trying to create the entries!"
+        return None
+
+    def update(  # pylint: disable=too-many-arguments,too-many-locals,too-many-return-statements,too-many-branches,too-many-statements
         self,
         collection: str,
         update_data: object,
@@ -92,6 +298,8 @@ class DatabaseOperator:
         duplication_filters: list[FieldFilter] = None,
         allowed_updater: str = None,
         history_type: type = None,
+        unique_fields: list[str] = None,
+        search_fields: list[str] = None,
     ) -> tuple[int, str]:
         """Updates a given database entry (document) of a given collection.
         Args:
@@ -100,55 +308,120 @@ class DatabaseOperator:
             document_id -- The id of the document to update.
             duplication_filters -- The filters which should be used to check for duplicates.
             allowed_updater -- The id of the requester, needs to match the creator id of the item.
+            history_type -- The dataclass type of the history entry written for tickets.
+            unique_fields -- The fields identifying the entry, reserved by a unique key.
+            search_fields -- The fields, whose search terms are stored with the entry.
         Returns:
             (The response code., The response message.)
         """
         elem_ref = self.db_client.collection(collection).document(document_id)
+        update_data = to_dict(update_data)
+        metadata = self.get_metadata()
+        # Only the changes of tickets and protected entries are compared.
+        compare_changes = allowed_updater or collection == "ticket" or unique_fields
 
-        if duplication_filters:
-            successful, duplicate_or_error = self.get_duplicate(
-                collection, duplication_filters
-            )
-            if duplicate_or_error:
-                return (
-                    409 if successful and duplicate_or_error != document_id else 500,
-                    duplicate_or_error,
-                )
+        def read_snapshot() -> DocumentSnapshot:
+            with track_rpc(FIRESTORE_READ):
+                return elem_ref.get(timeout=10)
 
-        update_data = asdict(update_data) if is_dataclass(update_data) else update_data
+        try:
+            # The duplicate check and the read of the entry are independent.
+            duplicate_check, snapshot = enrichment_executor.gather(
+                lambda: self.get_duplicate(collection, duplication_filters)
+                if duplication_filters
+                else (True, None),
+                read_snapshot if compare_changes else lambda: None,
+            )
+        except (TimeoutError, RetryError) as error:
+            logger.error(
+                f"Timed out while trying to update entry in {collection}: {str(error)}"
+            )
+            return 500, "Timed out while trying to update entry!"
+        successful, duplicate_or_error = duplicate_check
+        if duplicate_or_error:
+            return (
+                409 if successful and duplicate_or_error != document_id else 500,
+                duplicate_or_error,
+            )
 
         try:
-            if allowed_updater or collection == "ticket":
-                element = elem_ref.get(timeout=10).to_dict()
+            batch = self.db_client.batch()
+            if not compare_changes:
+                if search_fields:
+                    metadata[SEARCH_TERMS_FIELD] = get_document_terms(
+                        search_fields, update_data
+                    )
+                batch.update(elem_ref, {**update_data, **metadata})
+            else:
+                if not snapshot.exists:
+                    return 404, "Element not found!"
+                element = snapshot.to_dict()
                 if allowed_updater and element.get("created_by") != allowed_updater:
                     return 403, "Not allowed to update entry!"
                 changes = {
                     key: update_data[key]
                     for key in update_data
-                    if update_data[key] != element[key]
+                    if update_data[key] != element.get(key)
                 }
-                if collection == "ticket" and len(changes.keys()) > 0:
-                    logger.debug(f"Changes made in ticket: {changes}")
-                    history_response_code, history_response = self.create(
-                        "ticket_history",
-                        history_type(
-                            ticket_id=document_id,
-                            changed_values=changes,
-                            previous_values={key: element[key] for key in changes},
+                if not changes:
+                    logger.info(
+                        f"Skipped update of '{document_id}' in collection "
+                        + f"'{collection}', nothing changed."
+                    )
+                    return 200, document_id
+
+                if search_fields:
+                    metadata[SEARCH_TERMS_FIELD] = get_document_terms(
+                        search_fields, {**element, **update_data}
+                    )
+                # The history entry is written together with the update and
+                # the update fails, if the element changed since it was read.
+                batch.update(
+                    elem_ref,
+                    {**update_data, **metadata},
+                    option=self.db_client.write_option(
+                        last_update_time=snapshot.update_time
+                    ),
+                )
+                if unique_fields:
+                    unique_key = get_unique_key(
+                        collection, unique_fields, {**element, **update_data}
+                    )
+                    previous_unique_key = get_unique_key(
+                        collection, unique_fields, element
+                    )
+                    if unique_key != previous_unique_key:
+                        keys_ref = self.db_client.collection(UNIQUE_KEY_COLLECTION)
+                        batch.create(
+                            keys_ref.document(unique_key),
+                            {"collection": collection, "document_id": document_id},
+                        )
+                        batch.delete(keys_ref.document(previous_unique_key))
+                if collection == "ticket" and history_type:
+                    logger.debug("Changes made in ticket: %s", args=(changes,))
+                    history_entry = history_type(
+                        ticket_id=document_id,
+                        changed_values=changes,
+                        previous_values={key: element.get(key) for key in changes},
+                    )
+                    batch.set(
+                        self.db_client.collection("ticket_history").document(
+                            str(uuid4())
                         ),
+                        {**to_dict(history_entry), **self.get_metadata(created=True)},
                     )
-                    if history_response_code != 201:
-                        logger.error("Cannot create ticket history entry!")
-                        return history_response_code, history_response
-                    logger.info(f"Created ticket history entry: {history_response}")
-            elem_ref.update(update_data, timeout=10)
-            elem_ref.update(
-                {"modified_at": f"{datetime.utcnow().isoformat()}Z"}, timeout=10
-            )
-            elem_ref.update({"modified_by": self.user_info.user_id}, timeout=10)
+                    self.add_version_increments(batch, "ticket_history")
+            self.add_version_increments(batch, collection)
+            with track_rpc(FIRESTORE_WRITE):
+                batch.commit(timeout=10)
         except exceptions.NotFound as error:
             logger.error(f"Error while updating the entry: {error}")
             return 404, "Element not found!"
+        except FailedPrecondition as error:
+            logger.error(f"Element was modified while updating the entry: {error}")
+            return 412, "Element was modified in the meantime!"
+        except AlreadyExists:
+            return self.get_unique_key_owner(unique_key)
         except (TimeoutError, RetryError) as error:
             logger.error(
                 f"Timed out while trying to update entry in {collection}: {str(error)}"
@@ -160,42 +433,284 @@ class DatabaseOperator:
         )
         return 200, document_id
 
+    def update_many(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        collection: str,
+        update_data: dict,
+        document_ids: list[str] = None,
+        filters: list[FieldFilter] = None,
+        limit: int = None,
+        history_type: type = None,
+    ) -> tuple[int, str | dict[str, tuple[int, str]]]:
+        """Updates the same fields of many entries, given by their ids or a filter.
+        The entries are read at once, only changed entries are written together with
+        their history entries in batches of at most 500 writes.
+        Args:
+            collection -- The name of the entity.
+            update_data -- The changed fields, equal for all entries.
+            document_ids -- The ids of the entries to update.
+            filters -- The filter condition of the entries to update, if no ids given.
+            limit -- The maximum number of entries matching the filter.
+            history_type -- The dataclass type of the history entries of tickets.
+        Returns:
+            (The response code., Per entry id (The response code., The id or the error.)
+             or on error the reason.)
+        """
+        coll_ref = self.db_client.collection(collection)
+        # Only the updated fields are needed to compute the changes.
+        field_names = list(update_data)
+        try:
+            if document_ids is not None:
+                snapshots = {
+                    snapshot.id: snapshot
+                    for snapshot in track_stream(
+                        FIRESTORE_READ,
+                        self.db_client.get_all(
+                            [
+                                coll_ref.document(document_id)
+                                for document_id in document_ids
+                            ],
+                            field_paths=field_names,
+                            timeout=10,
+                        ),
+                    )
+                }
+            else:
+                query = coll_ref.where(
+                    filter=BaseCompositeFilter(
+                        operator=StructuredQuery.CompositeFilter.Operator.AND,
+                        filters=filters,
+                    )
+                ).select(field_names)
+                if limit:
+                    query = query.limit(limit + 1)
+                with track_rpc(FIRESTORE_QUERY):
+                    snapshots = {
+                        snapshot.id: snapshot for snapshot in query.get(timeout=10)
+                    }
+                if limit and len(snapshots) > limit:
+                    return 400, f"More than {limit} entries match the filter!"
+                document_ids = list(snapshots)
+        except ValueError as error:
+            logger.error(f"Filter field is not known! {error}")
+            return 400, "Filter field is not known!"
+        except (TimeoutError, RetryError) as error:
+            logger.error(
+                f"Timed out while trying to read entries in {collection}: {error}"
+            )
+            return 500, "Timed out while trying to read the entries!"
+
+        results, entries = {}, []
+        for document_id in document_ids:
+            snapshot = snapshots.get(document_id)
+            if snapshot is None or not snapshot.exists:
+                results[document_id] = 404, "Element not found!"
+                continue
+            element = snapshot.to_dict()
+            changes = {
+                key: value
+                for key, value in update_data.items()
+                if value != element.get(key)
+            }
+            results[document_id] = 200, document_id
+            if changes:
+                entries.append((snapshot, changes))
+
+        # Every entry is written with its history entry, the versions are written once.
+        writes_per_entry = 2 if history_type else 1
+        entries_per_batch = (MAX_BATCH_WRITES - writes_per_entry) // writes_per_entry
+        batches = [
+            entries[start : start + entries_per_batch]
+            for start in range(0, len(entries), entries_per_batch)
+        ]
+        for batch_entries, batch_results in zip(
+            batches,
+            enrichment_executor.map(
+                lambda entries: self.commit_updates(collection, entries, history_type),
+                batches,
+                # A started commit may still succeed, so it is never reported failed.
+                wait_all=True,
+            ),
+        ):
+            for (snapshot, _), result in zip(batch_entries, batch_results):
+                results[snapshot.id] = result
+        logger.info(
+            f"Updated {sum(results[snapshot.id][0] == 200 for snapshot, _ in entries)} "
+            + f"of {len(results)} entries in collection: {collection}"
+        )
+        return 200, results
+
+    def commit_updates(
+        self,
+        collection: str,
+        entries: list[tuple[DocumentSnapshot, dict]],
+        history_type: type = None,
+    ) -> list[tuple[int, str]]:
+        """Writes the changes of many entries with one batch.
+        If an entry was modified since it was read, the entries are written one by
+        one, so only the modified entry is not updated.
+        Args:
+            collection -- The name of the entity.
+            entries -- The (read snapshot, changed fields) of the entries.
+            history_type -- The dataclass type of the history entries of tickets.
+        Returns:
+            The (response code, id or error) of every entry.
+        """
+        batch = self.db_client.batch()
+        metadata = self.get_metadata()
+        for snapshot, changes in entries:
+            # The update fails, if the element changed since it was read.
+            batch.update(
+                snapshot.reference,
+                {**changes, **metadata},
+                option=self.db_client.write_option(
+                    last_update_time=snapshot.update_time
+                ),
+            )
+            if history_type:
+                element = snapshot.to_dict()
+                history_entry = history_type(
+                    ticket_id=snapshot.id,
+                    changed_values=changes,
+                    previous_values={key: element.get(key) for key in changes},
+                )
+                batch.set(
+                    self.db_client.collection("ticket_history").document(str(uuid4())),
+                    {**to_dict(history_entry), **self.get_metadata(created=True)},
+                )
+        self.add_version_increments(
+            batch, collection, *(["ticket_history"] if history_type else [])
+        )
+        try:
+            with track_rpc(FIRESTORE_WRITE):
+                batch.commit(timeout=10)
+        except FailedPrecondition as error:
+            logger.error(f"Element was modified while updating the entries: {error}")
+            if len(entries) == 1:
+                return [(412, "Element was modified in the meantime!")]
+            return [
+                result
+                for entry in entries
+                for result in self.commit_updates(collection, [entry], history_type)
+            ]
+        except (TimeoutError, RetryError) as error:
+            logger.error(
+                f"Timed out while trying to update entries in {collection}: {error}"
+            )
+            return [(500, "Timed out while trying to update entry!")] * len(entries)
+        return [(200, snapshot.id) for snapshot, _ in entries]
+
+    def add_version_increments(self, batch: WriteBatch, *collections: str) -> None:
+        """Increments the version counters of the given collections with the batch.
+        Only a random shard of each counter is written, so concurrent writes of a
+        collection rarely contend for the same document.
+        Args:
+            batch -- The batch, which writes the changes of the collections.
+            collections -- The names of the changed collections.
+        """
+        for collection in collections:
+            batch.set(
+                self.db_client.collection(VERSION_COLLECTION).document(
+                    get_random_version_shard(collection)
+                ),
+                {"version": Increment(1)},
+                merge=True,
+            )
+
+    def increment_versions(self, *collections: str) -> bool:
+        """Increments the version counters of data changed outside of the database.
+        Args:
+            collections -- The names of the changed collections.
+        Returns:
+            If the versions were incremented.
+        """
+        try:
+            batch = self.db_client.batch()
+            self.add_version_increments(batch, *collections)
+            with track_rpc(FIRESTORE_WRITE):
+                batch.commit(timeout=10)
+        except (TimeoutError, RetryError) as error:
+            logger.error(f"Timed out while trying to increment versions: {error}")
+            return False
+        return True
+
+    def get_versions(self, collections: list[str]) -> dict[str, int] | None:
+        """Loads the version counters of the given collections with all shards at once.
+        Args:
+            collections -- The names of the collections.
+        Returns:
+            The version of each collection, 0 if never changed. None on timeout.
+        """
+        shard_collections = {
+            shard: collection
+            for collection in collections
+            for shard in get_version_shards(collection)
+        }
+        versions_ref = self.db_client.collection(VERSION_COLLECTION)
+        versions = dict.fromkeys(collections, 0)
+        try:
+            for snapshot in track_stream(
+                FIRESTORE_READ,
+                self.db_client.get_all(
+                    [versions_ref.document(shard) for shard in shard_collections],
+                    field_paths=["version"],
+                    timeout=10,
+                ),
+            ):
+                if snapshot.exists:
+                    versions[shard_collections[snapshot.id]] += snapshot.to_dict().get(
+                        "version", 0
+                    )
+        except (TimeoutError, RetryError) as error:
+            logger.error(f"Timed out while trying to load versions: {error}")
+            return None
+        return versions
+
+    def get_metadata(self, created: bool = False) -> dict:
+        """Gets the metadata fields of a modified entry.
+        Args:
+            created -- If the entry is newly created.
+        Returns:
+            The modification and optionally the creation timestamp and user.
+        """
+        timestamp = f"{datetime.utcnow().isoformat()}Z"
+        metadata = {"modified_at": timestamp, "modified_by": self.user_info.user_id}
+        if created:
+            metadata.update({"created_at": timestamp, "created_by": self.user_info.user_id})
+        return metadata
+
     def read(
-        self, collection: str, class_type: type, document_id: str
+        self,
+        collection: str,
+        class_type: type,
+        document_id: str,
+        field_names: list[str] = None,
     ) -> tuple[int, str | dict]:
         """Gets the data of specific element on a given collection.
         Args:
             collection -- The name of the entity.
             document_id -- The id of the document to read.
+            field_names -- The fields to load, all fields are loaded if not provided.
         Returns:
             (The response code., The data of the element or on error the reason.)
         """
         elem_ref = self.db_client.collection(collection).document(document_id)
 
         try:
-            element = elem_ref.get(timeout=10)
-            print(element.id)
+            with track_rpc(FIRESTORE_READ):
+                element = elem_ref.get(
+                    field_paths=get_source_fields(field_names, class_type)
+                    if field_names
+                    else None,
+                    timeout=10,
+                )
             if element.exists:
                 logger.info(
-                    f"Selected element '{document_id}' in collection '{collection}'."
+                    "Selected element '%s' in collection '%s'.",
+                    args=(document_id, collection),
+                    sampled=True,
                 )
-                parsed_element = {
-                    **element.to_dict(),
-                    "id": element.id,
-                    "created_by_name": get_user_name_by_id(
-                        element.to_dict().get("created_by")
-                    ),
-                    "modified_by_name": get_user_name_by_id(
-                        element.to_dict().get("modified_by")
-                    ),
-                }
-                if hasattr(class_type, "resolve_refs") and callable(
-                    class_type.resolve_refs
-                ):
-                    parsed_element = class_type.resolve_refs(
-                        parsed_element, self.user_info
-                    )
-                return 200, parsed_element
+                return 200, self.parse_elements([element], class_type, field_names)[0]
             return 404, "Element not found!"
         except (TimeoutError, RetryError) as error:
             error_message = (
@@ -205,35 +720,30 @@ class DatabaseOperator:
             return 500, error_message
 
     def read_all(
-        self, collection: str, class_type: type
+        self,
+        collection: str,
+        class_type: type,
+        page: PageRequest = None,
+        field_names: list[str] = None,
     ) -> tuple[int, str | list[dict]]:
         """Gets all data elements of a given collection.
         Args:
             collection -- The name of the entity.
+            page -- The page to load, all elements are loaded if not provided.
+            field_names -- The fields to load, all fields are loaded if not provided.
         Returns:
             (The response code., The list of elements or on error the reason.)
         """
         try:
-            all_element_refs = self.db_client.collection(collection).stream(timeout=10)
-            all_elements = []
-            for element in all_element_refs:
-                parsed_element = {
-                    **element.to_dict(),
-                    "id": element.id,
-                    "created_by_name": get_user_name_by_id(
-                        element.to_dict().get("created_by")
-                    ),
-                    "modified_by_name": get_user_name_by_id(
-                        element.to_dict().get("modified_by")
-                    ),
-                }
-                if hasattr(class_type, "resolve_refs") and callable(
-                    class_type.resolve_refs
-                ):
-                    parsed_element = class_type.resolve_refs(
-                        parsed_element, self.user_info
-                    )
-                all_elements.append(parsed_element)
+            query = self.db_client.collection(collection)
+            if field_names:
+                query = query.select(get_source_fields(field_names, class_type))
+            all_element_refs = track_stream(
+                FIRESTORE_QUERY, apply_page(query, page).stream(timeout=10)
+            )
+            all_elements = self.parse_elements(
+                all_element_refs, class_type, field_names
+            )
 
         except (TimeoutError, RetryError) as error:
             error_message = (
@@ -242,9 +752,74 @@ class DatabaseOperator:
             )
             logger.error(error_message)
             return 500, error_message
-        logger.info(f"Selected elements for collection '{collection}'.")
+        except GoogleAPICallError as error:
+            # E.g. FailedPrecondition, if the index of an ordered page is missing.
+            error_message = f"Could not query the entries of {collection}: {error}"
+            logger.error(error_message)
+            return 500, error_message
+        logger.info(
+            "Selected elements for collection '%s'.", args=(collection,), sampled=True
+        )
         return 200, all_elements
 
+    def stream_all(
+        self,
+        collection: str,
+        class_type: type,
+        filters: list[FieldFilter] = None,
+        field_names: list[str] = None,
+    ) -> tuple[int, str | Iterator[dict]]:
+        """Gets all (matching) data elements of a given collection one after another.
+        The documents are parsed in chunks, so that the first elements can be
+        returned before the last documents are loaded.
+        Args:
+            collection -- The name of the entity.
+            class_type -- The dataclass type of the documents.
+            filters -- The filter condition used on the query, if any.
+            field_names -- The fields to load, all fields are loaded if not provided.
+        Returns:
+            (The response code., The iterator over the elements or on error the reason.)
+        """
+        try:
+            query = self.db_client.collection(collection)
+            if filters:
+                query = query.where(
+                    filter=BaseCompositeFilter(
+                        operator=StructuredQuery.CompositeFilter.Operator.AND,
+                        filters=filters,
+                    )
+                )
+            if field_names:
+                query = query.select(get_source_fields(field_names, class_type))
+            documents = track_stream(FIRESTORE_QUERY, query.stream(timeout=10))
+            # Load the first chunk already, so that errors can still be reported.
+            first_chunk = list(islice(documents, STREAM_CHUNK_SIZE))
+        except ValueError as error:
+            logger.error(f"Filter field is not known! {error}")
+            return 400, "Filter field is not known!"
+        except (TimeoutError, RetryError) as error:
+            error_message = (
+                f"Timed out while trying to read all entries for {collection}: "
+                + str(error)
+            )
+            logger.error(error_message)
+            return 500, error_message
+
+        def generate_elements() -> Iterator[dict]:
+            chunk = first_chunk
+            while chunk:
+                # Every chunk gets its own deadline, as a stream may take any time.
+                restart_deadline()
+                yield from self.parse_elements(chunk, class_type, field_names)
+                chunk = list(islice(documents, STREAM_CHUNK_SIZE))
+            logger.info(
+                "Streamed elements for collection '%s'.",
+                args=(collection,),
+                sampled=True,
+            )
+
+        return 200, generate_elements()
+
     def find(
         self, collection: str, filters: list[FieldFilter], limit: int = 1
     ) -> tuple[bool, list[BaseDocumentReference]]:
@@ -267,7 +842,7 @@ class DatabaseOperator:
                 )
                 .limit(limit)
             )
-            refs = filtered_elements.stream(timeout=10)
+            refs = track_stream(FIRESTORE_QUERY, filtered_elements.stream(timeout=10))
         except ValueError as error:
             logger.error(f"Filter field is not known! {error}")
             return False, None
@@ -278,18 +853,117 @@ class DatabaseOperator:
             logger.error(error_message)
             return False, None
 
-        logger.info(f"Searched max. {limit} element(s) for collection '{collection}'.")
+        logger.info(
+            "Searched max. %s element(s) for collection '%s'.",
+            args=(limit, collection),
+            sampled=True,
+        )
         return True, refs
 
-    def find_all(
-        self, collection: str, class_type: type, filters: list[FieldFilter]
-    ) -> tuple[int, list[dict]]:
+    def count(
+        self, collection: str, filters: list[FieldFilter]
+    ) -> tuple[int, int | str]:
+        """Counts the matching elements on the server, without loading them.
+        Args:
+            collection -- The name of the entity.
+            filters -- The filter condition used on the query.
+        Returns:
+            (The response code., The number of matching elements or the error.)
+        """
+        try:
+            query = self.db_client.collection(collection).where(
+                filter=BaseCompositeFilter(
+                    operator=StructuredQuery.CompositeFilter.Operator.AND,
+                    filters=filters,
+                )
+            )
+            with track_rpc(FIRESTORE_QUERY):
+                result = query.count(alias="count").get(timeout=10)
+        except ValueError as error:
+            logger.error(f"Filter field is not known! {error}")
+            return 400, "Filter field is not known!"
+        except (TimeoutError, RetryError) as error:
+            error_message = (
+                f"Timed out while trying to count entries in {collection}: {str(error)}"
+            )
+            logger.error(error_message)
+            return 500, error_message
+        return 200, int(result[0][0].value)
+
+    def search(  # pylint: disable=too-many-arguments
+        self,
+        collection: str,
+        class_type: type,
+        search_terms: list[str],
+        filters: list[FieldFilter] = None,
+        limit: int = None,
+        field_names: list[str] = None,
+    ) -> tuple[int, str | list[dict]]:
+        """Finds the elements containing any of the search terms, best matches first.
+        Only the returned elements are parsed and their references resolved.
+        Args:
+            collection -- The name of the entity.
+            class_type -- The dataclass type of the documents.
+            search_terms -- The normalized terms of the search query.
+            filters -- Further filter conditions used on the query, if any.
+            limit -- The maximum number of returned elements, all if not provided.
+            field_names -- The fields to load, all fields are loaded if not provided.
+        Returns:
+            (The response code., The ranked elements or on error the reason.)
+        """
+        try:
+            query = self.db_client.collection(collection).where(
+                filter=BaseCompositeFilter(
+                    operator=StructuredQuery.CompositeFilter.Operator.AND,
+                    filters=[
+                        *(filters or []),
+                        FieldFilter(
+                            SEARCH_TERMS_FIELD, "array_contains_any", search_terms
+                        ),
+                    ],
+                )
+            )
+            if field_names:
+                query = query.select(
+                    [*get_source_fields(field_names, class_type), SEARCH_TERMS_FIELD]
+                )
+            documents = list(track_stream(FIRESTORE_QUERY, query.stream(timeout=10)))
+        except ValueError as error:
+            logger.error(f"Filter field is not known! {error}")
+            return 400, "Filter field is not known!"
+        except (TimeoutError, RetryError) as error:
+            error_message = (
+                f"Timed out while trying to search entries in {collection}: "
+                + str(error)
+            )
+            logger.error(error_message)
+            return 500, error_message
+
+        ranked_documents = rank_documents(documents, search_terms)[:limit]
+        logger.info(
+            "Found %s of %s element(s) for collection '%s'.",
+            args=(len(ranked_documents), len(documents), collection),
+            sampled=True,
+        )
+        return 200, self.parse_elements(ranked_documents, class_type, field_names)
+
+    def find_all(  # pylint: disable=too-many-arguments
+        self,
+        collection: str,
+        class_type: type,
+        filters: list[FieldFilter],
+        page: PageRequest = None,
+        field_names: list[str] = None,
+    ) -> tuple[int, list[dict] | str | None]:
         """Queries a given collection with provided filters.
         Args:
             collection -- The name of the entity.
             filters -- The filter condition used on the query.
+            page -- The page to load, all matching elements are loaded if not provided.
+            field_names -- The fields to load, all fields are loaded if not provided.
         Returns:
-            (The response code., The list of elements matching the query.)
+            (The response code., The list of elements matching the query or
+             on a failed query the reason.)
         """
         try:
             filtered_elements = self.db_client.collection(collection).where(
@@ -298,26 +972,17 @@ class DatabaseOperator:
                     filters=filters,
                 )
             )
-            all_element_refs = filtered_elements.stream(timeout=10)
-            all_elements = []
-            for element in all_element_refs:
-                parsed_element = {
-                    **element.to_dict(),
-                    "id": element.id,
-                    "created_by_name": get_user_name_by_id(
-                        element.to_dict().get("created_by")
-                    ),
-                    "modified_by_name": get_user_name_by_id(
-                        element.to_dict().get("modified_by")
-                    ),
-                }
-                if hasattr(class_type, "resolve_refs") and callable(
-                    class_type.resolve_refs
-                ):
-                    parsed_element = class_type.resolve_refs(
-                        parsed_element, self.user_info
-                    )
-                all_elements.append(parsed_element)
+            if field_names:
+                filtered_elements = filtered_elements.select(
+                    get_source_fields(field_names, class_type)
+                )
+            all_element_refs = track_stream(
+                FIRESTORE_QUERY,
+                apply_page(filtered_elements, page).stream(timeout=10),
+            )
+            all_elements = self.parse_elements(
+                all_element_refs, class_type, field_names
+            )
         except ValueError as error:
             logger.error(f"Filter field is not known! {error}")
             return 400, None
@@ -326,22 +991,46 @@ class DatabaseOperator:
                 f"Timed out while trying to find entries in {collection}: {str(error)}"
             )
             return 500, None
+        except GoogleAPICallError as error:
+            # E.g. FailedPrecondition, if the index of a filtered page is missing.
+            error_message = f"Could not query the entries of {collection}: {error}"
+            logger.error(error_message)
+            return 500, error_message
 
-        logger.info(f"Searched elements for collection '{collection}'.")
+        logger.info(
+            "Searched elements for collection '%s'.", args=(collection,), sampled=True
+        )
         return 200, all_elements
 
-    def delete(self, collection: str, document_id: str) -> tuple[int, str]:
+    def delete(
+        self, collection: str, document_id: str, unique_fields: list[str] = None
+    ) -> tuple[int, str]:
         """Deletes a specific element on a given collection.
         Args:
             collection -- The name of the entity.
             document_id -- The id of the document to delete.
+            unique_fields -- The fields identifying the entry, its unique key is released.
         Returns:
             (The response code., On error the reason.)
         """
+        elem_ref = self.db_client.collection(collection).document(document_id)
         try:
-            self.db_client.collection(collection).document(document_id).delete(
-                timeout=10
-            )
+            batch = self.db_client.batch()
+            if unique_fields:
+                with track_rpc(FIRESTORE_READ):
+                    snapshot = elem_ref.get(timeout=10)
+                if snapshot.exists:
+                    batch.delete(
+                        self.db_client.collection(UNIQUE_KEY_COLLECTION).document(
+                            get_unique_key(
+                                collection, unique_fields, snapshot.to_dict()
+                            )
+                        )
+                    )
+            batch.delete(elem_ref)
+            self.add_version_increments(batch, collection)
+            with track_rpc(FIRESTORE_WRITE):
+                batch.commit(timeout=10)
         except (TimeoutError, RetryError) as error:
             error_message = (
                 f"Timed out while trying to delete entry in {collection}: {str(error)}"
@@ -353,6 +1042,68 @@ class DatabaseOperator:
         )
         return 204, None
 
+    def parse_elements(
+        self,
+        documents: Iterable[DocumentSnapshot],
+        class_type: type,
+        field_names: list[str] = None,
+    ) -> list[dict]:
+        """Parses loaded documents and resolves their references.
+        The names of all referenced users are loaded at once for all documents,
+        concurrently with the referenced courses, if they are not cached.
+        References are only resolved if one of their fields was selected.
+        Args:
+            documents -- The loaded document snapshots.
+            class_type -- The dataclass type of the documents.
+            field_names -- The selected fields, all fields if not provided.
+        Returns:
+            The list of parsed elements.
+        """
+        elements = [{**document.to_dict(), "id": document.id} for document in documents]
+        for element in elements:
+            # The search index is only used for queries.
+            element.pop(SEARCH_TERMS_FIELD, None)
+        resolve_created_by = is_selected(field_names, "created_by_name")
+        resolve_modified_by = is_selected(field_names, "modified_by_name")
+        resolve_refs = (
+            hasattr(class_type, "resolve_refs")
+            and callable(class_type.resolve_refs)
+            and is_selected(field_names, *getattr(class_type, "ref_fields", {}))
+        )
+
+        user_ids = []
+        for element in elements:
+            if resolve_created_by:
+                user_ids.append(element.get("created_by"))
+            if resolve_modified_by:
+                user_ids.append(element.get("modified_by"))
+            if resolve_refs and hasattr(class_type, "get_user_refs"):
+                user_ids.extend(class_type.get_user_refs(element))
+        lookups = [lambda: get_user_names_by_ids(user_ids)]
+        if (
+            resolve_refs
+            and "course" in getattr(class_type, "ref_collections", [])
+            and course_cache.is_expired()
+        ):
+            # The courses are loaded while the user names are looked up.
+            lookups.append(course_cache.refresh)
+        user_names = enrichment_executor.gather(*lookups)[0]
+
+        parsed_elements = []
+        for element in elements:
+            if resolve_created_by:
+                element["created_by_name"] = user_names.get(
+                    element.get("created_by"), "Unknown"
+                )
+            if resolve_modified_by:
+                element["modified_by_name"] = user_names.get(
+                    element.get("modified_by"), "Unknown"
+                )
+            if resolve_refs:
+                element = class_type.resolve_refs(element, user_names)
+            parsed_elements.append(element)
+        return parsed_elements
+
     def get_duplicate(
         self, collection: str, duplication_filters: list[FieldFilter]
     ) -> tuple[bool, str | None]:
@@ -373,3 +1124,90 @@ class DatabaseOperator:
             )
             return True, duplicate_ids[0]
         return True, None
+
+    def get_unique_key_owners(self, unique_keys: list[str]) -> dict[str, str]:
+        """Loads the entries, which reserved the given unique keys, at once.
+        Args:
+            unique_keys -- The ids of the unique key documents.
+        Returns:
+            The id of the reserving entry per taken unique key.
+        """
+        keys_ref = self.db_client.collection(UNIQUE_KEY_COLLECTION)
+        return {
+            snapshot.id: snapshot.to_dict().get("document_id")
+            for snapshot in track_stream(
+                FIRESTORE_READ,
+                self.db_client.get_all(
+                    [keys_ref.document(key) for key in dict.fromkeys(unique_keys)],
+                    timeout=10,
+                ),
+            )
+            if snapshot.exists
+        }
+
+    def find_duplicates(
+        self, collection: str, duplication_fields: list[str], items: list[dict]
+    ) -> dict[str, str]:
+        """Finds the stored duplicates of many items with chunked in queries.
+        The queries filter the first field, the other fields are compared locally.
+        Args:
+            collection -- The name of the entity.
+            duplication_fields -- The fields, which are equal for duplicates.
+            items -- The data of the new entries.
+        Returns:
+            The id of a stored duplicate per duplication key.
+        """
+        query_field = duplication_fields[0]
+        values = list(
+            {
+                get_duplication_key([query_field], item): item.get(query_field)
+                for item in items
+            }.values()
+        )
+        chunks = [
+            values[start : start + MAX_IN_VALUES]
+            for start in range(0, len(values), MAX_IN_VALUES)
+        ]
+
+        def find_chunk(chunk: list) -> dict[str, str]:
+            query = (
+                self.db_client.collection(collection)
+                .where(filter=FieldFilter(query_field, "in", chunk))
+                .select(duplication_fields)
+            )
+            return {
+                get_duplication_key(duplication_fields, document.to_dict()): document.id
+                for document in track_stream(
+                    FIRESTORE_QUERY, query.stream(timeout=10)
+                )
+            }
+
+        duplicates = {}
+        for found in enrichment_executor.map(find_chunk, chunks):
+            if found is None:
+                raise TimeoutError("The duplicate check did not finish in time.")
+            duplicates.update(found)
+        return duplicates
+
+    def get_unique_key_owner(self, unique_key: str) -> tuple[int, str]:
+        """Loads the entry, which reserved the given unique key.
+        Args:
+            unique_key -- The id of the unique key document.
+        Returns:
+            (The response code., The duplication id or the error message.)
+        """
+        try:
+            with track_rpc(FIRESTORE_READ):
+                snapshot = (
+                    self.db_client.collection(UNIQUE_KEY_COLLECTION)
+                    .document(unique_key)
+                    .get(timeout=10)
+                )
+        except (TimeoutError, RetryError) as error:
+            logger.error(f"Timed out while trying to load the unique key: {error}")
+            return 500, "Could not check for duplicates!"
+        if not snapshot.exists:
+            return 500, "Could not check for duplicates!"
+        duplicate_id = snapshot.to_dict().get("document_id")
+        logger.info(f"Found duplicate with ID: {duplicate_id}")
+        return 409, duplicate_id
@@ -0,0 +1,112 @@
+"""Runs the independent lookups and remote calls of a request concurrently."""
+from collections.abc import Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextvars import copy_context
+from os import getenv
+from threading import Lock
+from logger_utils import Logger
+from request_context import get_remaining_time
+
+logger = Logger(component="enrichment")
+
+ENRICHMENT_WORKERS = int(getenv("ENRICHMENT_WORKERS", "4"))
+ENRICHMENT_TIMEOUT = float(getenv("ENRICHMENT_TIMEOUT", "10"))
+
+
+class EnrichmentExecutor:
+    """Bounded thread pool shared by all requests of an instance.
+
+    The lookups are I/O bound, so they run concurrently despite the GIL. With a
+    single worker or a single lookup, they run sequentially in the calling thread.
+    The timeout is the deadline of all lookups of a request, counted from its start
+    or for streamed bodies from the start of the current chunk.
+    """
+
+    def __init__(self, max_workers: int, timeout_seconds: float) -> None:
+        self.max_workers = max_workers
+        self.timeout_seconds = timeout_seconds
+        self._executor = None
+        self._lock = Lock()
+
+    def get_executor(self) -> ThreadPoolExecutor:
+        """Gets the thread pool, creates it on the first call."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="enrichment"
+                )
+            return self._executor
+
+    def map(
+        self, function: Callable, items: Iterable, default=None, wait_all: bool = False
+    ) -> list:
+        """Calls the function for all items, keeps the order of the results.
+        Args:
+            function -- The lookup to run for every item.
+            items -- The independent inputs of the lookups.
+            default -- The result of lookups, which did not finish before the deadline.
+            wait_all -- Waits for all calls without a deadline, e.g. for writes,
+                        which cannot be abandoned once they started.
+        Returns:
+            The results in the order of the items.
+        """
+        items = list(items)
+        timeout = None if wait_all else get_remaining_time(self.timeout_seconds)
+        if timeout is not None and timeout <= 0 and items:
+            logger.warn(
+                "Skipped %s lookups, the deadline of %s seconds has passed.",
+                args=(len(items), self.timeout_seconds),
+            )
+            return [default] * len(items)
+        if self.max_workers <= 1 or len(items) <= 1:
+            return [function(item) for item in items]
+
+        executor = self.get_executor()
+        # Every lookup runs in the context of the request, to account its calls.
+        futures = [
+            executor.submit(copy_context().run, function, item) for item in items
+        ]
+        _, not_done = wait(futures, timeout=timeout)
+        for future in not_done:
+            future.cancel()
+        if not_done:
+            logger.warn(
+                "%s of %s lookups did not finish within the deadline of %s seconds.",
+                args=(len(not_done), len(futures), self.timeout_seconds),
+            )
+        return [
+            default if future in not_done else future.result() for future in futures
+        ]
+
+    def gather(self, *functions: Callable) -> list:
+        """Calls independent functions concurrently, similar to asyncio.gather.
+        The first function runs in the calling thread, so it may use the pool itself.
+        Every call has its own timeout, errors are raised in the calling thread.
+        Args:
+            functions -- The functions without arguments to call.
+        Returns:
+            The results in the order of the functions.
+        """
+        if self.max_workers <= 1 or len(functions) <= 1:
+            return [function() for function in functions]
+
+        executor = self.get_executor()
+        futures = [
+            executor.submit(copy_context().run, function) for function in functions[1:]
+        ]
+        try:
+            first_result = functions[0]()
+        finally:
+            # The remaining calls finish before any error is raised.
+            wait(futures)
+        return [first_result, *(future.result() for future in futures)]
+
+    def shutdown(self) -> None:
+        """Stops the thread pool, a new one is created on the next call."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+enrichment_executor = EnrichmentExecutor(ENRICHMENT_WORKERS, ENRICHMENT_TIMEOUT)
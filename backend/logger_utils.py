@@ -2,9 +2,14 @@
 Provides logging utility methods.
 Needed as the default logger cannot be used within the function framework.
 """
+from collections.abc import Callable
 from datetime import datetime
 import json
 from enum import IntEnum
+from os import getenv
+from queue import Empty, Full, Queue
+import sys
+from threading import Lock, Thread
 
 
 class LogLevel(IntEnum):
@@ -16,80 +21,346 @@ class LogLevel(IntEnum):
     ERROR = 4
 
 
+class LogWriter:
+    """Writes log entries in batches from a background thread.
+
+    Entries are put into a bounded queue, so logging never blocks the request.
+    If the queue is full, the entry is dropped and counted instead. Entries, which
+    cannot be serialized or written, are counted as failed.
+    """
+
+    def __init__(
+        self, max_queue_size: int = 10000, batch_size: int = 100, stream=None
+    ) -> None:
+        self.batch_size = batch_size
+        self.stream = stream
+        self.dropped = 0
+        self.failed = 0
+        self._queue = Queue(maxsize=max_queue_size)
+        self._thread = None
+        self._lock = Lock()
+
+    def write(self, entry: dict) -> None:
+        """Enqueues a log entry, the writer thread is started on first use.
+        Args:
+            entry - The log entry, its time is formatted by the writer thread.
+        """
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = Thread(
+                        target=self._run, name="log_writer", daemon=True
+                    )
+                    self._thread.start()
+        try:
+            self._queue.put_nowait(entry)
+        except Full:
+            with self._lock:
+                self.dropped += 1
+
+    def flush(self, timeout: float = 1.0) -> bool:
+        """Waits until all enqueued entries are written.
+        Args:
+            timeout - The maximum number of seconds to wait.
+        Returns:
+            If all entries were written in time.
+        """
+        if self._thread is None:
+            return True
+        with self._queue.all_tasks_done:
+            return self._queue.all_tasks_done.wait_for(
+                lambda: not self._queue.unfinished_tasks, timeout
+            )
+
+    def stats(self) -> dict:
+        """Gets the counters of the writer.
+        Returns:
+            The number of queued, dropped and not written entries.
+        """
+        return {
+            "queued": self._queue.qsize(),
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+
+    def _run(self) -> None:
+        while True:
+            entries = [self._queue.get()]
+            while len(entries) < self.batch_size:
+                try:
+                    entries.append(self._queue.get_nowait())
+                except Empty:
+                    break
+            queued = len(entries)
+            with self._lock:
+                dropped, self.dropped = self.dropped, 0
+                failed, self.failed = self.failed, 0
+            if dropped:
+                entries.append(
+                    self._create_warning(
+                        f"Dropped {dropped} log message(s), queue was full."
+                    )
+                )
+            if failed:
+                entries.append(
+                    self._create_warning(f"Failed to write {failed} log message(s).")
+                )
+            try:
+                self._write_batch(entries)
+            except Exception:  # pylint: disable=broad-exception-caught
+                # The thread must keep running, e.g. if the stream is broken.
+                with self._lock:
+                    self.failed += queued
+            finally:
+                for _ in range(queued):
+                    self._queue.task_done()
+
+    def _write_batch(self, entries: list[dict]) -> None:
+        lines = []
+        for entry in entries:
+            try:
+                lines.append(
+                    json.dumps({**entry, "time": entry["time"].isoformat()}) + "\n"
+                )
+            except (TypeError, ValueError):
+                # The entry cannot be serialized, the others are still written.
+                with self._lock:
+                    self.failed += 1
+        stream = self.stream or sys.stdout
+        stream.write("".join(lines))
+        stream.flush()
+
+    @staticmethod
+    def _create_warning(message: str) -> dict:
+        return {
+            "time": datetime.now(),
+            "severity": LogLevel.WARN.name,
+            "message": message,
+            "component": "logger_utils",
+        }
+
+
+ASYNC_LOGGING = getenv("LOG_ASYNC", "false").lower() in ("1", "true")
+log_writer = LogWriter(
+    max_queue_size=int(getenv("LOG_QUEUE_SIZE", "10000")),
+    batch_size=int(getenv("LOG_BATCH_SIZE", "100")),
+)
+
+
+def flush_logs(timeout: float = 1.0) -> None:
+    """Writes the buffered log entries, should be called before a response is sent.
+    Args:
+        timeout - The maximum number of seconds to wait.
+    """
+    if ASYNC_LOGGING and not log_writer.flush(timeout):
+        print(
+            json.dumps(
+                {
+                    "time": datetime.now().isoformat(),
+                    "severity": LogLevel.WARN.name,
+                    "message": f"Log messages not flushed in time: {log_writer.stats()}",
+                    "component": "logger_utils",
+                }
+            )
+        )
+
+
+def parse_log_level(value: str, default: int) -> int:
+    """Parses a configured log level.
+    Args:
+        value - The name (ex: DEBUG) or number of the log level.
+        default - The log level used, if the value is unknown.
+    Returns:
+        The numeric log level.
+    """
+    value = (value or "").strip().upper()
+    if value.isdigit():
+        return int(value)
+    return LogLevel[value].value if value in LogLevel.__members__ else default
+
+
+def parse_component_log_levels(value: str) -> dict[str, int]:
+    """Parses the configured log levels of the components.
+    Args:
+        value - Comma separated list of component=level pairs (ex: db_utils=DEBUG).
+    Returns:
+        A mapping of the component names to their numeric log level.
+    """
+    levels = {}
+    for pair in (value or "").split(","):
+        component, _, level = pair.partition("=")
+        if component.strip() and level.strip():
+            levels[component.strip()] = parse_log_level(level, LOG_LEVEL)
+    return levels
+
+
+LOG_LEVEL = parse_log_level(getenv("LOG_LEVEL"), LogLevel.INFO.value)
+COMPONENT_LOG_LEVELS = parse_component_log_levels(getenv("LOG_LEVELS"))
+INFO_SAMPLE_RATE = float(getenv("LOG_INFO_SAMPLE_RATE", "1"))
+
+
 class Logger:
-    """The logger class to initalize within the function call."""
+    """The logger class to initalize within the function call.
+
+    Messages can be passed as callable or with format args, so that they are
+    only built if the severity is logged. Sampled INFO messages are logged
+    deterministically every n-th time, based on the configured sample rate.
+    """
 
-    def __init__(self, log_level=2, component="UNDEFINED") -> None:
-        self.log_level = log_level
+    def __init__(self, log_level=None, component="UNDEFINED") -> None:
+        self.log_level = (
+            log_level
+            if log_level is not None
+            else COMPONENT_LOG_LEVELS.get(component, LOG_LEVEL)
+        )
         self.component = component
+        self.sample_rate = INFO_SAMPLE_RATE
+        self._sample_counters = {}
+        self._lock = Lock()
 
-    def log(
+    def is_enabled(self, severity: LogLevel) -> bool:
+        """Checks if messages of the given severity are logged.
+        Args:
+            severity - The importance of the log message.
+        Returns:
+            If the severity reaches the log level of the logger.
+        """
+        return severity.value >= self.log_level
+
+    def is_sampled_out(self, message: str | Callable[[], str]) -> bool:
+        """Counts a sampled message and checks if it should be skipped.
+        Args:
+            message - The message template or callable, used to count the message.
+        Returns:
+            If the message is skipped.
+        """
+        if self.sample_rate >= 1:
+            return False
+        interval = round(1 / self.sample_rate) if self.sample_rate > 0 else 0
+        key = message if isinstance(message, str) else message.__qualname__
+        with self._lock:
+            count = self._sample_counters.get(key, 0)
+            self._sample_counters[key] = count + 1
+        return interval == 0 or count % interval != 0
+
+    def log(  # pylint: disable=too-many-arguments
         self,
         severity: LogLevel,
-        message: str,
+        message: str | Callable[[], str],
         component: str = None,
         additional_fields: dict = None,
+        *,
+        args: tuple = None,
+        sampled: bool = False,
     ) -> None:
         """Generic log method, that prints a JSON string to the console.
         Args:
             severity - The importance of the log message.
-            message - The text to log.
+            message - The text to log, or a callable returning it.
             component - The component which reports the log message.
             additional_fields - Optional extra fields inclued in the log message.
+            args - Optional args, the message is formatted with (printf-style).
+            sampled - If the message is high-volume and can be sampled (INFO only).
         """
-        if severity.value < self.log_level:
+        if not self.is_enabled(severity):
+            return
+        if sampled and severity == LogLevel.INFO and self.is_sampled_out(message):
             return
 
+        if callable(message):
+            message = message()
+        elif args:
+            message = message % args
+
         entry = {
-            "time": datetime.now().isoformat(),
+            "time": datetime.now(),
             "severity": severity.name,
             "message": message,
             "component": component if component else self.component,
             **(additional_fields if additional_fields else {}),
         }
+        if sampled and severity == LogLevel.INFO and self.sample_rate < 1:
+            entry["sample_rate"] = self.sample_rate
 
-        print(json.dumps(entry))
+        if ASYNC_LOGGING:
+            log_writer.write(entry)
+        else:
+            entry["time"] = entry["time"].isoformat()
+            print(json.dumps(entry))
 
     def debug(
-        self, message: str, component: str = None, additional_fields: dict = None
+        self,
+        message: str | Callable[[], str],
+        component: str = None,
+        additional_fields: dict = None,
+        *,
+        args: tuple = None,
     ) -> None:
         """Generic log method for severity DEBUG.
         Args:
-            message - The text to log.
+            message - The text to log, or a callable returning it.
             component - The component which reports the log message.
             additional_fields - Optional extra fields inclued in the log message.
+            args - Optional args, the message is formatted with (printf-style).
         """
-        self.log(LogLevel.DEBUG, message, component, additional_fields)
+        self.log(LogLevel.DEBUG, message, component, additional_fields, args=args)
 
-    def info(
-        self, message: str, component: str = None, additional_fields: dict = None
+    def info(  # pylint: disable=too-many-arguments
+        self,
+        message: str | Callable[[], str],
+        component: str = None,
+        additional_fields: dict = None,
+        *,
+        args: tuple = None,
+        sampled: bool = False,
     ) -> None:
         """Generic log method for severity INFO.
         Args:
-            message - The text to log.
+            message - The text to log, or a callable returning it.
             component - The component which reports the log message.
             additional_fields - Optional extra fields inclued in the log message.
+            args - Optional args, the message is formatted with (printf-style).
+            sampled - If the message is high-volume and can be sampled.
         """
-        self.log(LogLevel.INFO, message, component, additional_fields)
+        self.log(
+            LogLevel.INFO,
+            message,
+            component,
+            additional_fields,
+            args=args,
+            sampled=sampled,
+        )
 
     def warn(
-        self, message: str, component: str = None, additional_fields: dict = None
+        self,
+        message: str | Callable[[], str],
+        component: str = None,
+        additional_fields: dict = None,
+        *,
+        args: tuple = None,
     ) -> None:
         """Generic log method for severity WARN.
         Args:
-            message - The text to log.
+            message - The text to log, or a callable returning it.
             component - The component which reports the log message.
             additional_fields - Optional extra fields inclued in the log message.
+            args - Optional args, the message is formatted with (printf-style).
         """
-        self.log(LogLevel.WARN, message, component, additional_fields)
+        self.log(LogLevel.WARN, message, component, additional_fields, args=args)
 
     def error(
-        self, message: str, component: str = None, additional_fields: dict = None
+        self,
+        message: str | Callable[[], str],
+        component: str = None,
+        additional_fields: dict = None,
+        *,
+        args: tuple = None,
     ) -> None:
         """Generic log method for severity ERROR.
         Args:
-            message - The text to log.
+            message - The text to log, or a callable returning it.
             component - The component which reports the log message.
             additional_fields - Optional extra fields inclued in the log message.
+            args - Optional args, the message is formatted with (printf-style).
         """
-        self.log(LogLevel.ERROR, message, component, additional_fields)
+        self.log(LogLevel.ERROR, message, component, additional_fields, args=args)
@@ -1,18 +1,23 @@
 """
     Main entry point for the Cloud Function.
+    Firebase and the handlers are loaded on the first request needing them, see startup.
 """
 from os import getenv
 import functions_framework
-from firebase_admin import initialize_app
 from flask import Request
-from logger_utils import Logger
-from auth_utils import is_authenticated
-from data_handler import data_handler
-from api_handler import api_handler
+from logger_utils import Logger, flush_logs
+from compression import compress_response
+from enums import Role
+from request_context import (
+    allow_server_timing,
+    complete_response,
+    end_request,
+    start_request,
+)
+from startup import startup
 from version import __version__
 
 
-initialize_app()
 logger = Logger(component="main")
 
 
@@ -31,7 +36,26 @@ def request_handler(request: Request) -> tuple:
         Functions, see the `Writing HTTP functions` page.
         <https://cloud.google.com/functions/docs/writing/http#http_frameworks>
     """
-    logger.info(f"Running with version: {__version__}")
+    metrics_token = start_request()
+    try:
+        response = compress_response(
+            handle_request(request), request.headers.get("Accept-Encoding")
+        )
+        return complete_response(response, request.method, request.path)
+    finally:
+        end_request(metrics_token)
+        # The instance may be throttled after the response, write buffered logs before.
+        flush_logs()
+
+
+def handle_request(request: Request) -> tuple:
+    """Authenticates the request and passes it to the matching handler.
+    Args:
+        request (flask.Request): The request object.
+    Returns:
+        The response text, status code and headers.
+    """
+    logger.info("Running with version: %s", args=(__version__,), sampled=True)
 
     is_local_testing = getenv("LOCAL_TESTING", "false").lower() in ("1", "true")
     allowed_origins = (
@@ -39,10 +63,12 @@ def request_handler(request: Request) -> tuple:
     )
 
     if request.method == "OPTIONS":
+        # The actual request usually follows, prepare it in the background.
+        startup.warm_up()
         # Allows requests from any origin with the Content-Type
         # header and caches preflight response for an 3600s
         headers = {
-            "Access-Control-Allow-Methods": "GET, PUT, POST, DELETE",
+            "Access-Control-Allow-Methods": "GET, PUT, PATCH, POST, DELETE",
             "Access-Control-Allow-Origin": allowed_origins,
             "Access-Control-Allow-Headers": "Content-Type, Authorization",
             "Access-Control-Allow-Credentials": "true",
@@ -57,11 +83,13 @@ def request_handler(request: Request) -> tuple:
         "Access-Control-Allow-Credentials": "true",
     }
 
-    user_info, error_status, error_message = is_authenticated(request)
+    handlers = startup.get_handlers()
+    user_info, error_status, error_message = handlers.is_authenticated(request)
     if not user_info:
         return (error_message, error_status, headers)
+    allow_server_timing(Role.ADMIN in user_info.roles)
 
-    logger.debug(f"Request against '{request.path}'")
+    logger.debug("Request against '%s'", args=(request.path,))
     path_segments = request.path.split("/")
     valid_path_segments = [
         segment for segment in path_segments if segment
@@ -72,8 +100,12 @@ def request_handler(request: Request) -> tuple:
 
     match valid_path_segments[0]:
         case "data":
-            return data_handler(request, valid_path_segments, headers, user_info)
+            return handlers.data_handler(
+                request, valid_path_segments, headers, user_info
+            )
         case "api":
-            return api_handler(request, valid_path_segments, headers, user_info)
+            return handlers.api_handler(
+                request, valid_path_segments, headers, user_info
+            )
 
     return ("Invalid Request", 400, headers)
@@ -0,0 +1,146 @@
+"""Utility methods for paginated list requests."""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+from dataclasses import dataclass, fields
+import json
+from os import getenv
+from google.cloud.firestore_v1.base_query import BaseQuery
+
+MAX_PAGE_SIZE = int(getenv("MAX_PAGE_SIZE", "100"))
+METADATA_FIELDS = ["created_at", "modified_at"]
+DOCUMENT_ID_FIELD = "__name__"
+
+
+@dataclass
+class PageRequest:
+    """Class to describe the requested page of a list request."""
+
+    limit: int
+    order_by: str = None
+    descending: bool = False
+    start_after: dict = None
+
+    @property
+    def fetch_size(self) -> int:
+        """One more element than requested is loaded to detect a following page."""
+        return self.limit + 1
+
+
+def parse_page_request(
+    args: dict, class_type: type
+) -> tuple[PageRequest | None, str | None]:
+    """Parses the pagination query parameters of a list request.
+    Args:
+        args -- The query parameters of the request.
+        class_type -- The dataclass type of the listed entity.
+    Returns:
+        (The requested page or None if not paginated., The error message if invalid.)
+    """
+    if "limit" not in args and "cursor" not in args:
+        return None, None
+
+    try:
+        limit = int(args.get("limit", MAX_PAGE_SIZE))
+    except ValueError:
+        return None, "Parameter limit must be a number!"
+    if limit < 1:
+        return None, "Parameter limit must be greater than zero!"
+
+    order_by = args.get("order_by") or None
+    descending = False
+    if order_by and order_by.startswith("-"):
+        order_by, descending = order_by[1:], True
+    orderable_fields = [field.name for field in fields(class_type)] + METADATA_FIELDS
+    if order_by and order_by not in orderable_fields:
+        return None, (
+            "Parameter order_by is invalid! Allowed fields are: "
+            + ", ".join(orderable_fields)
+        )
+
+    page = PageRequest(min(limit, MAX_PAGE_SIZE), order_by, descending)
+    if args.get("cursor"):
+        start_after = decode_cursor(args["cursor"], page)
+        if start_after is None:
+            return None, "Parameter cursor is invalid!"
+        page.start_after = start_after
+    return page, None
+
+
+def apply_page(query: BaseQuery, page: PageRequest | None) -> BaseQuery:
+    """Restricts a query to the requested page.
+    The document ID is always used as last order criteria to get a stable order.
+    Args:
+        query -- The query or collection reference to restrict.
+        page -- The requested page, the query is not changed if None.
+    Returns:
+        The restricted query.
+    """
+    if not page:
+        return query
+    direction = BaseQuery.DESCENDING if page.descending else BaseQuery.ASCENDING
+    if page.order_by:
+        query = query.order_by(page.order_by, direction=direction)
+    query = query.order_by(DOCUMENT_ID_FIELD, direction=direction)
+    if page.start_after:
+        query = query.start_after(page.start_after)
+    return query.limit(page.fetch_size)
+
+
+def encode_cursor(page: PageRequest, last_element: dict) -> str:
+    """Creates the opaque cursor pointing behind the given element.
+    Args:
+        page -- The requested page.
+        last_element -- The last element of the current page.
+    Returns:
+        The encoded cursor.
+    """
+    cursor = {
+        "order_by": page.order_by,
+        "descending": page.descending,
+        "values": [last_element.get(page.order_by), last_element["id"]]
+        if page.order_by
+        else [last_element["id"]],
+    }
+    return urlsafe_b64encode(json.dumps(cursor).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, page: PageRequest) -> dict | None:
+    """Parses an opaque cursor created by encode_cursor.
+    Args:
+        cursor -- The encoded cursor.
+        page -- The requested page, the cursor needs to match its ordering.
+    Returns:
+        The field values to start after or None if the cursor is invalid.
+    """
+    try:
+        decoded_cursor = json.loads(urlsafe_b64decode(cursor.encode("ascii")))
+        values = decoded_cursor["values"]
+        if (
+            decoded_cursor["order_by"] != page.order_by
+            or decoded_cursor["descending"] != page.descending
+        ):
+            return None
+    except (ValueError, TypeError, KeyError, Base64Error):
+        return None
+
+    if page.order_by and len(values) == 2:
+        return {page.order_by: values[0], DOCUMENT_ID_FIELD: values[1]}
+    if not page.order_by and len(values) == 1:
+        return {DOCUMENT_ID_FIELD: values[0]}
+    return None
+
+
+def get_page_response(page: PageRequest, elements: list[dict]) -> dict:
+    """Creates the response body of a paginated list request.
+    Args:
+        page -- The requested page.
+        elements -- The loaded elements, including the look-ahead element.
+    Returns:
+        The elements of the page and the cursor to the next page, if any.
+    """
+    items = elements[: page.limit]
+    has_next_page = len(elements) > page.limit
+    return {
+        "items": items,
+        "next_cursor": encode_cursor(page, items[-1]) if has_next_page else None,
+    }
@@ -0,0 +1,82 @@
+"""Utility methods for requests, which only load selected fields."""
+from dataclasses import fields
+
+METADATA_FIELDS = ["created_at", "created_by", "modified_at", "modified_by"]
+METADATA_REF_FIELDS = {
+    "created_by_name": ["created_by"],
+    "modified_by_name": ["modified_by"],
+}
+# Needed to check if requesters are allowed to see the element.
+ALWAYS_LOADED_FIELDS = ["created_by"]
+
+
+def get_ref_fields(class_type: type) -> dict[str, list[str]]:
+    """Gets the resolved fields of an entity and the stored fields they are based on.
+    Args:
+        class_type -- The dataclass type of the entity.
+    Returns:
+        A mapping of the resolved field names to the stored field names.
+    """
+    return {**METADATA_REF_FIELDS, **getattr(class_type, "ref_fields", {})}
+
+
+def parse_field_selection(
+    args: dict, class_type: type
+) -> tuple[list[str] | None, str | None]:
+    """Parses the fields query parameter of a read request.
+    Args:
+        args -- The query parameters of the request.
+        class_type -- The dataclass type of the requested entity.
+    Returns:
+        (The selected field names or None if all fields are requested.,
+         The error message if invalid.)
+    """
+    if not args.get("fields"):
+        return None, None
+
+    field_names = list(
+        dict.fromkeys(
+            field_name.strip()
+            for field_name in args["fields"].split(",")
+            if field_name.strip()
+        )
+    )
+    selectable_fields = (
+        ["id"]
+        + [field.name for field in fields(class_type)]
+        + METADATA_FIELDS
+        + list(get_ref_fields(class_type))
+    )
+    if not all(field_name in selectable_fields for field_name in field_names):
+        return None, (
+            "Parameter fields is invalid! Allowed fields are: "
+            + ", ".join(dict.fromkeys(selectable_fields))
+        )
+    return field_names, None
+
+
+def get_source_fields(field_names: list[str], class_type: type) -> list[str]:
+    """Gets the stored fields, which need to be loaded for the selected fields.
+    Args:
+        field_names -- The selected field names.
+        class_type -- The dataclass type of the requested entity.
+    Returns:
+        The stored field names to load from the database.
+    """
+    ref_fields = get_ref_fields(class_type)
+    source_fields = []
+    for field_name in field_names:
+        if field_name != "id":
+            source_fields.extend(ref_fields.get(field_name, [field_name]))
+    return list(dict.fromkeys(source_fields + ALWAYS_LOADED_FIELDS))
+
+
+def is_selected(field_names: list[str] | None, *names: str) -> bool:
+    """Checks if any of the given fields was selected.
+    Args:
+        field_names -- The selected field names, None if all fields are selected.
+        names -- The field names to check.
+    Returns:
+        If at least one of the fields is requested.
+    """
+    return field_names is None or any(name in field_names for name in names)
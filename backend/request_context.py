@@ -0,0 +1,243 @@
+"""Request-scoped accounting of the remote calls, reported as log and Server-Timing."""
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar, Token, copy_context
+from dataclasses import dataclass, field
+from os import getenv
+from threading import Lock
+from time import perf_counter
+from logger_utils import Logger
+
+logger = Logger(component="request_context")
+
+FIRESTORE_READ = "firestore_read"
+FIRESTORE_WRITE = "firestore_write"
+FIRESTORE_QUERY = "firestore_query"
+AUTH = "auth"
+
+# The timings reveal internals of the backend, so they are only sent to admins.
+SERVER_TIMING = getenv("SERVER_TIMING", "false").lower() in ("1", "true")
+
+
+@dataclass
+class RequestMetrics:
+    """Class to describe the remote calls of a single request."""
+
+    start: float = field(default_factory=perf_counter)
+    # The deadline of the lookups, restarted for every chunk of a streamed body.
+    deadline_start: float = field(default_factory=perf_counter)
+    calls: dict[str, int] = field(default_factory=dict)
+    durations: dict[str, float] = field(default_factory=dict)
+    server_timing_allowed: bool = False
+    # The lookups of the enrichment record their calls from worker threads.
+    lock: Lock = field(default_factory=Lock, repr=False, compare=False)
+
+    def record(self, category: str, duration: float) -> None:
+        """Adds a finished remote call.
+        Args:
+            category -- The kind of the call, e.g. FIRESTORE_READ.
+            duration -- The time spent in the call in seconds.
+        """
+        with self.lock:
+            self.calls[category] = self.calls.get(category, 0) + 1
+            self.durations[category] = self.durations.get(category, 0.0) + duration
+
+    def summary(self) -> dict:
+        """Gets the number and cumulative duration of the calls per category."""
+        return {
+            "duration_ms": round((perf_counter() - self.start) * 1000, 3),
+            "rpc": {
+                category: {
+                    "calls": calls,
+                    "duration_ms": round(self.durations[category] * 1000, 3),
+                }
+                for category, calls in self.calls.items()
+            },
+        }
+
+
+request_metrics: ContextVar[RequestMetrics | None] = ContextVar(
+    "request_metrics", default=None
+)
+
+
+def start_request() -> Token:
+    """Starts the accounting of a new request.
+    Returns:
+        The token to restore the previous context with end_request.
+    """
+    return request_metrics.set(RequestMetrics())
+
+
+def end_request(token: Token) -> None:
+    """Stops the accounting of the request started with the given token.
+    Args:
+        token -- The token returned by start_request.
+    """
+    request_metrics.reset(token)
+
+
+def get_remaining_time(budget_seconds: float) -> float:
+    """Gets the time left of a budget, which is counted from the start of the request
+    or the last restart of the deadline.
+    Args:
+        budget_seconds -- The time granted to the request in seconds.
+    Returns:
+        The remaining seconds, the whole budget outside of a request.
+    """
+    metrics = request_metrics.get()
+    if metrics is None:
+        return budget_seconds
+    return budget_seconds - (perf_counter() - metrics.deadline_start)
+
+
+def restart_deadline() -> None:
+    """Grants the following lookups of the request the whole budget again.
+    Used for the chunks of a streamed body, which are sent after the handler returned.
+    """
+    metrics = request_metrics.get()
+    if metrics:
+        metrics.deadline_start = perf_counter()
+
+
+def allow_server_timing(allowed: bool) -> None:
+    """Sets if the Server-Timing header may be sent for the current request.
+    Args:
+        allowed -- If the requester is allowed to see the timings.
+    """
+    metrics = request_metrics.get()
+    if metrics:
+        metrics.server_timing_allowed = allowed
+
+
+@contextmanager
+def track_rpc(category: str):
+    """Records the duration of the remote call inside the block.
+    Args:
+        category -- The kind of the call, e.g. FIRESTORE_READ.
+    """
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics = request_metrics.get()
+        if metrics:
+            metrics.record(category, perf_counter() - start)
+
+
+def track_stream(category: str, results: Iterable) -> Iterator:
+    """Records a lazily loaded result stream as one remote call.
+    Only the time spent waiting for the results is counted.
+    Args:
+        category -- The kind of the call, e.g. FIRESTORE_QUERY.
+        results -- The stream of the results.
+    Returns:
+        The iterator over the results.
+    """
+    metrics = request_metrics.get()
+
+    def generate_results() -> Iterator:
+        iterator = iter(results)
+        duration = 0.0
+        try:
+            while True:
+                start = perf_counter()
+                try:
+                    result = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    duration += perf_counter() - start
+                yield result
+        finally:
+            if metrics:
+                metrics.record(category, duration)
+
+    return generate_results()
+
+
+def get_server_timing(metrics: RequestMetrics) -> str:
+    """Creates the Server-Timing header of the given request.
+    Args:
+        metrics -- The accounted calls of the request.
+    Returns:
+        The header value with one metric per category and the total duration.
+    """
+    summary = metrics.summary()
+    timings = [
+        f'{category};dur={values["duration_ms"]};desc="{values["calls"]} calls"'
+        for category, values in summary["rpc"].items()
+    ]
+    timings.append(f"total;dur={summary['duration_ms']}")
+    return ", ".join(timings)
+
+
+def complete_response(response: tuple, method: str, path: str) -> tuple:
+    """Adds the Server-Timing header and logs the summary of the current request.
+    Streamed bodies keep the request context, the summary is logged once they are sent.
+    Args:
+        response -- The (body, status code, headers) tuple of a handler.
+        method -- The HTTP method of the request.
+        path -- The path of the request.
+    Returns:
+        The response with the header, if allowed.
+    """
+    metrics = request_metrics.get()
+    if metrics is None:
+        return response
+
+    body, status_code, headers = response
+    if SERVER_TIMING and metrics.server_timing_allowed:
+        headers = {**headers, "Server-Timing": get_server_timing(metrics)}
+    if isinstance(body, (str, bytes, dict, list)):
+        log_summary(metrics, method, path, status_code)
+        return body, status_code, headers
+    return stream_in_context(body, method, path, status_code), status_code, headers
+
+
+def stream_in_context(
+    chunks: Iterable, method: str, path: str, status_code: int
+) -> Iterator:
+    """Sends a streamed body within the context of its request.
+    Args:
+        chunks -- The parts of the body.
+        method -- The HTTP method of the request.
+        path -- The path of the request.
+        status_code -- The status code of the response.
+    Returns:
+        The iterator over the parts.
+    """
+    # Copied now, as the body is sent after the request context was reset.
+    context = copy_context()
+
+    def generate_chunks() -> Iterator:
+        iterator = iter(chunks)
+        try:
+            while True:
+                try:
+                    chunk = context.run(next, iterator)
+                except StopIteration:
+                    return
+                yield chunk
+        finally:
+            log_summary(context[request_metrics], method, path, status_code)
+
+    return generate_chunks()
+
+
+def log_summary(
+    metrics: RequestMetrics, method: str, path: str, status_code: int
+) -> None:
+    """Logs the accounted calls of a request as one line.
+    Args:
+        metrics -- The accounted calls of the request.
+        method -- The HTTP method of the request.
+        path -- The path of the request.
+        status_code -- The status code of the response.
+    """
+    summary = metrics.summary()
+    logger.info(
+        "Handled %s %s with status %s in %s ms.",
+        additional_fields=summary,
+        args=(method, path, status_code, summary["duration_ms"]),
+    )
@@ -1,6 +1,8 @@
 """Utility methods for handling the request."""
+from collections.abc import Iterable, Iterator
 from flask import Request
 from logger_utils import Logger
+from serialization import dumps
 
 logger = Logger(component="request_helper")
 
@@ -17,5 +19,19 @@ def get_body(request: Request) -> dict | None:
         logger.error(f"Expected JSON body but was: {content_type}")
         return None
     request_json = request.get_json(silent=True)
-    logger.info(f"Sucessfully loaded json body: {request_json}")
+    logger.debug("Sucessfully loaded json body: %s", args=(request_json,))
     return request_json
+
+
+def stream_json_array(elements: Iterable) -> Iterator[bytes]:
+    """Serializes the given elements one after another to a JSON array.
+    Args:
+        elements -- The elements to serialize.
+    Returns:
+        The iterator over the parts of the encoded JSON.
+    """
+    separator = b"["
+    for element in elements:
+        yield separator + dumps(element)
+        separator = b","
+    yield b"[]" if separator == b"[" else b"]"
@@ -0,0 +1,183 @@
+"""Utility methods for the keyword search, based on a token index of the entities.
+
+Every searchable entity stores the normalized and stemmed terms of its searchable
+fields in an array field, which is queried with `array_contains_any`.
+Run `python -m search_index` in the backend folder to index existing tickets.
+"""
+from os import getenv
+import re
+import unicodedata
+from google.cloud.firestore_v1.base_document import DocumentSnapshot
+from google.cloud.firestore_v1.client import Client
+
+SEARCH_TERMS_FIELD = "search_terms"
+# Firestore allows at most 30 values in an array_contains_any filter.
+MAX_QUERY_TERMS = 30
+MAX_DOCUMENT_TERMS = 500
+MIN_STEM_LENGTH = 3
+# Firestore allows at most 500 writes in a batch.
+BACKFILL_BATCH_SIZE = int(getenv("SEARCH_BACKFILL_BATCH_SIZE", "500"))
+SUFFIXES = ["ungen", "ung", "ing", "en", "er", "es", "ed", "e", "s"]
+STOP_WORDS = {
+    # English
+    *["a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "in", "is"],
+    *["it", "not", "of", "on", "or", "that", "the", "this", "to", "was", "with"],
+    # German
+    *["am", "auf", "aus", "bei", "das", "dem", "den", "der", "des", "die", "ein"],
+    *["eine", "einen", "einer", "im", "ist", "mit", "nicht", "und", "von", "zu"],
+}
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def get_search_fields(class_type: type) -> list[str] | None:
+    """Gets the fields, which are searchable by keywords.
+    Args:
+        class_type -- The dataclass type of the entity.
+    Returns:
+        The declared search fields or None if the entity is not searchable.
+    """
+    return getattr(class_type, "search_fields", None) or None
+
+
+def stem(word: str) -> str:
+    """Reduces a word to its stem by removing the longest common suffix.
+    Args:
+        word -- The normalized word.
+    Returns:
+        The stem, at least MIN_STEM_LENGTH characters long.
+    """
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= MIN_STEM_LENGTH:
+            return word[: -len(suffix)]
+    return word
+
+
+def get_search_terms(*texts: str | None) -> list[str]:
+    """Derives the normalized and stemmed search terms of the given texts.
+    Args:
+        texts -- The texts to index or the search query, empty values are ignored.
+    Returns:
+        The unique terms in the order of their first occurrence.
+    """
+    terms = {}
+    for text in texts:
+        if not text:
+            continue
+        # Removes the accents, e.g. "Übung" is found by "ubung" and "übung".
+        normalized = unicodedata.normalize("NFKD", str(text).casefold())
+        normalized = "".join(
+            character
+            for character in normalized
+            if not unicodedata.combining(character)
+        )
+        for word in WORD_PATTERN.findall(normalized):
+            if len(word) > 1 and word not in STOP_WORDS:
+                terms[stem(word)] = None
+    return list(terms)[:MAX_DOCUMENT_TERMS]
+
+
+def get_document_terms(search_fields: list[str], element: dict) -> list[str]:
+    """Derives the search terms stored with an entity.
+    Args:
+        search_fields -- The searchable fields of the entity.
+        element -- The entity data containing the searchable fields.
+    Returns:
+        The search terms of all searchable fields.
+    """
+    return get_search_terms(*(element.get(field_name) for field_name in search_fields))
+
+
+def parse_search_query(
+    args: dict, class_type: type
+) -> tuple[list[str] | None, str | None]:
+    """Parses the q query parameter of a list request.
+    Args:
+        args -- The query parameters of the request.
+        class_type -- The dataclass type of the listed entity.
+    Returns:
+        (The search terms or None if not searched., The error message if invalid.)
+    """
+    if "q" not in args:
+        return None, None
+    if not get_search_fields(class_type):
+        return None, "Parameter q is not supported for this entity!"
+    terms = get_search_terms(args["q"])
+    if not terms:
+        return None, "Parameter q must contain a search term!"
+    if len(terms) > MAX_QUERY_TERMS:
+        return None, f"Parameter q must contain at most {MAX_QUERY_TERMS} terms!"
+    return terms, None
+
+
+def rank_documents(
+    documents: list[DocumentSnapshot], terms: list[str]
+) -> list[DocumentSnapshot]:
+    """Orders the found documents by the number of matching search terms.
+    Documents with the same number of matches keep their order.
+    Args:
+        documents -- The documents containing at least one of the terms.
+        terms -- The search terms of the query.
+    Returns:
+        The documents with the most matching terms first.
+    """
+    query_terms = set(terms)
+
+    def count_matches(document: DocumentSnapshot) -> int:
+        return len(query_terms.intersection(document.get(SEARCH_TERMS_FIELD) or []))
+
+    return sorted(documents, key=count_matches, reverse=True)
+
+
+def backfill_search_index(
+    db_client: Client, collection: str, search_fields: list[str]
+) -> int:
+    """Stores the search terms of all entries, whose terms are missing or outdated.
+    Args:
+        db_client -- The Firestore client.
+        collection -- The name of the entity.
+        search_fields -- The searchable fields of the entity.
+    Returns:
+        The number of updated entries.
+    """
+    documents = (
+        db_client.collection(collection)
+        .select([*search_fields, SEARCH_TERMS_FIELD])
+        .stream()
+    )
+    batch, pending_updates, updated = db_client.batch(), 0, 0
+    for document in documents:
+        element = document.to_dict()
+        terms = get_document_terms(search_fields, element)
+        if element.get(SEARCH_TERMS_FIELD) == terms:
+            continue
+        batch.update(document.reference, {SEARCH_TERMS_FIELD: terms})
+        pending_updates += 1
+        if pending_updates == BACKFILL_BATCH_SIZE:
+            batch.commit()
+            batch, pending_updates = db_client.batch(), 0
+            updated += BACKFILL_BATCH_SIZE
+    if pending_updates:
+        batch.commit()
+        updated += pending_updates
+    return updated
+
+
+def main() -> None:
+    """Indexes the existing entries of all searchable entities."""
+    # pylint: disable=import-outside-toplevel
+    from data_model import ENTITY_MAPPINGS
+    from db_client import db_client_holder
+    from startup import startup
+
+    startup.initialize_firebase()
+    for collection, class_type in ENTITY_MAPPINGS.items():
+        search_fields = get_search_fields(class_type)
+        if search_fields:
+            updated = backfill_search_index(
+                db_client_holder.get(), collection, search_fields
+            )
+            print(f"Indexed {updated} entries of the collection '{collection}'.")
+
+
+if __name__ == "__main__":
+    main()
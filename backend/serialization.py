@@ -0,0 +1,63 @@
+"""Serializes response bodies, uses orjson if it is installed."""
+from dataclasses import fields, is_dataclass
+from datetime import date
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def to_dict(value: object) -> dict:
+    """Converts a dataclass to a dict, without copying the field values.
+    Args:
+        value -- The dataclass instance or an already converted dict.
+    Returns:
+        The fields of the dataclass as dict, the value itself if it is no dataclass.
+    """
+    if is_dataclass(value) and not isinstance(value, type):
+        return {field.name: getattr(value, field.name) for field in fields(value)}
+    return value
+
+
+def encode_default(value: object) -> object:
+    """Encodes the values which are not natively supported by the JSON encoders.
+    Args:
+        value -- The value to encode.
+    Returns:
+        The JSON compatible representation of the value.
+    """
+    if isinstance(value, date):
+        return value.isoformat()
+    if is_dataclass(value) and not isinstance(value, type):
+        return to_dict(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps_stdlib(value: object) -> bytes:
+    """Serializes the given value with the json module of the standard library.
+    Args:
+        value -- The value to serialize.
+    Returns:
+        The compact JSON encoded as UTF-8.
+    """
+    return json.dumps(
+        value, default=encode_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def dumps_orjson(value: object) -> bytes:
+    """Serializes the given value with orjson.
+    Dataclasses and datetimes are encoded natively, subclasses use the default.
+    Args:
+        value -- The value to serialize.
+    Returns:
+        The compact JSON encoded as UTF-8.
+    """
+    return orjson.dumps(  # pylint: disable=no-member
+        value, default=encode_default
+    )
+
+
+dumps = dumps_orjson if orjson else dumps_stdlib
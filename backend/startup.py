@@ -0,0 +1,100 @@
+"""Defers the heavy imports and client construction until they are first used."""
+from collections.abc import Callable
+from dataclasses import dataclass
+from os import getenv
+from threading import Lock, Thread
+from logger_utils import Logger
+
+logger = Logger(component="startup")
+
+PREFETCH_CERTIFICATES = getenv("PREFETCH_CERTIFICATES", "true").lower() in (
+    "1",
+    "true",
+)
+
+
+@dataclass
+class Handlers:
+    """Class to describe the lazily imported request handlers."""
+
+    is_authenticated: Callable
+    data_handler: Callable
+    api_handler: Callable
+
+
+class Startup:
+    """Initializes firebase and imports the handlers once per instance, on first use.
+
+    A preflight request only starts the warm-up in the background, so that it is
+    answered without waiting for firebase, Firestore and the handlers.
+    """
+
+    def __init__(self) -> None:
+        self._firebase_lock = Lock()
+        self._handlers_lock = Lock()
+        self._firebase_initialized = False
+        self._handlers = None
+        self._warm_up_thread = None
+
+    def initialize_firebase(self) -> None:
+        """Initializes the default firebase app, if not done yet."""
+        with self._firebase_lock:
+            if self._firebase_initialized:
+                return
+            # pylint: disable=import-outside-toplevel
+            from firebase_admin import get_app, initialize_app
+
+            try:
+                get_app()
+            except ValueError:
+                initialize_app()
+            self._firebase_initialized = True
+
+    def get_handlers(self) -> Handlers:
+        """Gets the request handlers, imports them on the first call.
+        Returns:
+            The authentication method and the handlers of the data and api requests.
+        """
+        with self._handlers_lock:
+            if self._handlers is None:
+                self.initialize_firebase()
+                # pylint: disable=import-outside-toplevel
+                from auth_utils import is_authenticated
+                from data_handler import data_handler
+                from api_handler import api_handler
+
+                self._handlers = Handlers(is_authenticated, data_handler, api_handler)
+                logger.debug("Imported the request handlers.")
+        return self._handlers
+
+    def warm_up(self) -> Thread | None:
+        """Starts creating the clients and prefetching the token certificates once.
+        Returns:
+            The started background thread, None if it was already started.
+        """
+        with self._firebase_lock:
+            if self._warm_up_thread is not None:
+                return None
+            self._warm_up_thread = Thread(
+                target=self._warm_up, name="startup-warm-up", daemon=True
+            )
+        self._warm_up_thread.start()
+        return self._warm_up_thread
+
+    def _warm_up(self) -> None:
+        """Runs the warm-up in the background thread."""
+        # The handlers import Firestore, which fails if another thread imports it at
+        # the same time, so all imports are done under the lock of get_handlers.
+        self.get_handlers()
+        # pylint: disable=import-outside-toplevel
+        from db_client import db_client_holder
+
+        db_client_holder.get()
+        if PREFETCH_CERTIFICATES:
+            # pylint: disable=import-outside-toplevel
+            from auth_utils import prefetch_certificates
+
+            prefetch_certificates()
+
+
+startup = Startup()
@@ -4,6 +4,7 @@
 import os
 import pytest
 import flask
+from backend.test.fakes import clear_instance_caches
 
 
 @pytest.fixture(scope="session", name="_environment_variables")
@@ -17,3 +18,10 @@ def fixture_environment_variables_local():
 def fixture_app():
     """Create a fake "app" for generating test request contexts."""
     return flask.Flask(__name__)
+
+
+@pytest.fixture(autouse=True, name="_clear_caches")
+def fixture_clear_caches():
+    """Clears the in-process caches, so that no test depends on a previous one."""
+    clear_instance_caches()
+    yield
@@ -0,0 +1,581 @@
+"""
+    In-memory fakes of the Firestore client and firebase_admin.auth.
+    They implement the API surface used by the backend, count the RPCs and can
+    simulate network latency, so that whole requests can be tested and measured.
+"""
+from collections import Counter
+from collections.abc import Iterator
+from copy import deepcopy
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from time import sleep, time
+from unittest import mock
+from uuid import uuid4
+from firebase_admin import auth
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition, NotFound
+from google.cloud.firestore_v1.base_query import BaseCompositeFilter, FieldFilter
+from google.cloud.firestore_v1.transforms import Increment
+from auth_utils import token_cache, user_name_cache
+from collection_registry import collection_registry
+from course_cache import course_cache
+from db_client import db_client_holder
+
+DOCUMENT_ID_FIELD = "__name__"
+OPERATORS = {
+    "==": lambda value, expected: value == expected,
+    "!=": lambda value, expected: value != expected,
+    "<": lambda value, expected: value is not None and value < expected,
+    "<=": lambda value, expected: value is not None and value <= expected,
+    ">": lambda value, expected: value is not None and value > expected,
+    ">=": lambda value, expected: value is not None and value >= expected,
+    "in": lambda value, expected: value in expected,
+    "not-in": lambda value, expected: value not in expected,
+    "array_contains": lambda value, expected: expected in (value or []),
+    "array_contains_any": lambda value, expected: any(
+        item in (value or []) for item in expected
+    ),
+}
+
+
+def clear_instance_caches() -> None:
+    """Clears the in-process caches and the shared client of the instance."""
+    user_name_cache.clear()
+    token_cache.clear()
+    collection_registry.invalidate()
+    course_cache.invalidate()
+    db_client_holder.reset()
+
+
+class FakeRpcCounter:
+    """Counts the calls against a fake backend and simulates their latency."""
+
+    def __init__(self, latency_seconds: float = 0) -> None:
+        self.latency_seconds = latency_seconds
+        self.rpc_counts = Counter()
+
+    def count_rpc(self, name: str) -> None:
+        """Counts a call and waits for the simulated latency.
+        Args:
+            name -- The name of the remote procedure.
+        """
+        self.rpc_counts[name] += 1
+        if self.latency_seconds:
+            sleep(self.latency_seconds)
+
+    def reset_rpc_counts(self) -> None:
+        """Resets the counted calls."""
+        self.rpc_counts.clear()
+
+
+@dataclass
+class FakeStoredDocument:
+    """A document stored in the fake database."""
+
+    data: dict
+    create_time: datetime
+    update_time: datetime
+
+
+class FakeDocumentSnapshot:
+    """Fake of a loaded document."""
+
+    def __init__(
+        self,
+        reference: "FakeDocumentReference",
+        stored_document: FakeStoredDocument | None,
+        field_paths: list[str] = None,
+    ) -> None:
+        self.reference = reference
+        self.id = reference.id  # pylint: disable=invalid-name
+        self.exists = stored_document is not None
+        self.update_time = stored_document.update_time if stored_document else None
+        self.create_time = stored_document.create_time if stored_document else None
+        self._data = None
+        if stored_document:
+            self._data = {
+                key: value
+                for key, value in stored_document.data.items()
+                if field_paths is None or key in field_paths
+            }
+
+    def to_dict(self) -> dict | None:
+        """Gets the loaded fields of the document."""
+        return deepcopy(self._data)
+
+    def get(self, field_path: str):
+        """Gets a loaded top-level field, raises a KeyError if it is missing."""
+        return None if self._data is None else deepcopy(self._data[field_path])
+
+
+class FakeDocumentReference:
+    """Fake of a reference to a single document."""
+
+    def __init__(self, client: "FakeFirestoreClient", collection: str, document_id):
+        self.client = client
+        self.collection = collection
+        self.id = document_id  # pylint: disable=invalid-name
+
+    def get(self, field_paths: list[str] = None, timeout: float = None):
+        """Loads the document."""
+        del timeout
+        self.client.count_rpc("get")
+        return FakeDocumentSnapshot(
+            self, self.client.get_stored_document(self), field_paths
+        )
+
+    def set(self, document_data: dict, merge: bool = False, timeout: float = None):
+        """Creates or overwrites the document."""
+        batch = self.client.batch()
+        batch.set(self, document_data, merge=merge)
+        batch.commit(timeout=timeout)
+
+    def update(self, field_updates: dict, option=None, timeout: float = None):
+        """Updates fields of an existing document."""
+        batch = self.client.batch()
+        batch.update(self, field_updates, option=option)
+        batch.commit(timeout=timeout)
+
+    def delete(self, option=None, timeout: float = None):
+        """Deletes the document."""
+        batch = self.client.batch()
+        batch.delete(self, option=option)
+        batch.commit(timeout=timeout)
+
+
+class FakeQuery:  # pylint: disable=too-many-instance-attributes
+    """Fake of a collection reference and the queries created from it."""
+
+    ASCENDING = "ASCENDING"
+    DESCENDING = "DESCENDING"
+
+    def __init__(self, client: "FakeFirestoreClient", collection: str) -> None:
+        self.client = client
+        self.collection = collection
+        self.filters = []
+        self.field_paths = None
+        self.orders = []
+        self.cursor = None
+        self.limit_count = None
+
+    def copy(self, **changes) -> "FakeQuery":
+        """Creates a changed copy, as queries are immutable."""
+        query = FakeQuery(self.client, self.collection)
+        query.__dict__.update({**self.__dict__, **changes})
+        return query
+
+    def document(self, document_id: str = None) -> FakeDocumentReference:
+        """Gets the reference of a document in the collection."""
+        return FakeDocumentReference(
+            self.client, self.collection, document_id or str(uuid4())
+        )
+
+    def where(self, filter=None) -> "FakeQuery":  # pylint: disable=redefined-builtin
+        """Restricts the query by a field or an AND composite filter."""
+        filters = (
+            filter.filters if isinstance(filter, BaseCompositeFilter) else [filter]
+        )
+        for field_filter in filters:
+            if not isinstance(field_filter, FieldFilter):
+                raise ValueError(f"Unsupported filter: {field_filter}")
+            if field_filter.op_string not in OPERATORS:
+                raise ValueError(f"Unsupported operator: {field_filter.op_string}")
+        return self.copy(filters=[*self.filters, *filters])
+
+    def select(self, field_paths: list[str]) -> "FakeQuery":
+        """Restricts the loaded fields."""
+        return self.copy(field_paths=list(field_paths))
+
+    def order_by(self, field_path: str, direction: str = ASCENDING) -> "FakeQuery":
+        """Orders the query by the given field."""
+        return self.copy(orders=[*self.orders, (field_path, direction)])
+
+    def start_after(self, document_fields: dict) -> "FakeQuery":
+        """Starts the query after the given values of the ordered fields."""
+        return self.copy(cursor=dict(document_fields))
+
+    def limit(self, count: int) -> "FakeQuery":
+        """Limits the number of loaded documents."""
+        return self.copy(limit_count=count)
+
+    def get(self, timeout: float = None) -> list[FakeDocumentSnapshot]:
+        """Loads all matching documents at once."""
+        return list(self.stream(timeout=timeout))
+
+    def count(self, alias: str = None) -> "FakeAggregationQuery":
+        """Counts the matching documents on the server."""
+        return FakeAggregationQuery(self, alias or "count")
+
+    def stream(self, timeout: float = None):
+        """Loads the matching documents one after another."""
+        del timeout
+        self.client.count_rpc("run_query")
+        for document_id, stored_document in self.get_results():
+            self.client.documents_read += 1
+            yield FakeDocumentSnapshot(
+                self.document(document_id), stored_document, self.field_paths
+            )
+
+    def get_results(self) -> list[tuple]:
+        """Gets the (document id, stored document) results in the order of the query."""
+        documents = self.client.collections.get(self.collection, {})
+        results = [
+            (document_id, stored_document)
+            for document_id, stored_document in documents.items()
+            if all(
+                OPERATORS[field_filter.op_string](
+                    stored_document.data.get(field_filter.field_path),
+                    field_filter.value,
+                )
+                for field_filter in self.filters
+            )
+            and all(
+                order_field == DOCUMENT_ID_FIELD or order_field in stored_document.data
+                for order_field, _ in self.orders
+            )
+        ]
+        orders = self.orders
+        if not any(order_field == DOCUMENT_ID_FIELD for order_field, _ in orders):
+            orders = [*orders, (DOCUMENT_ID_FIELD, self.ASCENDING)]
+        for order_field, direction in reversed(orders):
+            results.sort(
+                key=lambda result, order_field=order_field: get_order_value(
+                    result, order_field
+                ),
+                reverse=direction == self.DESCENDING,
+            )
+        if self.cursor:
+            results = [
+                result for result in results if self.is_after_cursor(result, orders)
+            ]
+        if self.limit_count is not None:
+            results = results[: self.limit_count]
+        return results
+
+    def is_after_cursor(self, result: tuple, orders: list[tuple]) -> bool:
+        """Checks if a result comes after the cursor of the query."""
+        for order_field, direction in orders:
+            value = get_order_value(result, order_field)
+            cursor_value = sort_key(self.cursor.get(order_field))
+            if value != cursor_value:
+                return (value > cursor_value) == (direction == self.ASCENDING)
+        return False
+
+
+@dataclass
+class FakeAggregationResult:
+    """Fake of the result of an aggregation."""
+
+    alias: str
+    value: int
+
+
+@dataclass
+class FakeAggregationQuery:
+    """Fake of a count() aggregation, which does not read the documents."""
+
+    query: FakeQuery
+    alias: str
+
+    def get(self, timeout: float = None) -> list[list[FakeAggregationResult]]:
+        """Runs the aggregation, it is counted as aggregation RPC."""
+        del timeout
+        self.query.client.count_rpc("run_aggregation_query")
+        return [[FakeAggregationResult(self.alias, len(self.query.get_results()))]]
+
+
+def sort_key(value) -> tuple:
+    """Orders missing values first, like Firestore does with null values."""
+    return (0, "") if value is None else (1, value)
+
+
+def get_order_value(result: tuple, order_field: str) -> tuple:
+    """Gets the sort key of a (document id, stored document) result."""
+    document_id, stored_document = result
+    if order_field == DOCUMENT_ID_FIELD:
+        return sort_key(document_id)
+    return sort_key(stored_document.data.get(order_field))
+
+
+@dataclass
+class FakeWriteOption:
+    """Fake of the precondition of a write."""
+
+    last_update_time: datetime = None
+
+
+@dataclass
+class FakeWriteBatch:
+    """Fake of a batch, which applies all writes at once or none of them."""
+
+    client: "FakeFirestoreClient"
+    writes: list = field(default_factory=list)
+
+    def create(self, reference: FakeDocumentReference, document_data: dict) -> None:
+        """Creates a document, fails if it already exists."""
+        self.writes.append(("create", reference, document_data, None))
+
+    def set(
+        self, reference: FakeDocumentReference, document_data: dict, merge=False
+    ) -> None:
+        """Creates or overwrites a document."""
+        write_type = "merge" if merge else "set"
+        self.writes.append((write_type, reference, document_data, None))
+
+    def update(
+        self, reference: FakeDocumentReference, field_updates: dict, option=None
+    ) -> None:
+        """Updates an existing document."""
+        self.writes.append(("update", reference, field_updates, option))
+
+    def delete(self, reference: FakeDocumentReference, option=None) -> None:
+        """Deletes a document."""
+        self.writes.append(("delete", reference, None, option))
+
+    def commit(self, timeout: float = None) -> list:  # pylint: disable=too-many-locals
+        """Applies all writes atomically."""
+        del timeout
+        self.client.count_rpc("commit")
+        # The written documents by (collection, id), None for deleted documents.
+        staged = {}
+        commit_time = self.client.next_update_time()
+        for write_type, reference, data, option in self.writes:
+            key = (reference.collection, reference.id)
+            stored_document = (
+                staged[key]
+                if key in staged
+                else self.client.collections.get(reference.collection, {}).get(
+                    reference.id
+                )
+            )
+            if write_type == "create" and stored_document:
+                raise AlreadyExists(f"Document already exists: {reference.id}")
+            if write_type == "update" and not stored_document:
+                raise NotFound(f"No document to update: {reference.id}")
+            if (
+                option
+                and option.last_update_time
+                and (
+                    not stored_document
+                    or stored_document.update_time != option.last_update_time
+                )
+            ):
+                raise FailedPrecondition(f"Document was modified: {reference.id}")
+
+            if write_type == "delete":
+                staged[key] = None
+                continue
+            new_data = (
+                deepcopy(stored_document.data)
+                if stored_document and write_type in ("merge", "update")
+                else {}
+            )
+            for field_name, value in data.items():
+                if isinstance(value, Increment):
+                    value = new_data.get(field_name, 0) + value.value
+                new_data[field_name] = deepcopy(value)
+            staged[key] = FakeStoredDocument(
+                new_data,
+                stored_document.create_time if stored_document else commit_time,
+                commit_time,
+            )
+
+        for (collection, document_id), stored_document in staged.items():
+            documents = self.client.collections.setdefault(collection, {})
+            if stored_document:
+                documents[document_id] = stored_document
+            else:
+                documents.pop(document_id, None)
+        self.writes = []
+        return []
+
+
+class FakeFirestoreClient(FakeRpcCounter):
+    """In-memory fake of the Firestore client."""
+
+    def __init__(self, latency_seconds: float = 0) -> None:
+        super().__init__(latency_seconds)
+        self.collections = {}
+        self.documents_read = 0
+        self._clock = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+    def collection(self, name: str) -> FakeQuery:
+        """Gets the reference of a collection."""
+        return FakeQuery(self, name)
+
+    def batch(self) -> FakeWriteBatch:
+        """Creates a new write batch."""
+        return FakeWriteBatch(self)
+
+    def write_option(self, last_update_time: datetime = None) -> FakeWriteOption:
+        """Creates the precondition of a write."""
+        return FakeWriteOption(last_update_time)
+
+    def get_all(
+        self, references: list, field_paths: list[str] = None, timeout: float = None
+    ):
+        """Loads multiple documents at once."""
+        del timeout
+        self.count_rpc("batch_get")
+        for reference in references:
+            yield FakeDocumentSnapshot(
+                reference, self.get_stored_document(reference), field_paths
+            )
+
+    def get_stored_document(
+        self, reference: FakeDocumentReference
+    ) -> FakeStoredDocument | None:
+        """Gets the stored state of a document."""
+        stored_document = self.collections.get(reference.collection, {}).get(
+            reference.id
+        )
+        if stored_document:
+            self.documents_read += 1
+        return stored_document
+
+    def next_update_time(self) -> datetime:
+        """Gets a unique, increasing time for the next commit."""
+        self._clock += timedelta(microseconds=1)
+        return self._clock
+
+    def add_documents(self, collection: str, documents: dict[str, dict]) -> None:
+        """Stores documents without counting RPCs, used to prepare datasets.
+        Args:
+            collection -- The name of the collection.
+            documents -- The data of the documents by their ID.
+        """
+        stored_documents = self.collections.setdefault(collection, {})
+        update_time = self.next_update_time()
+        for document_id, data in documents.items():
+            stored_documents[document_id] = FakeStoredDocument(
+                deepcopy(data), update_time, update_time
+            )
+
+    def reset_rpc_counts(self) -> None:
+        """Resets the counted calls and read documents."""
+        super().reset_rpc_counts()
+        self.documents_read = 0
+
+    def patch(self):
+        """Patches firestore.client to return this fake."""
+        return mock.patch("firebase_admin.firestore.client", return_value=self)
+
+
+@dataclass
+class FakeUserRecord:
+    """Fake of a user record of firebase auth."""
+
+    uid: str
+    email: str = None
+    display_name: str = None
+    disabled: bool = False
+    custom_claims: dict = None
+
+
+@dataclass
+class FakeGetUsersResult:
+    """Fake of the result of a bulk user lookup."""
+
+    users: list[FakeUserRecord]
+    not_found: list
+
+
+@dataclass
+class FakeListUsersPage:
+    """Fake of a page of all users."""
+
+    users: list[FakeUserRecord]
+    next_page: "FakeListUsersPage | None" = None
+
+    def iterate_all(self) -> Iterator[FakeUserRecord]:
+        """Gets the users of this and all following pages."""
+        page = self
+        while page:
+            yield from page.users
+            page = page.next_page
+
+
+class FakeAuth(FakeRpcCounter):
+    """In-memory fake of firebase_admin.auth."""
+
+    def __init__(self, latency_seconds: float = 0) -> None:
+        super().__init__(latency_seconds)
+        self.users = {}
+        self.tokens = {}
+
+    def add_user(self, user: FakeUserRecord, token: str = None) -> None:
+        """Adds a user, which can authenticate with the given token.
+        Args:
+            user -- The user record.
+            token -- The ID token of the user, if any.
+        """
+        self.users[user.uid] = user
+        if token:
+            self.tokens[token] = user.uid
+
+    def verify_id_token(self, id_token: str, *args, **kwargs) -> dict:
+        """Decodes a known token, raises a ValueError for unknown tokens."""
+        del args, kwargs
+        self.count_rpc("verify_id_token")
+        if id_token not in self.tokens:
+            raise ValueError("Unknown token")
+        user = self.users[self.tokens[id_token]]
+        return {
+            "user_id": user.uid,
+            "exp": time() + 3600,
+            **(user.custom_claims or {}),
+        }
+
+    def get_user(self, uid: str, *args, **kwargs) -> FakeUserRecord:
+        """Gets a single user."""
+        del args, kwargs
+        self.count_rpc("get_user")
+        if uid not in self.users:
+            raise auth.UserNotFoundError(f"No user record found for: {uid}")
+        return self.users[uid]
+
+    def get_users(self, identifiers: list, *args, **kwargs) -> FakeGetUsersResult:
+        """Gets up to 100 users at once."""
+        del args, kwargs
+        self.count_rpc("get_users")
+        if len(identifiers) > 100:
+            raise ValueError("At most 100 identifiers can be looked up at once.")
+        return FakeGetUsersResult(
+            [self.users[item.uid] for item in identifiers if item.uid in self.users],
+            [item for item in identifiers if item.uid not in self.users],
+        )
+
+    def list_users(self, *args, max_results: int = 1000, **kwargs) -> FakeListUsersPage:
+        """Gets the first page of all users, which links the following pages."""
+        del args, kwargs
+        self.count_rpc("list_users")
+        users = list(self.users.values())
+        page = None
+        for start in reversed(range(0, len(users), max_results)):
+            page = FakeListUsersPage(users[start : start + max_results], page)
+        return page or FakeListUsersPage([])
+
+    def set_custom_user_claims(self, uid: str, custom_claims: dict, **kwargs) -> None:
+        """Sets the claims (roles) of a user."""
+        del kwargs
+        self.count_rpc("set_custom_user_claims")
+        self.get_user(uid).custom_claims = custom_claims
+
+    def update_user(self, uid: str, **kwargs) -> FakeUserRecord:
+        """Updates the attributes of a user."""
+        self.count_rpc("update_user")
+        user = self.get_user(uid)
+        for key, value in kwargs.items():
+            setattr(user, key, value)
+        return user
+
+    def patch(self):
+        """Patches the used functions of firebase_admin.auth with this fake."""
+        return mock.patch.multiple(
+            "firebase_admin.auth",
+            verify_id_token=self.verify_id_token,
+            get_user=self.get_user,
+            get_users=self.get_users,
+            list_users=self.list_users,
+            set_custom_user_claims=self.set_custom_user_claims,
+            update_user=self.update_user,
+        )
@@ -12,8 +12,18 @@ class MockUserReference:  # pylint: disable=R0903
     disabled: bool = False
     custom_claims: dict = {"admin": True}
 
-    def __init__(self, display_name) -> None:
+    def __init__(self, display_name, uid="uid") -> None:
         self.display_name = display_name
+        self.uid = uid
+
+
+class MockGetUsersResult:  # pylint: disable=R0903
+    """Mock implementation of the result of a bulk user lookup."""
+
+    users: list[MockUserReference]
+
+    def __init__(self, users) -> None:
+        self.users = users
 
 
 class MockDocReference:  # pylint: disable=R0903
@@ -23,6 +33,7 @@ class MockDocReference:  # pylint: disable=R0903
     id: str
     name: str
     additional_attributes: dict
+    update_time: str = None
 
     def __init__(
         self, exists, identifier=None, name=None, additional_attributes=None
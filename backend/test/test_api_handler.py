@@ -1,6 +1,7 @@
 """
     Testing the api handler for the Cloud Function.
 """
+import json
 from unittest import mock
 from unittest.mock import patch
 import flask
@@ -9,7 +10,7 @@ from firebase_admin import exceptions
 from backend.test.mocks import MockUserReference
 import api_handler
 from enums import Role
-from auth_utils import UserInfo
+from auth_utils import UserInfo, user_name_cache
 
 
 class MockExportedUserReference:  # pylint: disable=R0903
@@ -68,7 +69,9 @@ class TestApiHandler:  # pylint: disable=R0904
             "/api/setRole",
             method="PUT",
             json={"target_user_id": "dummy-id", "role": role},
-        ), mock.patch("firebase_admin.auth.set_custom_user_claims"):
+        ), mock.patch("firebase_admin.auth.set_custom_user_claims"), mock.patch(
+            "db_operator.DatabaseOperator.increment_versions"
+        ) as increment_mock:
             res = api_handler.api_handler(
                 flask.request,
                 ["api", "setRole"],
@@ -78,11 +81,12 @@ class TestApiHandler:  # pylint: disable=R0904
                 },
                 UserInfo("123", [Role.ADMIN]),
             )
-            assert res[0] == '{"id": "dummy-id"}'
+            assert json.loads(res[0]) == {"id": "dummy-id"}
             assert res[1] == 200
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
             assert res[2].get("Access-Control-Allow-Methods") == "PUT"
+            increment_mock.assert_called_once_with("user")
 
     def test_set_role_successful_editor(self, app) -> None:
         """Tests a successful request to set a user role to editor."""
@@ -230,12 +234,56 @@ class TestApiHandler:  # pylint: disable=R0904
                 },
                 UserInfo("456", [Role.ADMIN]),
             )
-            assert res[0] == '{"id": "dummy-id"}'
+            assert json.loads(res[0]) == {"id": "dummy-id"}
             assert res[1] == 200
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Methods") == "PUT"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
 
+    def test_update_user_invalidates_cached_user_name(self, app) -> None:
+        """Tests that updating a user removes the cached user name."""
+        user_name_cache.set("dummy-id", "Old Dummy Name")
+        with app.test_request_context(
+            "/api/updateUser",
+            method="PUT",
+            json={
+                "target_user_id": "dummy-id",
+                "display_name": "Dummy Name",
+                "email": "dummy@test.de",
+            },
+        ), mock.patch("firebase_admin.auth.update_user"):
+            res = api_handler.api_handler(
+                flask.request,
+                ["api", "updateUser"],
+                {
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Credentials": "true",
+                },
+                UserInfo("456", [Role.ADMIN]),
+            )
+            assert res[1] == 200
+            assert user_name_cache.get("dummy-id") is None
+
+    def test_set_role_invalidates_cached_user_name(self, app) -> None:
+        """Tests that setting a role removes the cached user name."""
+        user_name_cache.set("dummy-id", "Dummy Name")
+        with app.test_request_context(
+            "/api/setRole",
+            method="PUT",
+            json={"target_user_id": "dummy-id", "role": "editor"},
+        ), mock.patch("firebase_admin.auth.set_custom_user_claims"):
+            res = api_handler.api_handler(
+                flask.request,
+                ["api", "setRole"],
+                {
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Credentials": "true",
+                },
+                UserInfo("123", [Role.ADMIN]),
+            )
+            assert res[1] == 200
+            assert user_name_cache.get("dummy-id") is None
+
     def test_update_user_failing_incomplete_body(self, app) -> None:
         """
         Tests a failing request to update a user.
@@ -374,7 +422,7 @@ class TestApiHandler:  # pylint: disable=R0904
                 },
                 UserInfo("789", [Role.ADMIN]),
             )
-            assert res[0] == [
+            assert json.loads(res[0]) == [
                 {
                     "id": "uid",
                     "email": "email",
@@ -482,7 +530,7 @@ class TestApiHandler:  # pylint: disable=R0904
                 },
                 UserInfo("789", [Role.ADMIN]),
             )
-            assert res[0] == {
+            assert json.loads(res[0]) == {
                 "id": "uid",
                 "email": "email",
                 "display_name": "Dummy Name",
@@ -518,3 +566,53 @@ class TestApiHandler:  # pylint: disable=R0904
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
             assert res[2].get("Access-Control-Allow-Methods") == "GET"
+
+    def test_get_ticket_stats_success(self, app) -> None:
+        """Tests a successful request of the ticket statistics."""
+        stats = {"group_by": "status", "filters": {}, "counts": {"OPEN": 2}}
+        with app.test_request_context(
+            "/api/stats/tickets?group_by=status", method="GET"
+        ), mock.patch(
+            "api_handler.get_etag", return_value='"etag"'
+        ), mock.patch(
+            "api_handler.count_tickets", return_value=(200, stats)
+        ) as count_mock:
+            res = api_handler.api_handler(
+                flask.request,
+                ["api", "stats", "tickets"],
+                {"Access-Control-Allow-Origin": "*"},
+                UserInfo("789", [Role.REQUESTER]),
+            )
+            assert json.loads(res[0]) == stats
+            assert res[1] == 200
+            assert res[2].get("ETag") == '"etag"'
+            assert count_mock.call_args.args[0].user_info.user_id == "789"
+
+    def test_get_ticket_stats_not_modified(self, app) -> None:
+        """Tests that unchanged statistics are not counted again."""
+        with app.test_request_context(
+            "/api/stats/tickets", method="GET", headers={"If-None-Match": '"etag"'}
+        ), mock.patch(
+            "api_handler.get_etag", return_value='"etag"'
+        ), mock.patch(
+            "api_handler.count_tickets"
+        ) as count_mock:
+            res = api_handler.api_handler(
+                flask.request,
+                ["api", "stats", "tickets"],
+                {"Access-Control-Allow-Origin": "*"},
+                UserInfo("789", [Role.EDITOR]),
+            )
+            assert res[1] == 304
+            count_mock.assert_not_called()
+
+    def test_get_ticket_stats_failing_invalid_group(self, app) -> None:
+        """Tests that the statistics can only be grouped by known dimensions."""
+        with app.test_request_context("/api/stats/tickets?group_by=title"):
+            res = api_handler.api_handler(
+                flask.request,
+                ["api", "stats", "tickets"],
+                {"Access-Control-Allow-Origin": "*"},
+                UserInfo("789", [Role.EDITOR]),
+            )
+            assert res[1] == 400
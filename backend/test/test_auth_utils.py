@@ -3,13 +3,22 @@
 """
 import os
 from unittest import mock
+from time import time
 import flask
-from backend.test.mocks import MockUserReference
-from auth_utils import is_authenticated, get_user_name_by_id
+from firebase_admin import exceptions
+from firebase_admin._token_gen import ID_TOKEN_CERT_URI
+from backend.test.mocks import MockGetUsersResult, MockUserReference
+from auth_utils import (
+    is_authenticated,
+    get_user_names_by_ids,
+    prefetch_certificates,
+    token_cache,
+    user_name_cache,
+)
 from enums import Role
 
 
-class TestAuthUtils:
+class TestAuthUtils:  # pylint: disable=R0904
     """Contains tests for the autentication utilites."""
 
     def test_disabled_authentication(self, app) -> None:
@@ -49,7 +58,9 @@ class TestAuthUtils:
             assert status_code is None
             assert error_message is None
             logger_mock.assert_called_with(
-                "Successfully Authenticated user with ID: firebase_generated_user_id"
+                "Successfully Authenticated user with ID: %s",
+                args=("firebase_generated_user_id",),
+                sampled=True,
             )
 
     def test_no_token_provided(self, app) -> None:
@@ -78,23 +89,159 @@ class TestAuthUtils:
             assert status_code == 403
             assert error_message == "Invalid Token: Error"
 
-    def test_get_user_name_success(self) -> None:
-        """Tests that we get the user name of a given user_id."""
-        with mock.patch("firebase_admin.auth.get_user") as user_mock:
-            user_mock.return_value = MockUserReference("Dummy Name")
-            display_name = get_user_name_by_id("user_dummy_id")
-            assert display_name == "Dummy Name"
-
-    def test_get_user_name_fail_value_error(self) -> None:
-        """Tests that we receive a value even if an error occurs."""
-        with mock.patch("firebase_admin.auth.get_user") as user_mock:
-            user_mock.side_effect = ValueError("Error")
-            display_name = get_user_name_by_id("user_dummy_id")
-            assert display_name == "Unknown"
-
-    def test_get_user_name_empty_display_name(self) -> None:
-        """Tests that we receive a value even if the display name is unset."""
-        with mock.patch("firebase_admin.auth.get_user") as user_mock:
-            user_mock.return_value = MockUserReference("")
-            display_name = get_user_name_by_id("user_dummy_id")
-            assert display_name == "Unknown"
+    def test_get_user_names_success(self) -> None:
+        """Tests that the user names of multiple users are loaded at once."""
+        with mock.patch("firebase_admin.auth.get_users") as users_mock:
+            users_mock.return_value = MockGetUsersResult(
+                [
+                    MockUserReference("Dummy Name", "user_dummy_id"),
+                    MockUserReference("", "user_without_name_id"),
+                ]
+            )
+            user_names = get_user_names_by_ids(
+                [
+                    "user_dummy_id",
+                    None,
+                    "user_without_name_id",
+                    "user_dummy_id",
+                    "unknown_user_id",
+                ]
+            )
+
+            assert user_names == {
+                "user_dummy_id": "Dummy Name",
+                "user_without_name_id": "Unknown",
+                "unknown_user_id": "Unknown",
+            }
+            users_mock.assert_called_once()
+
+    def test_get_user_names_chunked(self) -> None:
+        """Tests that the user names are loaded in chunks of at most 100 users."""
+        with mock.patch("firebase_admin.auth.get_users") as users_mock:
+            users_mock.return_value = MockGetUsersResult([])
+            get_user_names_by_ids([f"user_{index}" for index in range(250)])
+
+            assert users_mock.call_count == 3
+            # The chunks are looked up concurrently, so their order may differ.
+            assert sorted(
+                len(call.args[0]) for call in users_mock.call_args_list
+            ) == [50, 100, 100]
+
+    def test_get_user_names_fail_firebase_error(self) -> None:
+        """Tests that we receive values even if an error occurs."""
+        with mock.patch("firebase_admin.auth.get_users") as users_mock:
+            users_mock.side_effect = exceptions.FirebaseError("UNKNOWN", "Error")
+            user_names = get_user_names_by_ids(["user_dummy_id"])
+
+            assert user_names == {"user_dummy_id": "Unknown"}
+
+    def test_get_user_names_empty(self) -> None:
+        """Tests that no request is made without user IDs."""
+        with mock.patch("firebase_admin.auth.get_users") as users_mock:
+            assert not get_user_names_by_ids([None, ""])
+            users_mock.assert_not_called()
+
+    def test_get_user_names_only_loads_uncached(self) -> None:
+        """Tests that only the user names missing in the cache are requested."""
+        user_name_cache.set("cached_user_id", "Cached Name")
+        with mock.patch("firebase_admin.auth.get_users") as users_mock:
+            users_mock.return_value = MockGetUsersResult(
+                [MockUserReference("Dummy Name", "user_dummy_id")]
+            )
+            user_names = get_user_names_by_ids(
+                ["cached_user_id", "user_dummy_id", "unknown_user_id"]
+            )
+            assert user_names == {
+                "cached_user_id": "Cached Name",
+                "user_dummy_id": "Dummy Name",
+                "unknown_user_id": "Unknown",
+            }
+            assert [
+                identifier.uid for identifier in users_mock.call_args.args[0]
+            ] == ["user_dummy_id", "unknown_user_id"]
+
+            get_user_names_by_ids(["user_dummy_id", "unknown_user_id"])
+            users_mock.assert_called_once()
+
+    def test_verified_token_cached(self, app) -> None:
+        """Tests that a verified token is only verified once until it expires."""
+        os.environ["DISABLE_AUTH"] = "False"
+        with mock.patch(
+            "firebase_admin.auth.verify_id_token"
+        ) as verify_mock, app.test_request_context(
+            method="GET", environ_base={"HTTP_AUTHORIZATION": "Bearer cached_token"}
+        ):
+            verify_mock.return_value = {
+                "user_id": "cached_user_id",
+                "editor": True,
+                "exp": time() + 3600,
+            }
+            first_user_info, _, _ = is_authenticated(flask.request)
+            second_user_info, status_code, _ = is_authenticated(flask.request)
+
+            assert second_user_info == first_user_info
+            assert second_user_info.roles == [Role.EDITOR]
+            assert status_code is None
+            verify_mock.assert_called_once_with("cached_token")
+            assert token_cache.stats()["hits"] == 1
+
+    def test_expired_token_not_cached(self, app) -> None:
+        """Tests that a token without remaining lifetime is verified on every request."""
+        os.environ["DISABLE_AUTH"] = "False"
+        with mock.patch(
+            "firebase_admin.auth.verify_id_token"
+        ) as verify_mock, app.test_request_context(
+            method="GET", environ_base={"HTTP_AUTHORIZATION": "Bearer expired_token"}
+        ):
+            verify_mock.return_value = {"user_id": "user_id", "exp": time() - 1}
+            is_authenticated(flask.request)
+            is_authenticated(flask.request)
+
+            assert verify_mock.call_count == 2
+            assert token_cache.stats()["size"] == 0
+
+    def test_invalid_token_not_cached(self, app) -> None:
+        """Tests that a failed verification is not cached."""
+        os.environ["DISABLE_AUTH"] = "False"
+        with mock.patch(
+            "firebase_admin.auth.verify_id_token"
+        ) as verify_mock, app.test_request_context(
+            method="GET", environ_base={"HTTP_AUTHORIZATION": "Bearer invalid_token"}
+        ):
+            verify_mock.side_effect = ValueError("Error")
+            is_authenticated(flask.request)
+            user_info, status_code, _ = is_authenticated(flask.request)
+
+            assert user_info is None
+            assert status_code == 403
+            assert verify_mock.call_count == 2
+
+    def test_prefetch_certificates(self) -> None:
+        """Tests that the certificates are loaded with the request of the verifier."""
+        with mock.patch.dict(os.environ, {"DISABLE_AUTH": "False"}), mock.patch(
+            "firebase_admin.auth._get_client"
+        ) as client_mock:
+            prefetch_certificates()
+
+            token_verifier = (
+                client_mock.return_value._token_verifier  # pylint: disable=W0212
+            )
+            token_verifier.request.assert_called_once_with(ID_TOKEN_CERT_URI)
+
+    def test_prefetch_certificates_failing(self) -> None:
+        """Tests that a failed prefetch is only logged."""
+        with mock.patch.dict(os.environ, {"DISABLE_AUTH": "False"}), mock.patch(
+            "firebase_admin.auth._get_client", side_effect=ValueError("No app")
+        ), mock.patch("auth_utils.logger") as logger_mock:
+            prefetch_certificates()
+
+            logger_mock.warn.assert_called_once()
+
+    def test_prefetch_certificates_disabled_authentication(self) -> None:
+        """Tests that no certificates are loaded, if authentication is disabled."""
+        with mock.patch.dict(os.environ, {"DISABLE_AUTH": "True"}), mock.patch(
+            "firebase_admin.auth._get_client"
+        ) as client_mock:
+            prefetch_certificates()
+
+            client_mock.assert_not_called()
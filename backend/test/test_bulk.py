@@ -0,0 +1,372 @@
+"""
+    Testing the bulk creation and update of entries.
+"""
+from unittest import mock
+from google.cloud.firestore_v1.base_query import FieldFilter
+import pytest
+from backend.test.fakes import FakeFirestoreClient
+from auth_utils import UserInfo
+from bulk import (
+    BulkUpdate,
+    get_bulk_response,
+    get_bulk_update_response,
+    parse_bulk_items,
+    parse_bulk_update,
+)
+from data_model import Course, TicketHistory
+from db_operator import DatabaseOperator
+from enrichment import enrichment_executor
+from enums import Role
+from unique_keys import UNIQUE_KEY_COLLECTION, get_unique_fields, get_unique_key
+
+
+class TestBulk:
+    """Contains tests for the bulk requests."""
+
+    @pytest.fixture(name="firestore_client")
+    def fixture_firestore_client(self):
+        """Creates a fake Firestore with a stored course, comment and tickets."""
+        firestore_client = FakeFirestoreClient()
+        course = {"course_abbreviation": "ISEF01", "name": "Software Engineering"}
+        firestore_client.add_documents("course", {"stored_course": course})
+        firestore_client.add_documents(
+            UNIQUE_KEY_COLLECTION,
+            {
+                get_unique_key("course", ["course_abbreviation"], course): {
+                    "collection": "course",
+                    "document_id": "stored_course",
+                }
+            },
+        )
+        firestore_client.add_documents(
+            "comment", {"stored_comment": {"content": "Done", "ticket_id": "ticket_1"}}
+        )
+        firestore_client.add_documents(
+            "ticket",
+            {
+                f"ticket_{index}": {
+                    "title": f"Ticket {index}",
+                    "status": "DONE" if index % 2 else "OPEN",
+                    "assignee_id": "editor_id",
+                }
+                for index in range(6)
+            },
+        )
+        with firestore_client.patch():
+            firestore_client.reset_rpc_counts()
+            yield firestore_client
+
+    @pytest.fixture(name="database_operator")
+    def fixture_database_operator(self, firestore_client) -> DatabaseOperator:
+        """Creates the operator of an admin on the fake Firestore."""
+        del firestore_client
+        return DatabaseOperator(UserInfo("admin_id", [Role.ADMIN]))
+
+    def test_parse_bulk_items(self) -> None:
+        """Tests that every item is validated on its own."""
+        items, error_message = parse_bulk_items(
+            [{"content": "A", "ticket_id": "t", "unknown": 1}, {"content": "B"}, "C"],
+            ["content", "ticket_id"],
+        )
+
+        assert error_message is None
+        assert items[0] == {"content": "A", "ticket_id": "t"}
+        assert items[1].startswith("Not all required fields are provided!")
+        assert items[2] == items[1]
+
+    @pytest.mark.parametrize("body", [None, [], {"content": "A"}, [{}] * 501])
+    def test_parse_bulk_items_invalid(self, body) -> None:
+        """Tests that only a non-empty array of limited size is accepted."""
+        items, error_message = parse_bulk_items(body, ["content"])
+
+        assert items is None
+        assert error_message
+
+    def test_get_bulk_response(self) -> None:
+        """Tests that the results are returned in the order of the request."""
+        assert get_bulk_response(
+            [{"content": "A"}, "Invalid", {"content": "B"}],
+            [(201, "new_id"), (500, "Timeout")],
+        ) == {
+            "items": [
+                {"status": 201, "id": "new_id"},
+                {"status": 400, "message": "Invalid"},
+                {"status": 500, "message": "Timeout"},
+            ]
+        }
+
+    def test_create_many_unique_keys(self, database_operator, firestore_client) -> None:
+        """Tests that courses are checked by their unique keys with one request."""
+        courses = [
+            {"course_abbreviation": f"NEW{index % 300}", "name": "New"}
+            for index in range(400)
+        ] + [{"course_abbreviation": "ISEF01", "name": "Other"}]
+
+        response_code, results = database_operator.create_many(
+            "course",
+            courses,
+            ["course_abbreviation", "name"],
+            get_unique_fields(Course),
+        )
+
+        assert response_code == 200
+        assert [code for code, _ in results].count(201) == 300
+        assert results[300] == (409, results[0][1])
+        assert results[-1] == (409, "stored_course")
+        assert firestore_client.rpc_counts["batch_get"] == 1
+        # 249 courses with their unique keys fit into one batch.
+        assert firestore_client.rpc_counts["commit"] == 2
+        assert len(firestore_client.collections["course"]) == 301
+
+    def test_create_many_duplicate_queries(
+        self, database_operator, firestore_client
+    ) -> None:
+        """Tests that other entities are checked by chunked in queries."""
+        comments = [
+            {"content": f"Comment {index}", "ticket_id": "ticket_1"}
+            for index in range(40)
+        ] + [
+            {"content": "Done", "ticket_id": "ticket_1"},
+            {"content": "Done", "ticket_id": "ticket_2"},
+        ]
+
+        response_code, results = database_operator.create_many(
+            "comment", comments, ["content", "ticket_id"]
+        )
+
+        assert response_code == 200
+        assert results[-2] == (409, "stored_comment")
+        assert results[-1][0] == 201
+        # The existence check of the collection and two chunks of 30 contents.
+        assert firestore_client.rpc_counts["run_query"] == 3
+        assert firestore_client.rpc_counts["commit"] == 1
+        stored_comment = firestore_client.collections["comment"][results[0][1]].data
+        assert stored_comment["created_by"] == "admin_id"
+
+    def test_create_many_failing_commit(self, database_operator) -> None:
+        """Tests that the entries of a failed batch and their duplicates fail."""
+        with mock.patch.object(
+            DatabaseOperator, "commit_entries", return_value="Timed out!"
+        ):
+            response_code, results = database_operator.create_many(
+                "comment",
+                [{"content": "A", "ticket_id": "t"}] * 2,
+                ["content", "ticket_id"],
+            )
+
+        assert response_code == 200
+        assert results == [(500, "Timed out!"), (500, "Timed out!")]
+
+    def test_create_many_slow_commit(self, database_operator, firestore_client) -> None:
+        """Tests that slow commits are awaited beyond the enrichment deadline."""
+        firestore_client.latency_seconds = 0.05
+        with mock.patch("db_operator.MAX_BATCH_WRITES", 3), mock.patch.object(
+            enrichment_executor, "timeout_seconds", 0.01
+        ):
+            response_code, results = database_operator.create_many(
+                "comment",
+                [
+                    {"content": f"Comment {index}", "ticket_id": "t"}
+                    for index in range(4)
+                ],
+                ["content", "ticket_id"],
+            )
+
+        assert response_code == 200
+        assert [code for code, _ in results] == [201] * 4
+        # Both commits finished before the results were returned.
+        assert firestore_client.rpc_counts["commit"] == 2
+        assert len(firestore_client.collections["comment"]) == 5
+
+    def test_create_many_failing_duplicate_check(self, database_operator) -> None:
+        """Tests that nothing is created if the duplicates cannot be checked."""
+        with mock.patch.object(
+            DatabaseOperator, "find_duplicates", side_effect=TimeoutError("Timeout")
+        ):
+            response_code, message = database_operator.create_many(
+                "comment", [{"content": "A", "ticket_id": "t"}], ["content"]
+            )
+
+        assert response_code == 500
+        assert message == "Could not check for duplicates!"
+
+    def test_create_many_unknown_collection(self, database_operator) -> None:
+        """Tests that entries are only created in existing collections."""
+        response_code, message = database_operator.create_many(
+            "ticket_history", [{"ticket_id": "A"}], ["ticket_id"]
+        )
+
+        assert response_code == 500
+        assert message.startswith("Cannot create document!")
+
+    def test_parse_bulk_update(self) -> None:
+        """Tests that the entries are given by unique ids or a filter."""
+        assert parse_bulk_update(
+            {"ids": ["a", "b", "a"], "update": {"status": "DONE"}}, ["status"]
+        ) == (BulkUpdate({"status": "DONE"}, document_ids=["a", "b"]), None)
+        assert parse_bulk_update(
+            {"filter": {"status": "OPEN"}, "update": {"status": "DONE"}}, ["status"]
+        ) == (BulkUpdate({"status": "DONE"}, filters={"status": "OPEN"}), None)
+
+    @pytest.mark.parametrize(
+        ("body", "error_message"),
+        [
+            (["a"], "Body must be an object with the update and the ids or filter!"),
+            ({"ids": ["a"]}, "Field update must only contain the fields: status"),
+            (
+                {"ids": ["a"], "update": {"title": "New"}},
+                "Field update must only contain the fields: status",
+            ),
+            ({"update": {"status": "DONE"}}, "Either ids or filter must be given!"),
+            (
+                {
+                    "ids": ["a"],
+                    "filter": {"status": "OPEN"},
+                    "update": {"status": "DONE"},
+                },
+                "Either ids or filter must be given!",
+            ),
+            (
+                {"ids": [], "update": {"status": "DONE"}},
+                "Field ids must be a non-empty array of ids!",
+            ),
+            (
+                {
+                    "ids": [str(index) for index in range(501)],
+                    "update": {"status": "DONE"},
+                },
+                "At most 500 entries can be updated at once!",
+            ),
+            (
+                {"filter": {"title": "A"}, "update": {"status": "DONE"}},
+                "Field filter must only contain the fields: status",
+            ),
+        ],
+    )
+    def test_parse_bulk_update_invalid(self, body, error_message: str) -> None:
+        """Tests that invalid bulk updates are rejected as a whole."""
+        assert parse_bulk_update(body, ["status"]) == (None, error_message)
+
+    def test_get_bulk_update_response(self) -> None:
+        """Tests that only failed updates contain a message."""
+        assert get_bulk_update_response(
+            {"ticket_1": (200, "ticket_1"), "unknown": (404, "Element not found!")}
+        ) == {
+            "items": [
+                {"id": "ticket_1", "status": 200},
+                {"id": "unknown", "status": 404, "message": "Element not found!"},
+            ]
+        }
+
+    def test_update_many_ids(self, database_operator, firestore_client) -> None:
+        """Tests that only changed entries are written with their history entries."""
+        response_code, results = database_operator.update_many(
+            "ticket",
+            {"status": "DONE"},
+            ["ticket_0", "ticket_1", "ticket_2", "unknown"],
+            history_type=TicketHistory,
+        )
+
+        assert response_code == 200
+        assert results == {
+            "ticket_0": (200, "ticket_0"),
+            "ticket_1": (200, "ticket_1"),
+            "ticket_2": (200, "ticket_2"),
+            "unknown": (404, "Element not found!"),
+        }
+        assert firestore_client.rpc_counts["batch_get"] == 1
+        assert firestore_client.rpc_counts["commit"] == 1
+        tickets = firestore_client.collections["ticket"]
+        assert tickets["ticket_0"].data["status"] == "DONE"
+        assert tickets["ticket_0"].data["title"] == "Ticket 0"
+        assert tickets["ticket_0"].data["modified_by"] == "admin_id"
+        history_entries = [
+            stored_document.data
+            for stored_document in firestore_client.collections[
+                "ticket_history"
+            ].values()
+        ]
+        assert sorted(entry["ticket_id"] for entry in history_entries) == [
+            "ticket_0",
+            "ticket_2",
+        ]
+        assert history_entries[0]["changed_values"] == {"status": "DONE"}
+        assert history_entries[0]["previous_values"] == {"status": "OPEN"}
+
+    def test_update_many_filter(self, database_operator, firestore_client) -> None:
+        """Tests that the entries matching a filter are updated in batches."""
+        with mock.patch("db_operator.MAX_BATCH_WRITES", 4):
+            response_code, results = database_operator.update_many(
+                "ticket",
+                {"assignee_id": "other_id"},
+                filters=[FieldFilter("status", "==", "OPEN")],
+                limit=3,
+                history_type=TicketHistory,
+            )
+
+        assert response_code == 200
+        assert sorted(results) == ["ticket_0", "ticket_2", "ticket_4"]
+        assert firestore_client.rpc_counts["run_query"] == 1
+        # One ticket with its history entry fits into a batch with the versions.
+        assert firestore_client.rpc_counts["commit"] == 3
+        tickets = firestore_client.collections["ticket"]
+        assert tickets["ticket_0"].data["assignee_id"] == "other_id"
+        assert tickets["ticket_1"].data["assignee_id"] == "editor_id"
+
+    def test_update_many_slow_commit(self, database_operator, firestore_client) -> None:
+        """Tests that slow commits are awaited beyond the enrichment deadline."""
+        firestore_client.latency_seconds = 0.05
+        with mock.patch("db_operator.MAX_BATCH_WRITES", 4), mock.patch.object(
+            enrichment_executor, "timeout_seconds", 0.01
+        ):
+            response_code, results = database_operator.update_many(
+                "ticket",
+                {"status": "DONE"},
+                ["ticket_0", "ticket_2"],
+                history_type=TicketHistory,
+            )
+
+        assert response_code == 200
+        assert results == {"ticket_0": (200, "ticket_0"), "ticket_2": (200, "ticket_2")}
+        # Both commits finished before the results were returned.
+        assert firestore_client.rpc_counts["commit"] == 2
+        assert len(firestore_client.collections["ticket_history"]) == 2
+
+    def test_update_many_filter_limit(self, database_operator) -> None:
+        """Tests that too many matching entries are rejected."""
+        response_code, message = database_operator.update_many(
+            "ticket",
+            {"assignee_id": "other_id"},
+            filters=[FieldFilter("status", "==", "OPEN")],
+            limit=2,
+        )
+
+        assert response_code == 400
+        assert message == "More than 2 entries match the filter!"
+
+    def test_commit_updates_modified(self, database_operator, firestore_client) -> None:
+        """Tests that only the entries modified since they were read fail."""
+        snapshots = list(
+            firestore_client.get_all(
+                [
+                    firestore_client.collection("ticket").document(document_id)
+                    for document_id in ["ticket_0", "ticket_2"]
+                ],
+                ["status"],
+            )
+        )
+        firestore_client.add_documents("ticket", {"ticket_2": {"status": "IN REVIEW"}})
+        firestore_client.reset_rpc_counts()
+
+        results = database_operator.commit_updates(
+            "ticket",
+            [(snapshot, {"status": "DONE"}) for snapshot in snapshots],
+            TicketHistory,
+        )
+
+        assert results == [
+            (200, "ticket_0"),
+            (412, "Element was modified in the meantime!"),
+        ]
+        assert firestore_client.rpc_counts["commit"] == 3
+        assert len(firestore_client.collections["ticket_history"]) == 1
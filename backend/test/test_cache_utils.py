@@ -0,0 +1,62 @@
+"""
+    Testing the cache utility methods.
+"""
+from unittest import mock
+from cache_utils import TTLCache
+
+
+class TestCacheUtils:
+    """Contains tests for the cache utilities."""
+
+    def test_get_and_set(self) -> None:
+        """Tests that stored values can be loaded and are counted."""
+        cache = TTLCache()
+        cache.set("key", "value")
+
+        assert cache.get("key") == "value"
+        assert cache.get("unknown") is None
+        assert cache.get("unknown", "default") == "default"
+        assert cache.stats() == {"hits": 1, "misses": 2, "evictions": 0, "size": 1}
+
+    def test_expired_entries(self) -> None:
+        """Tests that entries expire after their time to live."""
+        cache = TTLCache(ttl_seconds=10)
+        with mock.patch("cache_utils.monotonic") as time_mock:
+            time_mock.return_value = 100
+            cache.set("key", "value")
+            cache.set("short_key", "value", ttl_seconds=1)
+
+            time_mock.return_value = 105
+            assert cache.get("key") == "value"
+            assert cache.get("short_key") is None
+
+            time_mock.return_value = 110
+            assert cache.get("key") is None
+            assert cache.stats()["size"] == 0
+
+    def test_least_recently_used_evicted(self) -> None:
+        """Tests that the least recently used entry is evicted when the cache is full."""
+        cache = TTLCache(max_size=2)
+        cache.set("first", 1)
+        cache.set("second", 2)
+        cache.get("first")
+        cache.set("third", 3)
+
+        assert cache.get("first") == 1
+        assert cache.get("second") is None
+        assert cache.get("third") == 3
+        assert cache.stats()["evictions"] == 1
+
+    def test_invalidate_and_clear(self) -> None:
+        """Tests that entries can be removed."""
+        cache = TTLCache()
+        cache.set("first", 1)
+        cache.set("second", 2)
+
+        cache.invalidate("first")
+        assert cache.get("first") is None
+        assert cache.get("second") == 2
+
+        cache.clear()
+        assert cache.get("second") is None
+        assert cache.stats() == {"hits": 0, "misses": 1, "evictions": 0, "size": 0}
@@ -0,0 +1,68 @@
+"""
+    Testing the collection registry.
+"""
+from unittest import mock
+from collection_registry import CollectionRegistry
+
+
+class TestCollectionRegistry:
+    """Contains tests for the collection registry."""
+
+    def test_register(self) -> None:
+        """Tests that only registered collections are known."""
+        registry = CollectionRegistry()
+        registry.register("course", "ticket")
+
+        assert registry.is_registered("course") is True
+        assert registry.is_registered("ticket") is True
+        assert registry.is_registered("unknown") is False
+
+    def test_exists_unregistered_without_probe(self) -> None:
+        """Tests that unregistered collections are not probed."""
+        registry = CollectionRegistry()
+        db_client = mock.Mock()
+
+        assert registry.exists(db_client, "unknown") is False
+        db_client.collection.assert_not_called()
+
+    def test_exists_empty_collection(self) -> None:
+        """Tests that an empty collection does not exist and is not cached."""
+        registry = CollectionRegistry()
+        registry.register("course")
+        db_client = mock.Mock()
+        db_client.collection().limit().get.return_value = []
+
+        assert registry.exists(db_client, "course") is False
+        assert registry.exists(db_client, "course") is False
+        assert db_client.collection().limit().get.call_count == 2
+
+    def test_exists_cached_until_expired(self) -> None:
+        """Tests that the existence check is cached for the time to live."""
+        registry = CollectionRegistry(ttl_seconds=60)
+        registry.register("course")
+        db_client = mock.Mock()
+        db_client.collection().limit().get.return_value = ["document"]
+
+        with mock.patch("collection_registry.monotonic") as time_mock:
+            time_mock.return_value = 100
+            assert registry.exists(db_client, "course") is True
+            time_mock.return_value = 159
+            assert registry.exists(db_client, "course") is True
+            assert db_client.collection().limit().get.call_count == 1
+
+            time_mock.return_value = 161
+            assert registry.exists(db_client, "course") is True
+            assert db_client.collection().limit().get.call_count == 2
+
+    def test_invalidate(self) -> None:
+        """Tests that invalidated collections are probed again."""
+        registry = CollectionRegistry()
+        registry.register("course")
+        db_client = mock.Mock()
+        db_client.collection().limit().get.return_value = ["document"]
+
+        registry.exists(db_client, "course")
+        registry.invalidate("course")
+        registry.exists(db_client, "course")
+
+        assert db_client.collection().limit().get.call_count == 2
@@ -0,0 +1,76 @@
+"""
+    Testing the response compression methods.
+"""
+import gzip
+import json
+from unittest import mock
+from compression import compress_response, negotiate_encoding
+
+
+class TestCompression:
+    """Contains tests for the response compression."""
+
+    def test_negotiate_encoding(self) -> None:
+        """Tests that gzip is selected if the client accepts it."""
+        with mock.patch("compression.brotli", None):
+            assert negotiate_encoding("gzip, deflate, br") == "gzip"
+            assert negotiate_encoding("*") == "gzip"
+            assert negotiate_encoding("gzip;q=0, deflate") is None
+            assert negotiate_encoding("identity") is None
+            assert negotiate_encoding(None) is None
+
+    def test_negotiate_encoding_brotli(self) -> None:
+        """Tests that brotli is preferred if it is installed."""
+        with mock.patch("compression.brotli"):
+            assert negotiate_encoding("gzip, deflate, br") == "br"
+            assert negotiate_encoding("gzip;q=1.0, br;q=0.5") == "gzip"
+            assert negotiate_encoding("gzip, br;q=0") == "gzip"
+
+    def test_compress_response(self) -> None:
+        """Tests that large bodies are compressed and the headers are set."""
+        body = json.dumps([{"description": "Same text " * 20}] * 20)
+        with mock.patch("compression.brotli", None):
+            compressed_body, status_code, headers = compress_response(
+                (body, 200, {"ETag": '"abc"'}), "gzip, br"
+            )
+
+        assert gzip.decompress(compressed_body).decode("utf-8") == body
+        assert len(compressed_body) < len(body)
+        assert status_code == 200
+        assert headers == {
+            "ETag": 'W/"abc"',
+            "Content-Encoding": "gzip",
+            "Vary": "Accept-Encoding",
+        }
+
+    def test_compress_response_small_body(self) -> None:
+        """Tests that bodies below the minimum size are sent uncompressed."""
+        with mock.patch("compression.COMPRESSION_MIN_SIZE", 1024):
+            body, _, headers = compress_response((b'{"id":"1"}', 200, {}), "gzip")
+
+        assert body == b'{"id":"1"}'
+        assert "Content-Encoding" not in headers
+
+    def test_compress_response_without_body(self) -> None:
+        """Tests that responses without a body are not changed."""
+        response = ("", 304, {"ETag": '"abc"'})
+
+        assert compress_response(response, "gzip") is response
+
+    def test_compress_response_serialized_by_flask(self) -> None:
+        """Tests that dict and list bodies are left for flask to serialize."""
+        response = ([{"id": "1"}] * 100, 200, {})
+
+        assert compress_response(response, "gzip") is response
+
+    def test_compress_streamed_response(self) -> None:
+        """Tests that streamed bodies are compressed chunk by chunk."""
+        chunks = iter([b'[{"id":"1"}', b',{"id":"2"}', b"]"])
+        with mock.patch("compression.brotli", None):
+            body, _, headers = compress_response((chunks, 200, {}), "gzip")
+
+            assert headers["Content-Encoding"] == "gzip"
+            assert json.loads(gzip.decompress(b"".join(body))) == [
+                {"id": "1"},
+                {"id": "2"},
+            ]
@@ -0,0 +1,127 @@
+"""
+    Testing the course cache.
+"""
+from unittest import mock
+import pytest
+from backend.test.mocks import MockDocReference
+from course_cache import CourseCache
+
+
+class TestCourseCache:
+    """Contains tests for the course cache."""
+
+    @pytest.fixture(name="client_mock")
+    def fixture_client_mock(self):
+        """Mocks the firestore client returning two courses."""
+        with mock.patch("firebase_admin.firestore.client") as client_mock:
+            client_mock().collection().stream.return_value = [
+                MockDocReference(
+                    True, "course_id", "Course", {"course_abbreviation": "C1"}
+                ),
+                MockDocReference(
+                    True, "another_course_id", "Another", {"course_abbreviation": "C2"}
+                ),
+            ]
+            yield client_mock
+
+    def test_get_loads_snapshot_once(self, client_mock) -> None:
+        """Tests that all courses are loaded with one request."""
+        cache = CourseCache()
+
+        assert cache.get("course_id") == {
+            "name": "Course",
+            "course_abbreviation": "C1",
+        }
+        assert cache.get("another_course_id") == {
+            "name": "Another",
+            "course_abbreviation": "C2",
+        }
+        client_mock().collection().stream.assert_called_once_with(timeout=10)
+
+    def test_get_reloads_after_expiry(self, client_mock) -> None:
+        """Tests that the snapshot is loaded again after the time to live."""
+        cache = CourseCache(ttl_seconds=60)
+        with mock.patch("course_cache.monotonic") as time_mock:
+            time_mock.return_value = 100
+            cache.get("course_id")
+            time_mock.return_value = 159
+            cache.get("course_id")
+            assert client_mock().collection().stream.call_count == 1
+
+            time_mock.return_value = 160
+            cache.get("course_id")
+            assert client_mock().collection().stream.call_count == 2
+
+    def test_get_unknown_course_rate_limited(self, client_mock) -> None:
+        """Tests that unknown courses trigger a reload at most every few seconds."""
+        cache = CourseCache(min_refresh_seconds=10)
+        with mock.patch("course_cache.monotonic") as time_mock:
+            time_mock.return_value = 100
+            assert cache.get("unknown_course_id") is None
+            time_mock.return_value = 105
+            assert cache.get("unknown_course_id") is None
+            assert client_mock().collection().stream.call_count == 1
+
+            time_mock.return_value = 111
+            assert cache.get("unknown_course_id") is None
+            assert client_mock().collection().stream.call_count == 2
+
+    def test_invalidate(self, client_mock) -> None:
+        """Tests that an invalidated snapshot is loaded again."""
+        cache = CourseCache()
+        cache.get("course_id")
+        cache.invalidate()
+        cache.get("course_id")
+
+        assert client_mock().collection().stream.call_count == 2
+
+    def test_get_invalidated_concurrently(self, client_mock) -> None:
+        """Tests that an invalidation during a lookup does not fail the lookup."""
+        cache = CourseCache()
+        cache.get("course_id")
+
+        def invalidate_while_checking() -> bool:
+            cache.invalidate()
+            return False
+
+        with mock.patch.object(
+            cache, "is_expired", side_effect=invalidate_while_checking
+        ):
+            assert cache.get("course_id") == {
+                "name": "Course",
+                "course_abbreviation": "C1",
+            }
+        client_mock().collection().stream.assert_called_once_with(timeout=10)
+
+    def test_get_failing_with_timeout(self, client_mock) -> None:
+        """Tests that no course is returned if the courses cannot be loaded."""
+        client_mock().collection().stream.side_effect = TimeoutError("Timeout Error")
+        cache = CourseCache()
+
+        assert cache.get("course_id") is None
+
+    def test_get_failing_backs_off(self, client_mock) -> None:
+        """Tests that a failed load is only retried after the minimum refresh time."""
+        stream_mock = client_mock().collection().stream
+        stream_mock.side_effect = TimeoutError("Timeout Error")
+        cache = CourseCache(min_refresh_seconds=10)
+        with mock.patch("course_cache.monotonic") as time_mock:
+            time_mock.return_value = 100
+            for _ in range(3):
+                assert cache.get("course_id") is None
+            assert cache.get_ids() is None
+            assert stream_mock.call_count == 1
+
+            stream_mock.side_effect = None
+            time_mock.return_value = 110
+            assert cache.get("course_id")["name"] == "Course"
+            assert stream_mock.call_count == 2
+
+    def test_get_ids(self, client_mock) -> None:
+        """Tests that the ids of all courses are served from the snapshot."""
+        cache = CourseCache()
+
+        assert cache.get_ids() == ["course_id", "another_course_id"]
+        client_mock().collection().stream.side_effect = TimeoutError("Timeout Error")
+        cache.invalidate()
+        assert cache.get_ids() is None
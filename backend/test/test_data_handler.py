@@ -1,13 +1,16 @@
+# pylint: disable=too-many-lines
 """
     Testing the data handler for the Cloud Function.
 """
+import json
 from unittest.mock import patch
 import flask
 import pytest
 import data_handler
 from enums import Role
 from auth_utils import UserInfo
-from data_model import Course
+from data_model import Course, TicketHistory
+from pagination import PageRequest, decode_cursor
 
 
 class TestDataHandler:  # pylint: disable=R0904
@@ -82,7 +85,7 @@ class TestDataHandler:  # pylint: disable=R0904
     def test_get_course_successful(self, app) -> None:
         """Tests a successful GET request to get all course elements."""
         with app.test_request_context("/data/course", method="GET"), patch(
-            "db_operator.DatabaseOperator.read_all",
+            "db_operator.DatabaseOperator.stream_all",
             return_value=(
                 200,
                 [
@@ -100,7 +103,10 @@ class TestDataHandler:  # pylint: disable=R0904
                 },
                 UserInfo("123", [Role.ADMIN]),
             )
-            assert res[0] == '[{"id": "dummy_id"}, {"id": "another_dummy_id"}]'
+            assert json.loads(b"".join(res[0])) == [
+                {"id": "dummy_id"},
+                {"id": "another_dummy_id"},
+            ]
             assert res[1] == 200
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
@@ -109,7 +115,7 @@ class TestDataHandler:  # pylint: disable=R0904
     def test_get_ticket_requester(self, app) -> None:
         """Tests a successful GET request to get all ticket elements created by the requester."""
         with app.test_request_context("/data/ticket", method="GET"), patch(
-            "db_operator.DatabaseOperator.find_all",
+            "db_operator.DatabaseOperator.stream_all",
             return_value=(
                 200,
                 [
@@ -127,16 +133,155 @@ class TestDataHandler:  # pylint: disable=R0904
                 },
                 UserInfo("123", [Role.REQUESTER]),
             )
-            assert res[0] == '[{"id": "dummy_id"}, {"id": "another_dummy_id"}]'
+            assert json.loads(b"".join(res[0])) == [
+                {"id": "dummy_id"},
+                {"id": "another_dummy_id"},
+            ]
             assert res[1] == 200
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
             assert res[2].get("Access-Control-Allow-Methods") == "GET"
 
+    def test_get_course_paginated(self, app) -> None:
+        """Tests a successful GET request to get a page of course elements."""
+        elements = [
+            {"id": "dummy_id", "name": "A"},
+            {"id": "another_dummy_id", "name": "B"},
+            {"id": "third_dummy_id", "name": "C"},
+        ]
+        with patch(
+            "db_operator.DatabaseOperator.read_all", return_value=(200, elements)
+        ) as read_mock, app.test_request_context(
+            "/data/course?limit=2&order_by=name", method="GET"
+        ):
+            res = data_handler.data_handler(
+                flask.request,
+                ["data", "course"],
+                {
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Credentials": "true",
+                },
+                UserInfo("123", [Role.ADMIN]),
+            )
+            assert res[1] == 200
+            response = json.loads(res[0])
+            assert response["items"] == elements[:2]
+            assert decode_cursor(response["next_cursor"], PageRequest(2, "name")) == {
+                "name": "B",
+                "__name__": "another_dummy_id",
+            }
+            assert read_mock.call_args.args[2] == PageRequest(2, "name")
+
+    def test_get_course_invalid_pagination(self, app) -> None:
+        """Tests that a GET request with invalid pagination parameters is rejected."""
+        with app.test_request_context("/data/course?limit=none", method="GET"), patch(
+            "db_operator.DatabaseOperator.read_all"
+        ) as read_mock:
+            res = data_handler.data_handler(
+                flask.request,
+                ["data", "course"],
+                {
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Credentials": "true",
+                },
+                UserInfo("123", [Role.ADMIN]),
+            )
+            assert res[0] == "Parameter limit must be a number!"
+            assert res[1] == 400
+            read_mock.assert_not_called()
+
+    def test_get_ticket_selected_fields(self, app) -> None:
+        """Tests that the selected fields are passed to the database operator."""
+        with patch(
+            "db_operator.DatabaseOperator.find_all", return_value=(200, [])
+        ) as find_mock, app.test_request_context(
+            "/data/ticket?fields=title,status&limit=5&order_by=priority", method="GET"
+        ):
+            res = data_handler.data_handler(
+                flask.request,
+                ["data", "ticket"],
+                {
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Credentials": "true",
+                },
+                UserInfo("123", [Role.REQUESTER]),
+            )
+            assert res[1] == 200
+            assert find_mock.call_args.args[4] == ["title", "status", "priority"]
+
+    def test_get_ticket_search(self, app) -> None:
+        """Tests that a search request passes the normalized terms and filters."""
+        elements = [{"id": "dummy_id"}, {"id": "another_dummy_id"}]
+        with patch(
+            "db_operator.DatabaseOperator.search", return_value=(200, elements)
+        ) as search_mock, app.test_request_context(
+            "/data/ticket?q=Missing%20Formulas&limit=2", method="GET"
+        ):
+            res = data_handler.data_handler(
+                flask.request,
+                ["data", "ticket"],
+                {"Access-Control-Allow-Origin": "*"},
+                UserInfo("123", [Role.REQUESTER]),
+            )
+            assert res[1] == 200
+            assert json.loads(res[0]) == {"items": elements, "next_cursor": None}
+            _, _, search_terms, filters, limit, _ = search_mock.call_args.args
+            assert search_terms == ["miss", "formula"]
+            assert [field_filter.field_path for field_filter in filters] == [
+                "created_by"
+            ]
+            assert limit == 2
+
+    @pytest.mark.parametrize(
+        ("path", "error_message"),
+        [
+            (
+                "/data/ticket?q=formula&limit=5&order_by=title",
+                "Parameter q cannot be used with order_by or cursor!",
+            ),
+            ("/data/ticket?q=the", "Parameter q must contain a search term!"),
+            ("/data/course?q=data", "Parameter q is not supported for this entity!"),
+        ],
+    )
+    def test_get_search_invalid(self, app, path: str, error_message: str) -> None:
+        """Tests that invalid search requests are rejected."""
+        with patch(
+            "db_operator.DatabaseOperator.search"
+        ) as search_mock, app.test_request_context(path, method="GET"):
+            res = data_handler.data_handler(
+                flask.request,
+                ["data", path.split("/")[2].split("?")[0]],
+                {"Access-Control-Allow-Origin": "*"},
+                UserInfo("123", [Role.ADMIN]),
+            )
+            assert res[0] == error_message
+            assert res[1] == 400
+            search_mock.assert_not_called()
+
+    def test_get_one_course_invalid_fields(self, app) -> None:
+        """Tests that a GET request with unknown fields is rejected."""
+        with patch(
+            "db_operator.DatabaseOperator.read"
+        ) as read_mock, app.test_request_context(
+            "/data/course/dummy_id?fields=unknown", method="GET"
+        ):
+            res = data_handler.data_handler(
+                flask.request,
+                ["data", "course", "dummy_id"],
+                {
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Credentials": "true",
+                },
+                UserInfo("123", [Role.ADMIN]),
+            )
+            assert res[0].startswith("Parameter fields is invalid!")
+            assert res[1] == 400
+            read_mock.assert_not_called()
+
     def test_get_course_failing(self, app) -> None:
         """Tests that a failing GET request should properly return the error."""
         with app.test_request_context("/data/course", method="GET"), patch(
-            "db_operator.DatabaseOperator.read_all"
+            "db_operator.DatabaseOperator.stream_all"
         ) as read_mock:
             read_mock.return_value = 500, "Bad Error"
             res = data_handler.data_handler(
@@ -160,7 +305,9 @@ class TestDataHandler:  # pylint: disable=R0904
             "/data/course",
             method="POST",
             json={"course_abbreviation": "abbr", "name": "new"},
-        ), patch("db_operator.DatabaseOperator.create") as create_mock:
+        ), patch("db_operator.DatabaseOperator.create") as create_mock, patch(
+            "course_cache.CourseCache.invalidate"
+        ) as invalidate_mock:
             create_mock.return_value = 201, "dummy_id"
             res = data_handler.data_handler(
                 flask.request,
@@ -171,11 +318,19 @@ class TestDataHandler:  # pylint: disable=R0904
                 },
                 UserInfo("123", [Role.ADMIN]),
             )
-            assert res[0] == '{"id": "dummy_id"}'
+            assert json.loads(res[0]) == {"id": "dummy_id"}
             assert res[1] == 201
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
             assert res[2].get("Access-Control-Allow-Methods") == "POST"
+            invalidate_mock.assert_called_once()
+            create_mock.assert_called_once_with(
+                "course",
+                {"course_abbreviation": "abbr", "name": "new"},
+                duplication_filters=None,
+                unique_fields=["course_abbreviation"],
+                search_fields=None,
+            )
 
     def test_post_course_failing_conflict(self, app) -> None:
         """Tests that duplicated element as POST request should return a conflict."""
@@ -194,7 +349,7 @@ class TestDataHandler:  # pylint: disable=R0904
                 },
                 UserInfo("123", [Role.ADMIN]),
             )
-            assert res[0] == '{"id": "duplicate_id"}'
+            assert json.loads(res[0]) == {"id": "duplicate_id"}
             assert res[1] == 409
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
@@ -252,6 +407,140 @@ class TestDataHandler:  # pylint: disable=R0904
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
             assert res[2].get("Access-Control-Allow-Methods") == "POST"
 
+    def test_post_course_bulk(self, app) -> None:
+        """Tests that a bulk POST request returns the result of every item."""
+        with app.test_request_context(
+            "/data/course/_bulk",
+            method="POST",
+            json=[
+                {"course_abbreviation": "abbr", "name": "new"},
+                {"course_abbreviation": "other"},
+                {"course_abbreviation": "abbr2", "name": "new"},
+            ],
+        ), patch("db_operator.DatabaseOperator.create_many") as create_many_mock, patch(
+            "course_cache.CourseCache.invalidate"
+        ) as invalidate_mock:
+            create_many_mock.return_value = 200, [(201, "new_id"), (409, "old_id")]
+            res = data_handler.data_handler(
+                flask.request,
+                ["data", "course", "_bulk"],
+                {
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Credentials": "true",
+                },
+                UserInfo("123", [Role.ADMIN]),
+            )
+            assert json.loads(res[0]) == {
+                "items": [
+                    {"status": 201, "id": "new_id"},
+                    {
+                        "status": 400,
+                        "message": "Not all required fields are provided! "
+                        + "Required fields are: course_abbreviation, name",
+                    },
+                    {"status": 409, "id": "old_id"},
+                ]
+            }
+            assert res[1] == 200
+            assert res[2].get("Access-Control-Allow-Methods") == "POST"
+            invalidate_mock.assert_called_once()
+            create_many_mock.assert_called_once_with(
+                "course",
+                [
+                    {"course_abbreviation": "abbr", "name": "new"},
+                    {"course_abbreviation": "abbr2", "name": "new"},
+                ],
+                ["course_abbreviation", "name"],
+                ["course_abbreviation"],
+                None,
+            )
+
+    def test_post_course_bulk_invalid(self, app) -> None:
+        """Tests that a bulk POST request needs an array of items."""
+        with app.test_request_context(
+            "/data/course/_bulk",
+            method="POST",
+            json={"course_abbreviation": "abbr", "name": "new"},
+        ), patch("db_operator.DatabaseOperator.create_many") as create_many_mock:
+            res = data_handler.data_handler(
+                flask.request,
+                ["data", "course", "_bulk"],
+                {
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Credentials": "true",
+                },
+                UserInfo("123", [Role.ADMIN]),
+            )
+            assert res[1] == 400
+            create_many_mock.assert_not_called()
+
+    def test_patch_ticket_bulk(self, app) -> None:
+        """Tests that a bulk PATCH request updates the tickets matching a filter."""
+        with app.test_request_context(
+            "/data/ticket/_bulk",
+            method="PATCH",
+            json={"filter": {"status": "OPEN"}, "update": {"assignee_id": "editor"}},
+        ), patch("db_operator.DatabaseOperator.update_many") as update_many_mock:
+            update_many_mock.return_value = 200, {
+                "ticket_1": (200, "ticket_1"),
+                "ticket_2": (412, "Element was modified in the meantime!"),
+            }
+            res = data_handler.data_handler(
+                flask.request,
+                ["data", "ticket", "_bulk"],
+                {
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Credentials": "true",
+                },
+                UserInfo("123", [Role.EDITOR]),
+            )
+            assert json.loads(res[0]) == {
+                "items": [
+                    {"id": "ticket_1", "status": 200},
+                    {
+                        "id": "ticket_2",
+                        "status": 412,
+                        "message": "Element was modified in the meantime!",
+                    },
+                ]
+            }
+            assert res[1] == 200
+            assert res[2].get("Access-Control-Allow-Methods") == "PATCH"
+            update_many_mock.assert_called_once()
+            args = update_many_mock.call_args.args
+            assert args[:3] == ("ticket", {"assignee_id": "editor"}, None)
+            assert [
+                (field_filter.field_path, field_filter.value)
+                for field_filter in args[3]
+            ] == [("status", "OPEN")]
+            assert args[5] == TicketHistory
+
+    @pytest.mark.parametrize(
+        ("path", "role", "status_code"),
+        [
+            ("/data/ticket/_bulk", Role.REQUESTER, 403),
+            ("/data/course/_bulk", Role.ADMIN, 405),
+        ],
+    )
+    def test_patch_bulk_not_allowed(
+        self, app, path: str, role: Role, status_code: int
+    ) -> None:
+        """Tests that only editors can update tickets in bulk."""
+        with app.test_request_context(
+            path, method="PATCH", json={"ids": ["a"], "update": {"status": "DONE"}}
+        ), patch("db_operator.DatabaseOperator.update_many") as update_many_mock:
+            res = data_handler.data_handler(
+                flask.request,
+                [segment for segment in path.split("/") if segment],
+                {
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Credentials": "true",
+                },
+                UserInfo("123", [role]),
+            )
+            assert res[1] == status_code
+            update_many_mock.assert_not_called()
+
     def test_get_one_course_successful(self, app) -> None:
         """Tests a successful GET request to get a course element."""
         with app.test_request_context("/data/course/dummy_id", method="GET"), patch(
@@ -267,7 +556,7 @@ class TestDataHandler:  # pylint: disable=R0904
                 },
                 UserInfo("123", [Role.ADMIN]),
             )
-            assert res[0] == '{"id": "dummy_id"}'
+            assert json.loads(res[0]) == {"id": "dummy_id"}
             assert res[1] == 200
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
@@ -327,7 +616,9 @@ class TestDataHandler:  # pylint: disable=R0904
             "/data/course/dummy_id",
             method="PUT",
             json={"course_abbreviation": "abbr", "name": "new"},
-        ), patch("db_operator.DatabaseOperator.update") as update_mock:
+        ), patch("db_operator.DatabaseOperator.update") as update_mock, patch(
+            "course_cache.CourseCache.invalidate"
+        ) as invalidate_mock:
             update_mock.return_value = 200, "dummy_id"
             res = data_handler.data_handler(
                 flask.request,
@@ -338,11 +629,12 @@ class TestDataHandler:  # pylint: disable=R0904
                 },
                 UserInfo("123", [Role.ADMIN]),
             )
-            assert res[0] == '{"id": "dummy_id"}'
+            assert json.loads(res[0]) == {"id": "dummy_id"}
             assert res[1] == 200
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
             assert res[2].get("Access-Control-Allow-Methods") == "PUT"
+            invalidate_mock.assert_called_once()
 
     def test_put_course_failing_conflict(self, app) -> None:
         """Tests that a duplicated element as PUT request body should return a conflict."""
@@ -361,12 +653,40 @@ class TestDataHandler:  # pylint: disable=R0904
                 },
                 UserInfo("123", [Role.ADMIN]),
             )
-            assert res[0] == '{"id": "duplicate_id"}'
+            assert json.loads(res[0]) == {"id": "duplicate_id"}
             assert res[1] == 409
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
             assert res[2].get("Access-Control-Allow-Methods") == "PUT"
 
+    def test_put_ticket_modified_concurrently(self, app) -> None:
+        """Tests that a concurrent modification is not reported as a duplicate."""
+        with app.test_request_context(
+            "/data/ticket/dummy_id",
+            method="PUT",
+            json={
+                "title": "Title",
+                "description": "Description",
+                "course_id": "course_id",
+                "status": "OPEN",
+                "priority": "HIGH",
+                "type": "ERROR",
+                "assignee_id": "editor_id",
+            },
+        ), patch("db_operator.DatabaseOperator.update") as update_mock:
+            update_mock.return_value = 412, "Element was modified in the meantime!"
+            res = data_handler.data_handler(
+                flask.request,
+                ["data", "ticket", "dummy_id"],
+                {
+                    "Access-Control-Allow-Origin": "*",
+                    "Access-Control-Allow-Credentials": "true",
+                },
+                UserInfo("123", [Role.EDITOR]),
+            )
+            assert res[0] == "Element was modified in the meantime!"
+            assert res[1] == 412
+
     def test_put_course_failing_missing_fields(self, app) -> None:
         """Tests that a PUT request with missing fields should return a bad request."""
         with app.test_request_context(
@@ -422,7 +742,9 @@ class TestDataHandler:  # pylint: disable=R0904
             "db_operator.DatabaseOperator.delete"
         ) as delete_mock, patch(
             "db_operator.DatabaseOperator.find_all", return_value=(200, [])
-        ):
+        ), patch(
+            "course_cache.CourseCache.invalidate"
+        ) as invalidate_mock:
             delete_mock.return_value = 204, None
             res = data_handler.data_handler(
                 flask.request,
@@ -438,6 +760,7 @@ class TestDataHandler:  # pylint: disable=R0904
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
             assert res[2].get("Access-Control-Allow-Methods") == "DELETE"
+            invalidate_mock.assert_called_once()
 
     def test_delete_course_conflict(self, app) -> None:
         """
@@ -584,7 +907,7 @@ class TestDataHandler:  # pylint: disable=R0904
         with app.test_request_context(
             "/data/ticket_history", method="GET", query_string={"ticket_id": "123"}
         ), patch(
-            "db_operator.DatabaseOperator.find_all",
+            "db_operator.DatabaseOperator.stream_all",
             return_value=(
                 200,
                 [
@@ -602,7 +925,10 @@ class TestDataHandler:  # pylint: disable=R0904
                 },
                 UserInfo("123", [Role.REQUESTER]),
             )
-            assert res[0] == '[{"id": "dummy_id"}, {"id": "another_dummy_id"}]'
+            assert json.loads(b"".join(res[0])) == [
+                {"id": "dummy_id"},
+                {"id": "another_dummy_id"},
+            ]
             assert res[1] == 200
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Methods") == "GET"
@@ -629,3 +955,67 @@ class TestDataHandler:  # pylint: disable=R0904
             assert res[1] == 405
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
+
+    def test_get_course_etag(self, app) -> None:
+        """Tests that list responses can be revalidated by their entity tag."""
+        with patch(
+            "db_operator.DatabaseOperator.get_versions",
+            return_value={"course": 2, "user": 1},
+        ), patch(
+            "db_operator.DatabaseOperator.stream_all", return_value=(200, [])
+        ) as stream_mock:
+            with app.test_request_context("/data/course", method="GET"):
+                res = data_handler.data_handler(
+                    flask.request, ["data", "course"], {}, UserInfo("123", [Role.ADMIN])
+                )
+            etag = res[2].get("ETag")
+            assert res[1] == 200
+            assert etag is not None
+            assert res[2].get("Cache-Control") == "private, no-cache"
+
+            with app.test_request_context(
+                "/data/course", method="GET", headers={"If-None-Match": etag}
+            ):
+                res = data_handler.data_handler(
+                    flask.request, ["data", "course"], {}, UserInfo("123", [Role.ADMIN])
+                )
+            assert res[0] == ""
+            assert res[1] == 304
+            assert res[2].get("ETag") == etag
+            stream_mock.assert_called_once()
+
+    def test_get_one_course_etag_changed(self, app) -> None:
+        """Tests that an item is loaded again if its collection changed."""
+        with app.test_request_context(
+            "/data/course/dummy_id", method="GET", headers={"If-None-Match": '"old"'}
+        ), patch(
+            "db_operator.DatabaseOperator.get_versions",
+            return_value={"course": 3, "user": 1},
+        ), patch(
+            "db_operator.DatabaseOperator.read",
+            return_value=(200, {"id": "dummy_id", "created_by": "123"}),
+        ) as read_mock:
+            res = data_handler.data_handler(
+                flask.request,
+                ["data", "course", "dummy_id"],
+                {},
+                UserInfo("123", [Role.ADMIN]),
+            )
+            assert res[1] == 200
+            assert res[2].get("ETag") not in (None, '"old"')
+            read_mock.assert_called_once()
+
+    def test_get_course_without_versions(self, app) -> None:
+        """Tests that no entity tag is sent if the versions cannot be loaded."""
+        with app.test_request_context(
+            "/data/course", method="GET", headers={"If-None-Match": "*"}
+        ), patch(
+            "db_operator.DatabaseOperator.get_versions", return_value=None
+        ), patch(
+            "db_operator.DatabaseOperator.stream_all", return_value=(200, [])
+        ):
+            res = data_handler.data_handler(
+                flask.request, ["data", "course"], {}, UserInfo("123", [Role.ADMIN])
+            )
+            assert res[1] == 200
+            assert "ETag" not in res[2]
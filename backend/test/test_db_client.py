@@ -0,0 +1,36 @@
+"""
+    Testing the shared database client.
+"""
+from threading import Thread
+from unittest import mock
+from db_client import DatabaseClientHolder
+
+
+class TestDbClient:
+    """Contains tests for the database client holder."""
+
+    def test_get(self) -> None:
+        """Tests that all threads share one client."""
+        holder = DatabaseClientHolder()
+        clients = []
+        with mock.patch("firebase_admin.firestore.client") as client_mock:
+            threads = [
+                Thread(target=lambda: clients.append(holder.get())) for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            client_mock.assert_called_once()
+            assert clients == [client_mock.return_value] * 8
+
+    def test_reset(self) -> None:
+        """Tests that a new client is created after a reset."""
+        holder = DatabaseClientHolder()
+        with mock.patch(
+            "firebase_admin.firestore.client", side_effect=["first", "second"]
+        ):
+            assert holder.get() == "first"
+            holder.reset()
+            assert holder.get() == "second"
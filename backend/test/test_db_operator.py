@@ -1,3 +1,4 @@
+# pylint: disable=too-many-lines
 """
     Testing the logger utility methods.
 """
@@ -6,10 +7,17 @@ from collections import namedtuple
 import pytest
 from google.cloud.firestore_v1.base_query import FieldFilter
 from google.cloud import exceptions
-from backend.test.mocks import MockDocReference, MockUserReference
+from google.api_core.exceptions import AlreadyExists, FailedPrecondition
+from backend.test.mocks import (
+    MockDocReference,
+    MockGetUsersResult,
+    MockUserReference,
+)
 from db_operator import DatabaseOperator
 from data_model import Course, Ticket, TicketHistory
 from enums import Role
+from pagination import PageRequest
+from request_context import end_request, request_metrics, start_request
 from auth_utils import UserInfo
 
 
@@ -28,10 +36,10 @@ class TestDbOperator:  # pylint: disable=R0904
         """Tests a successful database entity creation."""
         with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
             collection_mock.return_value = collection_return_mock = mock.Mock()
-            collection_return_mock.get.return_value = "exists"
+            collection_return_mock.limit().get.return_value = "exists"
 
             return_code, return_message = db_operator.create(
-                "test", {"new": "entity"}, "dummy_id"
+                "course", {"new": "entity"}, "dummy_id"
             )
 
             assert return_code == 201
@@ -41,10 +49,10 @@ class TestDbOperator:  # pylint: disable=R0904
         """Tests a successful database entity creation with a dataclass element to create."""
         with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
             collection_mock.return_value = collection_return_mock = mock.Mock()
-            collection_return_mock.get.return_value = "exists"
+            collection_return_mock.limit().get.return_value = "exists"
 
             return_code, return_message = db_operator.create(
-                "test", Course("abbreviation", "name"), "another_dummy_id"
+                "course", Course("abbreviation", "name"), "another_dummy_id"
             )
 
             assert return_code == 201
@@ -54,32 +62,32 @@ class TestDbOperator:  # pylint: disable=R0904
         """Tests a failing database entity creation, as not possible to load the collection."""
         with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
             collection_mock.return_value = collection_return_mock = mock.Mock()
-            collection_return_mock.get.side_effect = TimeoutError("Timeout Error")
+            collection_return_mock.limit().get.side_effect = TimeoutError("Timeout Error")
 
             return_code, return_message = db_operator.create(
-                "test", {"new": "entity"}, "dummy_id"
+                "course", {"new": "entity"}, "dummy_id"
             )
 
             assert return_code == 500
             assert (
                 return_message
-                == "Timed out while trying to get reference for collection test: Timeout Error"
+                == "Timed out while trying to get reference for collection course: Timeout Error"
             )
 
     def test_create_failing_unknown_collection(self, db_operator) -> None:
         """Tests a failing database entity creation. Collection does not exist."""
         with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
             collection_mock.return_value = collection_return_mock = mock.Mock()
-            collection_return_mock.get.return_value = None
+            collection_return_mock.limit().get.return_value = None
 
             return_code, return_message = db_operator.create(
-                "test", {"new": "entity"}, "dummy_id"
+                "course", {"new": "entity"}, "dummy_id"
             )
 
             assert return_code == 500
             assert (
                 return_message
-                == "Cannot create document! Collection does not exist: 'test'"
+                == "Cannot create document! Collection does not exist: 'course'"
             )
 
     def test_create_failing_cannot_check_duplicates(self, db_operator) -> None:
@@ -90,11 +98,11 @@ class TestDbOperator:  # pylint: disable=R0904
             "db_operator.DatabaseOperator.find"
         ) as find_mock:
             collection_mock.return_value = collection_return_mock = mock.Mock()
-            collection_return_mock.get.return_value = "exists"
+            collection_return_mock.limit().get.return_value = "exists"
             find_mock.return_value = (False, None)
 
             return_code, return_message = db_operator.create(
-                "test",
+                "course",
                 {"new": "entity"},
                 "dummy_id",
                 [FieldFilter("new", "==", "entity")],
@@ -111,13 +119,13 @@ class TestDbOperator:  # pylint: disable=R0904
             "db_operator.DatabaseOperator.find"
         ) as find_mock:
             collection_mock.return_value = collection_return_mock = mock.Mock()
-            collection_return_mock.get.return_value = "exists"
+            collection_return_mock.limit().get.return_value = "exists"
             Document = namedtuple("Documents", "id")
             duplicate = Document(id="duplicate_id")
             find_mock.return_value = (True, [duplicate])
 
             return_code, return_message = db_operator.create(
-                "test",
+                "course",
                 {"new": "entity"},
                 "dummy_id",
                 [FieldFilter("new", "==", "entity")],
@@ -128,13 +136,28 @@ class TestDbOperator:  # pylint: disable=R0904
 
     def test_create_failing_timeout_while_creating(self, db_operator) -> None:
         """Tests a failing database entity creation. Timeout happening while creating."""
-        with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
+        with mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock, mock.patch.object(
+            db_operator.db_client, "batch"
+        ) as batch_mock:
             collection_mock.return_value = collection_return_mock = mock.Mock()
-            collection_return_mock.get.return_value = "exists"
-            collection_return_mock.document().set.side_effect = TimeoutError(
-                "Timeout Error"
+            collection_return_mock.limit().get.return_value = "exists"
+            batch_mock.return_value.commit.side_effect = TimeoutError("Timeout Error")
+
+            return_code, return_message = db_operator.create(
+                "course", {"new": "entity"}, "dummy_id"
+            )
+
+            assert return_code == 500
+            assert (
+                return_message
+                == "Timed out while trying to create entry in course: Timeout Error"
             )
 
+    def test_create_failing_unregistered_collection(self, db_operator) -> None:
+        """Tests a failing database entity creation. Collection is not registered."""
+        with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
             return_code, return_message = db_operator.create(
                 "test", {"new": "entity"}, "dummy_id"
             )
@@ -142,8 +165,22 @@ class TestDbOperator:  # pylint: disable=R0904
             assert return_code == 500
             assert (
                 return_message
-                == "Timed out while trying to create entry in test: Timeout Error"
+                == "Cannot create document! Collection does not exist: 'test'"
             )
+            collection_mock.return_value.limit.assert_not_called()
+
+    def test_create_probes_collection_only_once(self, db_operator) -> None:
+        """Tests that the collection existence check is cached between creations."""
+        with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
+            collection_mock.return_value = collection_return_mock = mock.Mock()
+            collection_return_mock.limit.return_value = limited_mock = mock.Mock()
+            limited_mock.get.return_value = ["exists"]
+
+            db_operator.create("course", {"new": "entity"}, "dummy_id")
+            db_operator.create("course", {"new": "entity"}, "another_dummy_id")
+
+            collection_return_mock.limit.assert_called_once_with(1)
+            limited_mock.get.assert_called_once_with(timeout=10)
 
     def test_update_successful(self, db_operator) -> None:
         """Tests a successful database entity update."""
@@ -216,10 +253,8 @@ class TestDbOperator:  # pylint: disable=R0904
 
     def test_update_failing_timeout_while_updating(self, db_operator) -> None:
         """Tests a failing database entity update. Timeout happening while updating."""
-        with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
-            collection_mock.return_value = collection_return_mock = mock.Mock()
-            collection_return_mock.document.return_value = element_mock = mock.Mock()
-            element_mock.update.side_effect = TimeoutError("Timeout Error")
+        with mock.patch.object(db_operator.db_client, "batch") as batch_mock:
+            batch_mock.return_value.commit.side_effect = TimeoutError("Timeout Error")
 
             return_code, return_message = db_operator.update(
                 "test", {"new": "updated_entity"}, "dummy_id"
@@ -228,12 +263,34 @@ class TestDbOperator:  # pylint: disable=R0904
             assert return_code == 500
             assert return_message == "Timed out while trying to update entry!"
 
+    def test_update_failing_timeout_while_reading(self, db_operator) -> None:
+        """Tests a failing update. Timeout while reading the entry during the
+        duplicate check."""
+        with mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock, mock.patch("db_operator.DatabaseOperator.find") as find_mock:
+            collection_mock.return_value.document.return_value.get.side_effect = (
+                TimeoutError("Timeout Error")
+            )
+            find_mock.return_value = (True, [])
+
+            return_code, return_message = db_operator.update(
+                "ticket",
+                {"title": "updated_entity"},
+                "dummy_id",
+                [FieldFilter("title", "==", "updated_entity")],
+            )
+
+            assert return_code == 500
+            assert return_message == "Timed out while trying to update entry!"
+            find_mock.assert_called_once()
+
     def test_update_failing_element_not_found(self, db_operator) -> None:
         """Tests a failing database entity update. Element does not exist."""
-        with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
-            collection_mock.return_value = collection_return_mock = mock.Mock()
-            collection_return_mock.document.return_value = element_mock = mock.Mock()
-            element_mock.update.side_effect = exceptions.NotFound("elem not found")
+        with mock.patch.object(db_operator.db_client, "batch") as batch_mock:
+            batch_mock.return_value.commit.side_effect = exceptions.NotFound(
+                "elem not found"
+            )
 
             return_code, return_message = db_operator.update(
                 "test", {"new": "updated_entity"}, "dummy_id"
@@ -282,16 +339,24 @@ class TestDbOperator:  # pylint: disable=R0904
         """Tests reading a database entity successfully."""
         with mock.patch.object(
             db_operator.db_client, "collection"
-        ) as collection_mock, mock.patch("firebase_admin.auth.get_user") as user_mock:
+        ) as collection_mock, mock.patch("firebase_admin.auth.get_users") as user_mock:
             collection_mock.return_value = collection_return_mock = mock.Mock()
             collection_return_mock.document.return_value = element_mock = mock.Mock()
-            user_mock.side_effect = [
-                MockUserReference("Dummy Name"),
-                MockUserReference("Another Dummy Name"),
-            ]
+            user_mock.return_value = MockGetUsersResult(
+                [
+                    MockUserReference("Dummy Name", "creator_id"),
+                    MockUserReference("Another Dummy Name", "modifier_id"),
+                ]
+            )
 
             element_mock.get.return_value = MockDocReference(
-                True, identifier="dummy_id", name="dummy_name"
+                True,
+                identifier="dummy_id",
+                name="dummy_name",
+                additional_attributes={
+                    "created_by": "creator_id",
+                    "modified_by": "modifier_id",
+                },
             )
 
             return_code, return_message = db_operator.read("test", Course, "dummy_id")
@@ -300,26 +365,32 @@ class TestDbOperator:  # pylint: disable=R0904
             assert return_message == {
                 "id": "dummy_id",
                 "name": "dummy_name",
+                "created_by": "creator_id",
+                "modified_by": "modifier_id",
                 "created_by_name": "Dummy Name",
                 "modified_by_name": "Another Dummy Name",
             }
+            user_mock.assert_called_once()
 
     def test_read_successful_with_refs(self, db_operator) -> None:
         """Tests reading a database entity successfully with references to other collections."""
         with mock.patch.object(
             db_operator.db_client, "collection"
         ) as collection_mock, mock.patch(
-            "firebase_admin.auth.get_user"
+            "firebase_admin.auth.get_users"
         ) as user_mock, mock.patch(
             "data_model.Ticket.resolve_refs"
-        ) as refs_mock:
+        ) as refs_mock, mock.patch(
+            "course_cache.CourseCache.is_expired", return_value=False
+        ):
             collection_mock.return_value = collection_return_mock = mock.Mock()
             collection_return_mock.document.return_value = element_mock = mock.Mock()
-            user_mock.side_effect = [
-                MockUserReference("Dummy Name"),
-                MockUserReference("Another Dummy Name"),
-                MockUserReference("Assignee Name"),
-            ]
+            user_mock.return_value = MockGetUsersResult(
+                [
+                    MockUserReference("Dummy Name", "creator_id"),
+                    MockUserReference("Assignee Name", "dummy_assignee_id"),
+                ]
+            )
 
             element_mock.get.return_value = MockDocReference(
                 True,
@@ -328,13 +399,15 @@ class TestDbOperator:  # pylint: disable=R0904
                 additional_attributes={
                     "course_id": "dummy_course_id",
                     "assignee_id": "dummy_assignee_id",
+                    "created_by": "creator_id",
+                    "modified_by": "creator_id",
                 },
             )
             refs_mock.return_value = {
                 "id": "dummy_ticket_id",
                 "name": "dummy_ticket",
                 "created_by_name": "Dummy Name",
-                "modified_by_name": "Another Dummy Name",
+                "modified_by_name": "Dummy Name",
                 "course_id": "dummy_course_id",
                 "course_name": "dummy_course",
                 "course_abbreviation": "DN",
@@ -349,13 +422,18 @@ class TestDbOperator:  # pylint: disable=R0904
                 "id": "dummy_ticket_id",
                 "name": "dummy_ticket",
                 "created_by_name": "Dummy Name",
-                "modified_by_name": "Another Dummy Name",
+                "modified_by_name": "Dummy Name",
                 "course_id": "dummy_course_id",
                 "course_name": "dummy_course",
                 "course_abbreviation": "DN",
                 "assignee_id": "dummy_assignee_id",
                 "assignee_name": "Assignee Name",
             }
+            user_names = refs_mock.call_args.args[1]
+            assert user_names == {
+                "creator_id": "Dummy Name",
+                "dummy_assignee_id": "Assignee Name",
+            }
 
     def test_read_failing_not_found(self, db_operator) -> None:
         """Tests reading a database entity failing, as the element was not found."""
@@ -390,18 +468,28 @@ class TestDbOperator:  # pylint: disable=R0904
         """Tests reading a database collection successfully."""
         with mock.patch.object(
             db_operator.db_client, "collection"
-        ) as collection_mock, mock.patch("firebase_admin.auth.get_user") as user_mock:
+        ) as collection_mock, mock.patch("firebase_admin.auth.get_users") as user_mock:
             collection_mock.return_value = collection_return_mock = mock.Mock()
             collection_return_mock.stream.return_value = [
-                MockDocReference(True, "dummy_id", "name"),
-                MockDocReference(True, "another_dummy_id", "another_name"),
-            ]
-            user_mock.side_effect = [
-                MockUserReference("Created By Name"),
-                MockUserReference("Modified By Name"),
-                MockUserReference("Created By Another Name"),
-                MockUserReference("Modified By Another Name"),
+                MockDocReference(
+                    True,
+                    "dummy_id",
+                    "name",
+                    {"created_by": "creator_id", "modified_by": "modifier_id"},
+                ),
+                MockDocReference(
+                    True,
+                    "another_dummy_id",
+                    "another_name",
+                    {"created_by": "modifier_id", "modified_by": "unknown_id"},
+                ),
             ]
+            user_mock.return_value = MockGetUsersResult(
+                [
+                    MockUserReference("Created By Name", "creator_id"),
+                    MockUserReference("Modified By Name", "modifier_id"),
+                ]
+            )
 
             return_code, return_message = db_operator.read_all("test", Course)
 
@@ -410,16 +498,24 @@ class TestDbOperator:  # pylint: disable=R0904
                 {
                     "id": "dummy_id",
                     "name": "name",
+                    "created_by": "creator_id",
+                    "modified_by": "modifier_id",
                     "created_by_name": "Created By Name",
                     "modified_by_name": "Modified By Name",
                 },
                 {
                     "id": "another_dummy_id",
                     "name": "another_name",
-                    "created_by_name": "Created By Another Name",
-                    "modified_by_name": "Modified By Another Name",
+                    "created_by": "modifier_id",
+                    "modified_by": "unknown_id",
+                    "created_by_name": "Modified By Name",
+                    "modified_by_name": "Unknown",
                 },
             ]
+            user_mock.assert_called_once()
+            assert [
+                identifier.uid for identifier in user_mock.call_args.args[0]
+            ] == ["creator_id", "modifier_id", "unknown_id"]
 
     def test_read_all_failing_with_timeout(self, db_operator) -> None:
         """Tests reading a database collection failing, as the query timed out."""
@@ -435,43 +531,68 @@ class TestDbOperator:  # pylint: disable=R0904
                 == "Timed out while trying to read all entries for test: Timeout Error"
             )
 
+    def test_read_all_failing_without_index(self, db_operator) -> None:
+        """Tests reading a page failing, as the index of its order is missing."""
+        with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
+            query_mock = collection_mock.return_value.order_by.return_value
+            query_mock.order_by.return_value.limit.return_value.stream.side_effect = (
+                FailedPrecondition("The query requires an index.")
+            )
+
+            return_code, return_message = db_operator.read_all(
+                "test", Course, PageRequest(10, "name")
+            )
+
+            assert return_code == 500
+            assert return_message.startswith("Could not query the entries of test")
+
     def test_read_all_successful_with_references(self, db_operator) -> None:
         """Tests reading a database collection with references to resolve successfully."""
         with mock.patch.object(
             db_operator.db_client, "collection"
         ) as collection_mock, mock.patch(
-            "firebase_admin.auth.get_user"
+            "firebase_admin.auth.get_users"
         ) as user_mock, mock.patch(
-            "db_operator.DatabaseOperator.read"
-        ) as read_mock, mock.patch(
+            "course_cache.CourseCache.get"
+        ) as course_mock, mock.patch(
             "firebase_admin.firestore.client"
         ):
             collection_mock.return_value = collection_return_mock = mock.Mock()
-            read_mock.return_value = (
-                200,
-                MockDocReference(
-                    True, "dummy_id", "course name", {"course_abbreviation": "abbr"}
-                ).to_dict(),
-            )
+            course_mock.return_value = {
+                "name": "course name",
+                "course_abbreviation": "abbr",
+            }
             collection_return_mock.stream.return_value = [
                 MockDocReference(
                     True,
                     "dummy_id",
                     "name",
-                    {"course_id": "123", "assignee_id": "456"},
+                    {
+                        "course_id": "123",
+                        "assignee_id": "456",
+                        "created_by": "creator_id",
+                        "modified_by": "modifier_id",
+                    },
                 ),
                 MockDocReference(
-                    True, "another_dummy_id", "another_name", {"course_id": "123"}
+                    True,
+                    "another_dummy_id",
+                    "another_name",
+                    {
+                        "course_id": "123",
+                        "created_by": "creator_id",
+                        "modified_by": "creator_id",
+                    },
                 ),
             ]
 
-            user_mock.side_effect = [
-                MockUserReference("Created By Name"),
-                MockUserReference("Modified By Name"),
-                MockUserReference("Assignee Name"),
-                MockUserReference("Created By Another Name"),
-                MockUserReference("Modified By Another Name"),
-            ]
+            user_mock.return_value = MockGetUsersResult(
+                [
+                    MockUserReference("Created By Name", "creator_id"),
+                    MockUserReference("Modified By Name", "modifier_id"),
+                    MockUserReference("Assignee Name", "456"),
+                ]
+            )
 
             return_code, return_message = db_operator.read_all("test", Ticket)
 
@@ -480,6 +601,8 @@ class TestDbOperator:  # pylint: disable=R0904
                 {
                     "id": "dummy_id",
                     "name": "name",
+                    "created_by": "creator_id",
+                    "modified_by": "modifier_id",
                     "created_by_name": "Created By Name",
                     "modified_by_name": "Modified By Name",
                     "course_id": "123",
@@ -491,13 +614,204 @@ class TestDbOperator:  # pylint: disable=R0904
                 {
                     "id": "another_dummy_id",
                     "name": "another_name",
-                    "created_by_name": "Created By Another Name",
-                    "modified_by_name": "Modified By Another Name",
+                    "created_by": "creator_id",
+                    "modified_by": "creator_id",
+                    "created_by_name": "Created By Name",
+                    "modified_by_name": "Created By Name",
                     "course_id": "123",
                     "course_name": "course name",
                     "course_abbreviation": "abbr",
                 },
             ]
+            user_mock.assert_called_once()
+
+    def test_read_all_paginated(self, db_operator) -> None:
+        """Tests reading a page of a database collection."""
+        with mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock, mock.patch("firebase_admin.auth.get_users"):
+            collection_mock.return_value = collection_return_mock = mock.Mock()
+            paged_mock = collection_return_mock.order_by().limit.return_value
+            paged_mock.stream.return_value = [
+                MockDocReference(True, "dummy_id", "name"),
+            ]
+
+            return_code, return_message = db_operator.read_all(
+                "test", Course, PageRequest(1)
+            )
+
+            assert return_code == 200
+            assert [element["id"] for element in return_message] == ["dummy_id"]
+            collection_return_mock.order_by().limit.assert_called_with(2)
+
+    def test_read_all_loads_courses(self, db_operator) -> None:
+        """Tests that expired courses are loaded together with the user names."""
+        with mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock, mock.patch(
+            "firebase_admin.auth.get_users"
+        ) as user_mock, mock.patch(
+            "course_cache.CourseCache.is_expired", return_value=True
+        ), mock.patch(
+            "course_cache.CourseCache.refresh"
+        ) as refresh_mock, mock.patch(
+            "course_cache.CourseCache.get", return_value=None
+        ):
+            collection_mock.return_value.stream.return_value = [
+                MockDocReference(
+                    True, "dummy_id", "name", {"course_id": "123", "created_by": "c"}
+                ),
+            ]
+            user_mock.return_value = MockGetUsersResult([])
+
+            return_code, _ = db_operator.read_all("ticket", Ticket)
+
+            assert return_code == 200
+            refresh_mock.assert_called_once()
+            user_mock.assert_called_once()
+
+    def test_read_all_selected_fields(self, db_operator) -> None:
+        """Tests reading selected fields skips the resolution of unselected references."""
+        with mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock, mock.patch(
+            "firebase_admin.auth.get_users"
+        ) as user_mock, mock.patch(
+            "course_cache.CourseCache.get"
+        ) as course_mock, mock.patch(
+            "course_cache.CourseCache.is_expired", return_value=False
+        ):
+            collection_mock.return_value = collection_return_mock = mock.Mock()
+            collection_return_mock.select().stream.return_value = [
+                MockDocReference(
+                    True,
+                    "dummy_id",
+                    "name",
+                    {"title": "Title", "course_id": "123", "created_by": "creator"},
+                ),
+            ]
+            course_mock.return_value = {"name": "Course", "course_abbreviation": "C"}
+
+            return_code, return_message = db_operator.read_all(
+                "ticket", Ticket, field_names=["title", "course_name"]
+            )
+
+            assert return_code == 200
+            assert return_message[0]["course_name"] == "Course"
+            assert "created_by_name" not in return_message[0]
+            collection_return_mock.select.assert_called_with(
+                ["title", "course_id", "created_by"]
+            )
+            user_mock.assert_not_called()
+
+    def test_read_selected_fields(self, db_operator) -> None:
+        """Tests reading selected fields of a database entity."""
+        with mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock, mock.patch(
+            "firebase_admin.auth.get_users"
+        ) as user_mock, mock.patch(
+            "course_cache.CourseCache.get"
+        ) as course_mock:
+            collection_mock.return_value = collection_return_mock = mock.Mock()
+            collection_return_mock.document.return_value = element_mock = mock.Mock()
+            element_mock.get.return_value = MockDocReference(
+                True, "dummy_id", "name", {"title": "Title", "created_by": "creator"}
+            )
+
+            return_code, return_message = db_operator.read(
+                "ticket", Ticket, "dummy_id", ["title"]
+            )
+
+            assert return_code == 200
+            assert return_message == {
+                "id": "dummy_id",
+                "name": "name",
+                "title": "Title",
+                "created_by": "creator",
+            }
+            element_mock.get.assert_called_once_with(
+                field_paths=["title", "created_by"], timeout=10
+            )
+            user_mock.assert_not_called()
+            course_mock.assert_not_called()
+
+    def test_stream_all_successful(self, db_operator) -> None:
+        """Tests streaming a database collection, which is parsed in chunks."""
+        with mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock, mock.patch(
+            "firebase_admin.auth.get_users"
+        ) as user_mock, mock.patch(
+            "db_operator.STREAM_CHUNK_SIZE", 2
+        ):
+            collection_mock.return_value = collection_return_mock = mock.Mock()
+            collection_return_mock.where().stream.return_value = iter(
+                [
+                    MockDocReference(True, "first_id", "first", {"created_by": "1"}),
+                    MockDocReference(True, "second_id", "second", {"created_by": "2"}),
+                    MockDocReference(True, "third_id", "third", {"created_by": "3"}),
+                ]
+            )
+            user_mock.return_value = MockGetUsersResult([])
+
+            return_code, elements = db_operator.stream_all(
+                "test", Course, [FieldFilter("created_by", "in", ["1", "2", "3"])]
+            )
+
+            assert return_code == 200
+            user_mock.assert_not_called()
+            assert next(elements)["id"] == "first_id"
+            assert user_mock.call_count == 1
+            assert [element["id"] for element in elements] == [
+                "second_id",
+                "third_id",
+            ]
+            assert user_mock.call_count == 2
+
+    def test_stream_all_deadline_per_chunk(self, db_operator) -> None:
+        """Tests that every streamed chunk is enriched within its own deadline."""
+        with mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock, mock.patch(
+            "firebase_admin.auth.get_users"
+        ) as user_mock, mock.patch(
+            "db_operator.STREAM_CHUNK_SIZE", 1
+        ):
+            collection_mock.return_value = collection_return_mock = mock.Mock()
+            collection_return_mock.stream.return_value = iter(
+                [
+                    MockDocReference(True, "first_id", "first", {"created_by": "d1"}),
+                    MockDocReference(True, "second_id", "second", {"created_by": "d2"}),
+                ]
+            )
+            user_mock.side_effect = lambda identifiers: MockGetUsersResult(
+                [MockUserReference("Name", identifiers[0].uid)]
+            )
+
+            token = start_request()
+            _, elements = db_operator.stream_all("test", Course)
+            # The handler returned long ago, when the body is sent.
+            request_metrics.get().deadline_start -= 60
+            names = [element["created_by_name"] for element in elements]
+            end_request(token)
+
+            assert names == ["Name", "Name"]
+            assert user_mock.call_count == 2
+
+    def test_stream_all_failing_with_timeout(self, db_operator) -> None:
+        """Tests streaming a database collection failing, as the query timed out."""
+        with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
+            collection_mock.return_value = collection_return_mock = mock.Mock()
+            collection_return_mock.stream.side_effect = TimeoutError("Timeout Error")
+
+            return_code, return_message = db_operator.stream_all("test", Course)
+
+            assert return_code == 500
+            assert (
+                return_message
+                == "Timed out while trying to read all entries for test: Timeout Error"
+            )
 
     def test_find_successful(self, db_operator) -> None:
         """Tests querying a database entity successfully."""
@@ -506,14 +820,14 @@ class TestDbOperator:  # pylint: disable=R0904
             collection_return_mock.where().limit.return_value = (
                 filtered_mock
             ) = mock.Mock()
-            filtered_mock.stream.return_value = "reference"
+            filtered_mock.stream.return_value = ["reference"]
 
             found_successful, return_message = db_operator.find(
                 "test", [FieldFilter("new", "==", "updated_entity")]
             )
 
             assert found_successful is True
-            assert return_message == "reference"
+            assert list(return_message) == ["reference"]
 
     def test_find_failing_with_filter_field_unknown(self, db_operator) -> None:
         """Tests querying a database entity failing, as the filters are not valid."""
@@ -543,23 +857,57 @@ class TestDbOperator:  # pylint: disable=R0904
             assert found_successful is False
             assert return_message is None
 
+    def test_count_successful(self, db_operator) -> None:
+        """Tests counting database entities with an aggregation query."""
+        with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
+            count_mock = collection_mock.return_value.where.return_value.count
+            count_mock.return_value.get.return_value = [[mock.Mock(value=3)]]
+
+            return_code, return_message = db_operator.count(
+                "ticket", [FieldFilter("status", "==", "OPEN")]
+            )
+
+            assert return_code == 200
+            assert return_message == 3
+            count_mock.assert_called_once_with(alias="count")
+
+    def test_count_failing_with_timeout(self, db_operator) -> None:
+        """Tests counting database entities failing as the aggregation timed out."""
+        with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
+            count_mock = collection_mock.return_value.where.return_value.count
+            count_mock.return_value.get.side_effect = TimeoutError("Timeout Error")
+
+            return_code, return_message = db_operator.count(
+                "ticket", [FieldFilter("status", "==", "OPEN")]
+            )
+
+            assert return_code == 500
+            assert return_message.startswith("Timed out")
+
     def test_find_all_successful(self, db_operator) -> None:
         """Tests querying a database collection successfully."""
         with mock.patch.object(
             db_operator.db_client, "collection"
-        ) as collection_mock, mock.patch("firebase_admin.auth.get_user") as user_mock:
+        ) as collection_mock, mock.patch("firebase_admin.auth.get_users") as user_mock:
             collection_mock.return_value = collection_return_mock = mock.Mock()
             collection_return_mock.where.return_value = filtered_mock = mock.Mock()
             filtered_mock.stream.return_value = [
-                MockDocReference(True, name="dummy_id", identifier="test"),
-                MockDocReference(True, name="another_dummy_id", identifier="test2"),
-            ]
-            user_mock.side_effect = [
-                MockUserReference("Dummy Name"),
-                MockUserReference("Another Dummy Name"),
-                MockUserReference("Dummy Name"),
-                MockUserReference("Another Dummy Name"),
+                MockDocReference(
+                    True,
+                    name="dummy_id",
+                    identifier="test",
+                    additional_attributes={"created_by": "creator_id"},
+                ),
+                MockDocReference(
+                    True,
+                    name="another_dummy_id",
+                    identifier="test2",
+                    additional_attributes={"created_by": "creator_id"},
+                ),
             ]
+            user_mock.return_value = MockGetUsersResult(
+                [MockUserReference("Dummy Name", "creator_id")]
+            )
 
             response_code, return_message = db_operator.find_all(
                 "test", Course, [FieldFilter("new", "==", "updated_entity")]
@@ -570,14 +918,16 @@ class TestDbOperator:  # pylint: disable=R0904
                 {
                     "name": "dummy_id",
                     "id": "test",
+                    "created_by": "creator_id",
                     "created_by_name": "Dummy Name",
-                    "modified_by_name": "Another Dummy Name",
+                    "modified_by_name": "Unknown",
                 },
                 {
                     "name": "another_dummy_id",
                     "id": "test2",
+                    "created_by": "creator_id",
                     "created_by_name": "Dummy Name",
-                    "modified_by_name": "Another Dummy Name",
+                    "modified_by_name": "Unknown",
                 },
             ]
 
@@ -588,12 +938,12 @@ class TestDbOperator:  # pylint: disable=R0904
         with mock.patch.object(
             db_operator.db_client, "collection"
         ) as collection_mock, mock.patch(
-            "firebase_admin.auth.get_user"
+            "firebase_admin.auth.get_users"
         ) as user_mock, mock.patch(
             "firebase_admin.firestore.client"
         ), mock.patch(
-            "db_operator.DatabaseOperator.read"
-        ) as read_mock:
+            "course_cache.CourseCache.get"
+        ) as course_mock:
             collection_mock.return_value = collection_return_mock = mock.Mock()
             collection_return_mock.where.return_value = filtered_mock = mock.Mock()
             filtered_mock.stream.return_value = [
@@ -616,33 +966,22 @@ class TestDbOperator:  # pylint: disable=R0904
                     },
                 ),
             ]
-            read_mock.side_effect = [
-                (
-                    200,
-                    {
-                        "id": "dummy_course_id",
-                        "name": "dummy_course",
-                        "course_abbreviation": "DN",
-                    },
-                ),
-                (
-                    200,
-                    {
-                        "id": "another_dummy_course_id",
-                        "name": "dummy_course",
-                        "course_abbreviation": "DN",
-                    },
-                ),
+            course_mock.side_effect = [
+                {
+                    "id": "dummy_course_id",
+                    "name": "dummy_course",
+                    "course_abbreviation": "DN",
+                },
+                {
+                    "id": "another_dummy_course_id",
+                    "name": "dummy_course",
+                    "course_abbreviation": "DN",
+                },
             ]
 
-            user_mock.side_effect = [
-                MockUserReference("Dummy Name"),
-                MockUserReference("Another Dummy Name"),
-                MockUserReference("Assignee Name"),
-                MockUserReference("Dummy Name"),
-                MockUserReference("Another Dummy Name"),
-                MockUserReference("Assignee Name"),
-            ]
+            user_mock.return_value = MockGetUsersResult(
+                [MockUserReference("Assignee Name", "dummy_assignee_id")]
+            )
 
             response_code, return_message = db_operator.find_all(
                 "test", Ticket, [FieldFilter("new", "==", "updated_entity")]
@@ -653,8 +992,8 @@ class TestDbOperator:  # pylint: disable=R0904
                 {
                     "id": "dummy_ticket_id",
                     "name": "dummy_ticket",
-                    "created_by_name": "Dummy Name",
-                    "modified_by_name": "Another Dummy Name",
+                    "created_by_name": "Unknown",
+                    "modified_by_name": "Unknown",
                     "course_id": "dummy_course_id",
                     "course_name": "dummy_course",
                     "course_abbreviation": "DN",
@@ -664,8 +1003,8 @@ class TestDbOperator:  # pylint: disable=R0904
                 {
                     "id": "another_dummy_ticket_id",
                     "name": "another_dummy_ticket",
-                    "created_by_name": "Dummy Name",
-                    "modified_by_name": "Another Dummy Name",
+                    "created_by_name": "Unknown",
+                    "modified_by_name": "Unknown",
                     "course_id": "another_dummy_course_id",
                     "course_name": "dummy_course",
                     "course_abbreviation": "DN",
@@ -673,6 +1012,7 @@ class TestDbOperator:  # pylint: disable=R0904
                     "assignee_name": "Assignee Name",
                 },
             ]
+            user_mock.assert_called_once()
 
     def test_find_all_failing_with_filter_field_unknown(self, db_operator) -> None:
         """Tests querying a database collection failing, as the filters are invalid."""
@@ -700,6 +1040,21 @@ class TestDbOperator:  # pylint: disable=R0904
             assert response_code == 500
             assert return_message is None
 
+    def test_find_all_failing_without_index(self, db_operator) -> None:
+        """Tests querying a page failing, as the index of its filter is missing."""
+        with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
+            query_mock = collection_mock.return_value.where.return_value
+            query_mock.order_by.return_value.limit.return_value.stream.side_effect = (
+                FailedPrecondition("The query requires an index.")
+            )
+
+            response_code, return_message = db_operator.find_all(
+                "ticket", Ticket, [FieldFilter("created_by", "==", "1")], PageRequest(10)
+            )
+
+            assert response_code == 500
+            assert return_message.startswith("Could not query the entries of ticket")
+
     def test_delete_successful(self, db_operator) -> None:
         """Tests deleting a database entity successfully."""
         return_code, return_message = db_operator.delete("test", "dummy_id")
@@ -709,11 +1064,8 @@ class TestDbOperator:  # pylint: disable=R0904
 
     def test_delete_failed_with_timeout(self, db_operator) -> None:
         """Tests deleting a database entity failing, as it timed out."""
-        with mock.patch.object(db_operator.db_client, "collection") as collection_mock:
-            collection_mock.return_value = collection_return_mock = mock.Mock()
-            collection_return_mock.document().delete.side_effect = TimeoutError(
-                "Timeout Error"
-            )
+        with mock.patch.object(db_operator.db_client, "batch") as batch_mock:
+            batch_mock.return_value.commit.side_effect = TimeoutError("Timeout Error")
             return_code, return_message = db_operator.delete("test", "dummy_id")
 
             assert return_code == 500
@@ -730,12 +1082,12 @@ class TestDbOperator:  # pylint: disable=R0904
         with mock.patch.object(
             db_operator.db_client, "collection"
         ) as collection_mock, mock.patch(
-            "firebase_admin.auth.get_user"
+            "firebase_admin.auth.get_users"
         ) as user_mock, mock.patch(
             "firebase_admin.firestore.client"
         ), mock.patch(
-            "db_operator.DatabaseOperator.read"
-        ) as read_mock:
+            "course_cache.CourseCache.get"
+        ) as course_mock:
             collection_mock.return_value = collection_return_mock = mock.Mock()
             collection_return_mock.where.return_value = filtered_mock = mock.Mock()
             filtered_mock.stream.return_value = [
@@ -744,6 +1096,7 @@ class TestDbOperator:  # pylint: disable=R0904
                     identifier="dummy_ticket_history_id",
                     name="Dummy Ticket History",
                     additional_attributes={
+                        "created_by": "creator_id",
                         "previous_values": {
                             "course_id": "dummy_course_id",
                             "assignee_id": "dummy_assignee_id",
@@ -759,6 +1112,7 @@ class TestDbOperator:  # pylint: disable=R0904
                     identifier="another_dummy_ticket_history_id",
                     name="Another Dummy Ticket History",
                     additional_attributes={
+                        "created_by": "creator_id",
                         "previous_values": {
                             "course_id": "another_dummy_course_id",
                             "assignee_id": "dummy_assignee_id",
@@ -770,51 +1124,35 @@ class TestDbOperator:  # pylint: disable=R0904
                     },
                 ),
             ]
-            read_mock.side_effect = [
-                (
-                    200,
-                    {
-                        "id": "dummy_course_id",
-                        "name": "dummy_course",
-                        "course_abbreviation": "DN",
-                    },
-                ),
-                (
-                    200,
-                    {
-                        "id": "dummy_course_id_2",
-                        "name": "dummy_course_2",
-                        "course_abbreviation": "DN 2",
-                    },
-                ),
-                (
-                    200,
-                    {
-                        "id": "another_dummy_course_id",
-                        "name": "dummy_course",
-                        "course_abbreviation": "DN",
-                    },
-                ),
-                (
-                    200,
-                    {
-                        "id": "another_dummy_course_id_2",
-                        "name": "dummy_course_2",
-                        "course_abbreviation": "DN 2",
-                    },
-                ),
+            course_mock.side_effect = [
+                {
+                    "id": "dummy_course_id",
+                    "name": "dummy_course",
+                    "course_abbreviation": "DN",
+                },
+                {
+                    "id": "dummy_course_id_2",
+                    "name": "dummy_course_2",
+                    "course_abbreviation": "DN 2",
+                },
+                {
+                    "id": "another_dummy_course_id",
+                    "name": "dummy_course",
+                    "course_abbreviation": "DN",
+                },
+                {
+                    "id": "another_dummy_course_id_2",
+                    "name": "dummy_course_2",
+                    "course_abbreviation": "DN 2",
+                },
             ]
 
-            user_mock.side_effect = [
-                MockUserReference("Dummy Name"),
-                MockUserReference("Another Dummy Name"),
-                MockUserReference("Assignee Name"),
-                MockUserReference("Assignee Name"),
-                MockUserReference("Dummy Name"),
-                MockUserReference("Another Dummy Name"),
-                MockUserReference("Assignee Name"),
-                MockUserReference("Assignee Name"),
-            ]
+            user_mock.return_value = MockGetUsersResult(
+                [
+                    MockUserReference("Dummy Name", "creator_id"),
+                    MockUserReference("Assignee Name", "dummy_assignee_id"),
+                ]
+            )
 
             response_code, return_message = db_operator.find_all(
                 "test", TicketHistory, [FieldFilter("new", "==", "updated_entity")]
@@ -825,8 +1163,9 @@ class TestDbOperator:  # pylint: disable=R0904
                 {
                     "id": "dummy_ticket_history_id",
                     "name": "Dummy Ticket History",
+                    "created_by": "creator_id",
                     "created_by_name": "Dummy Name",
-                    "modified_by_name": "Another Dummy Name",
+                    "modified_by_name": "Unknown",
                     "previous_values": {
                         "course_id": "dummy_course_id",
                         "course_name": "dummy_course",
@@ -845,8 +1184,9 @@ class TestDbOperator:  # pylint: disable=R0904
                 {
                     "id": "another_dummy_ticket_history_id",
                     "name": "Another Dummy Ticket History",
+                    "created_by": "creator_id",
                     "created_by_name": "Dummy Name",
-                    "modified_by_name": "Another Dummy Name",
+                    "modified_by_name": "Unknown",
                     "previous_values": {
                         "course_id": "another_dummy_course_id",
                         "course_name": "dummy_course",
@@ -863,16 +1203,18 @@ class TestDbOperator:  # pylint: disable=R0904
                     },
                 },
             ]
+            user_mock.assert_called_once()
 
     def test_update_ticket_create_history_successful(self, db_operator) -> None:
         """Tests a successful database entity update of a ticket. Should create a history entry."""
         with mock.patch.object(
             db_operator.db_client, "collection"
-        ) as collection_mock, mock.patch(
-            "db_operator.DatabaseOperator.create"
-        ) as create_mock:
+        ) as collection_mock, mock.patch.object(
+            db_operator.db_client, "batch"
+        ) as batch_mock:
             collection_mock.return_value = collection_return_mock = mock.Mock()
             collection_return_mock.document.return_value = element_mock = mock.Mock()
+            batch_mock.return_value = batch_return_mock = mock.Mock()
 
             element_mock.get.return_value = MockDocReference(
                 True,
@@ -883,7 +1225,6 @@ class TestDbOperator:  # pylint: disable=R0904
                     "assignee_id": "dummy_assignee_id",
                 },
             )
-            create_mock.return_value = 201, {"id": "new_item_id"}
             return_code, return_message = db_operator.update(
                 "ticket",
                 {"course_id": "new_course_id"},
@@ -893,16 +1234,24 @@ class TestDbOperator:  # pylint: disable=R0904
 
             assert return_code == 200
             assert return_message == "dummy_ticket_id"
+            batch_return_mock.update.assert_called_once()
+            history_entry = batch_return_mock.set.call_args_list[0].args[1]
+            assert history_entry["ticket_id"] == "dummy_ticket_id"
+            assert history_entry["changed_values"] == {"course_id": "new_course_id"}
+            assert history_entry["previous_values"] == {"course_id": "dummy_course_id"}
+            batch_return_mock.commit.assert_called_once()
+            element_mock.update.assert_not_called()
 
     def test_update_ticket_create_history_failing(self, db_operator) -> None:
-        """Tests a failing database entity update of a ticket. Cannot create history entry."""
+        """Tests a failing database entity update of a ticket. Cannot commit the batch."""
         with mock.patch.object(
             db_operator.db_client, "collection"
-        ) as collection_mock, mock.patch(
-            "db_operator.DatabaseOperator.create"
-        ) as create_mock:
+        ) as collection_mock, mock.patch.object(
+            db_operator.db_client, "batch"
+        ) as batch_mock:
             collection_mock.return_value = collection_return_mock = mock.Mock()
             collection_return_mock.document.return_value = element_mock = mock.Mock()
+            batch_mock.return_value.commit.side_effect = TimeoutError("Timeout Error")
 
             element_mock.get.return_value = MockDocReference(
                 True,
@@ -913,7 +1262,6 @@ class TestDbOperator:  # pylint: disable=R0904
                     "assignee_id": "dummy_assignee_id",
                 },
             )
-            create_mock.return_value = 500, "Very Bad Error"
             return_code, return_message = db_operator.update(
                 "ticket",
                 {"course_id": "new_course_id"},
@@ -922,7 +1270,7 @@ class TestDbOperator:  # pylint: disable=R0904
             )
 
             assert return_code == 500
-            assert return_message == "Very Bad Error"
+            assert return_message == "Timed out while trying to update entry!"
 
     def test_get_duplicate_successful_no_duplicate(self, db_operator) -> None:
         """Tests a successful duplication check, with no duplicates found."""
@@ -956,3 +1304,308 @@ class TestDbOperator:  # pylint: disable=R0904
 
             assert successful_checked is False
             assert duplicate == "Could not check for duplicates!"
+
+    def test_update_ticket_modified_in_the_meantime(self, db_operator) -> None:
+        """Tests a failing database entity update of a ticket. Ticket changed after reading."""
+        with mock.patch.object(
+            db_operator.db_client, "batch"
+        ) as batch_mock, mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock:
+            collection_mock.return_value.document.return_value = element_mock = (
+                mock.Mock()
+            )
+            batch_mock.return_value.commit.side_effect = FailedPrecondition(
+                "update time does not match"
+            )
+            element_mock.get.return_value = MockDocReference(
+                True,
+                identifier="dummy_ticket_id",
+                name="dummy_ticket",
+                additional_attributes={"course_id": "dummy_course_id"},
+            )
+
+            return_code, return_message = db_operator.update(
+                "ticket",
+                {"course_id": "new_course_id"},
+                "dummy_ticket_id",
+                history_type=TicketHistory,
+            )
+
+            assert return_code == 412
+            assert return_message == "Element was modified in the meantime!"
+
+    def test_update_ticket_without_changes(self, db_operator) -> None:
+        """Tests a database entity update of a ticket without changes. Nothing is written."""
+        with mock.patch.object(
+            db_operator.db_client, "batch"
+        ) as batch_mock, mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock:
+            collection_mock.return_value.document.return_value = element_mock = (
+                mock.Mock()
+            )
+            element_mock.get.return_value = MockDocReference(
+                True,
+                identifier="dummy_ticket_id",
+                name="dummy_ticket",
+                additional_attributes={"course_id": "dummy_course_id"},
+            )
+
+            return_code, return_message = db_operator.update(
+                "ticket",
+                {"course_id": "dummy_course_id"},
+                "dummy_ticket_id",
+                history_type=TicketHistory,
+            )
+
+            assert return_code == 200
+            assert return_message == "dummy_ticket_id"
+            batch_mock.return_value.commit.assert_not_called()
+
+    def test_create_with_unique_key_successful(self, db_operator) -> None:
+        """Tests a successful database entity creation reserving a unique key."""
+        with mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock, mock.patch.object(
+            db_operator.db_client, "batch"
+        ) as batch_mock:
+            collection_mock.return_value.limit().get.return_value = "exists"
+            batch_mock.return_value = batch_return_mock = mock.Mock()
+
+            return_code, return_message = db_operator.create(
+                "course",
+                {"course_abbreviation": "SE", "name": "Software"},
+                "dummy_id",
+                unique_fields=["course_abbreviation"],
+            )
+
+            assert return_code == 201
+            assert return_message == "dummy_id"
+            assert batch_return_mock.create.call_args.args[1] == {
+                "collection": "course",
+                "document_id": "dummy_id",
+            }
+            assert batch_return_mock.set.call_count == 2
+            batch_return_mock.commit.assert_called_once()
+
+    def test_create_with_unique_key_duplicate(self, db_operator) -> None:
+        """Tests a failing database entity creation. Unique key is already reserved."""
+        with mock.patch.object(
+            db_operator.db_client, "batch"
+        ) as batch_mock, mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock:
+            collection_mock.return_value.limit().get.return_value = "exists"
+            batch_mock.return_value.commit.side_effect = AlreadyExists("reserved")
+            collection_mock.return_value.document().get.return_value = (
+                MockDocReference(
+                    True,
+                    identifier="unique_key",
+                    additional_attributes={"document_id": "duplicate_id"},
+                )
+            )
+
+            return_code, return_message = db_operator.create(
+                "course",
+                {"course_abbreviation": "SE", "name": "Software"},
+                unique_fields=["course_abbreviation"],
+            )
+
+            assert return_code == 409
+            assert return_message == "duplicate_id"
+
+    def test_create_with_unique_key_owner_missing(self, db_operator) -> None:
+        """Tests a failing database entity creation. Reserved unique key cannot be loaded."""
+        with mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock, mock.patch.object(
+            db_operator.db_client, "batch"
+        ) as batch_mock:
+            collection_mock.return_value.limit().get.return_value = "exists"
+            batch_mock.return_value.commit.side_effect = AlreadyExists("reserved")
+            collection_mock.return_value.document().get.side_effect = TimeoutError(
+                "Timeout Error"
+            )
+
+            return_code, return_message = db_operator.create(
+                "course",
+                {"course_abbreviation": "SE", "name": "Software"},
+                unique_fields=["course_abbreviation"],
+            )
+
+            assert return_code == 500
+            assert return_message == "Could not check for duplicates!"
+
+    def test_update_with_unique_key_changed(self, db_operator) -> None:
+        """Tests a successful database entity update moving the unique key."""
+        with mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock, mock.patch.object(
+            db_operator.db_client, "batch"
+        ) as batch_mock:
+            collection_mock.return_value.document.return_value = element_mock = (
+                mock.Mock()
+            )
+            batch_mock.return_value = batch_return_mock = mock.Mock()
+            element_mock.get.return_value = MockDocReference(
+                True,
+                identifier="dummy_id",
+                name="Software",
+                additional_attributes={"course_abbreviation": "SE"},
+            )
+
+            return_code, return_message = db_operator.update(
+                "course",
+                {"course_abbreviation": "SWE", "name": "Software"},
+                "dummy_id",
+                unique_fields=["course_abbreviation"],
+            )
+
+            assert return_code == 200
+            assert return_message == "dummy_id"
+            batch_return_mock.create.assert_called_once()
+            batch_return_mock.delete.assert_called_once()
+            batch_return_mock.update.assert_called_once()
+
+    def test_update_with_unique_key_unchanged(self, db_operator) -> None:
+        """Tests a successful database entity update keeping the unique key."""
+        with mock.patch.object(
+            db_operator.db_client, "batch"
+        ) as batch_mock, mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock:
+            collection_mock.return_value.document.return_value = element_mock = (
+                mock.Mock()
+            )
+            element_mock.get.return_value = MockDocReference(
+                True,
+                identifier="dummy_id",
+                name="Software",
+                additional_attributes={"course_abbreviation": "SE"},
+            )
+
+            return_code, _ = db_operator.update(
+                "course",
+                {"course_abbreviation": "SE", "name": "Software Engineering"},
+                "dummy_id",
+                unique_fields=["course_abbreviation"],
+            )
+
+            assert return_code == 200
+            batch_mock.return_value.create.assert_not_called()
+            batch_mock.return_value.update.assert_called_once()
+
+    def test_update_with_unique_key_duplicate(self, db_operator) -> None:
+        """Tests a failing database entity update. New unique key is already reserved."""
+        with mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock, mock.patch.object(
+            db_operator.db_client, "batch"
+        ) as batch_mock:
+            collection_mock.return_value.document.return_value = element_mock = (
+                mock.Mock()
+            )
+            batch_mock.return_value.commit.side_effect = AlreadyExists("reserved")
+            element_mock.get.side_effect = [
+                MockDocReference(
+                    True,
+                    identifier="dummy_id",
+                    additional_attributes={"course_abbreviation": "SE"},
+                ),
+                MockDocReference(
+                    True,
+                    identifier="unique_key",
+                    additional_attributes={"document_id": "duplicate_id"},
+                ),
+            ]
+
+            return_code, return_message = db_operator.update(
+                "course",
+                {"course_abbreviation": "DB"},
+                "dummy_id",
+                unique_fields=["course_abbreviation"],
+            )
+
+            assert return_code == 409
+            assert return_message == "duplicate_id"
+
+    def test_delete_with_unique_key(self, db_operator) -> None:
+        """Tests a successful delete, which also releases the unique key."""
+        with mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock, mock.patch.object(
+            db_operator.db_client, "batch"
+        ) as batch_mock:
+            collection_mock.return_value.document.return_value = element_mock = (
+                mock.Mock()
+            )
+            element_mock.get.return_value = MockDocReference(
+                True,
+                identifier="dummy_id",
+                additional_attributes={"course_abbreviation": "SE"},
+            )
+
+            return_code, return_message = db_operator.delete(
+                "course", "dummy_id", ["course_abbreviation"]
+            )
+
+            assert return_code == 204
+            assert return_message is None
+            assert batch_mock.return_value.delete.call_count == 2
+            batch_mock.return_value.commit.assert_called_once()
+            element_mock.delete.assert_not_called()
+
+    def test_get_versions(self, db_operator) -> None:
+        """Tests that the versions of multiple collections are loaded at once."""
+        with mock.patch.object(db_operator.db_client, "get_all") as get_all_mock:
+            get_all_mock.return_value = [
+                MockDocReference(
+                    True, identifier="ticket", additional_attributes={"version": 3}
+                ),
+                MockDocReference(
+                    True, identifier="ticket-4", additional_attributes={"version": 2}
+                ),
+                MockDocReference(False, identifier="user"),
+            ]
+
+            with mock.patch.dict("versioning.VERSION_SHARDS", {"ticket": 10}):
+                versions = db_operator.get_versions(["ticket", "course", "user"])
+
+            assert versions == {"ticket": 5, "course": 0, "user": 0}
+            get_all_mock.assert_called_once()
+            # Every shard of the counters is loaded.
+            assert len(get_all_mock.call_args.args[0]) == 12
+
+    def test_get_versions_timeout(self, db_operator) -> None:
+        """Tests that no versions are returned if they cannot be loaded."""
+        with mock.patch.object(db_operator.db_client, "get_all") as get_all_mock:
+            get_all_mock.side_effect = TimeoutError("Timeout Error")
+
+            assert db_operator.get_versions(["course"]) is None
+
+    def test_increment_versions(self, db_operator) -> None:
+        """Tests that the version counters are incremented in one batch."""
+        with mock.patch.object(db_operator.db_client, "batch") as batch_mock:
+            assert db_operator.increment_versions("user", "course") is True
+            assert batch_mock.return_value.set.call_count == 2
+            assert batch_mock.return_value.set.call_args.kwargs == {"merge": True}
+            batch_mock.return_value.commit.assert_called_once()
+
+            batch_mock.return_value.commit.side_effect = TimeoutError("Timeout Error")
+            assert db_operator.increment_versions("user") is False
+
+    def test_increment_versions_sharded(self, db_operator) -> None:
+        """Tests that the increments are spread over the shards of the counter."""
+        with mock.patch.object(db_operator.db_client, "batch"), mock.patch.object(
+            db_operator.db_client, "collection"
+        ) as collection_mock, mock.patch.dict(
+            "versioning.VERSION_SHARDS", {"course": 10}
+        ):
+            for _ in range(50):
+                db_operator.increment_versions("course")
+
+        document_mock = collection_mock.return_value.document
+        shards = {call.args[0] for call in document_mock.call_args_list}
+        assert len(shards) > 1
+        assert shards <= {"course", *(f"course-{shard}" for shard in range(1, 10))}
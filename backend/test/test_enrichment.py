@@ -0,0 +1,129 @@
+"""
+    Testing the concurrent lookups of the enrichment.
+"""
+from threading import Event, current_thread
+from time import perf_counter
+from unittest import mock
+import pytest
+from enrichment import EnrichmentExecutor
+from request_context import AUTH, end_request, request_metrics, start_request, track_rpc
+
+
+class TestEnrichment:
+    """Contains tests for the enrichment executor."""
+
+    @pytest.fixture(name="executor")
+    def fixture_executor(self):
+        """Creates an executor with multiple workers for the test."""
+        executor = EnrichmentExecutor(max_workers=4, timeout_seconds=5)
+        yield executor
+        executor.shutdown()
+
+    def test_map_keeps_order(self, executor) -> None:
+        """Tests that the results are returned in the order of the items."""
+        assert executor.map(lambda item: item * 2, range(10)) == list(range(0, 20, 2))
+
+    def test_map_concurrently(self, executor) -> None:
+        """Tests that the lookups run in the worker threads."""
+        thread_names = executor.map(lambda _: current_thread().name, range(4))
+
+        assert all(name.startswith("enrichment") for name in thread_names)
+
+    def test_map_sequentially(self) -> None:
+        """Tests that a single worker runs the lookups in the calling thread."""
+        executor = EnrichmentExecutor(max_workers=1, timeout_seconds=5)
+
+        assert executor.map(lambda _: current_thread().name, range(3)) == [
+            current_thread().name
+        ] * 3
+        assert executor.map(lambda item: item, []) == []
+
+    def test_map_timeout(self) -> None:
+        """Tests that lookups exceeding the deadline receive the default value."""
+        executor = EnrichmentExecutor(max_workers=2, timeout_seconds=0.05)
+        release = Event()
+
+        def lookup(item: int) -> int:
+            if item == 1:
+                release.wait(5)
+            return item
+
+        with mock.patch("enrichment.logger") as logger_mock:
+            assert executor.map(lookup, [0, 1], default=-1) == [0, -1]
+            logger_mock.warn.assert_called_once()
+        release.set()
+        executor.shutdown()
+
+    def test_map_deadline_of_request(self) -> None:
+        """Tests that the deadline is counted from the start of the request."""
+        executor = EnrichmentExecutor(max_workers=2, timeout_seconds=5)
+        release = Event()
+
+        def lookup(item: int) -> int:
+            if item == 1:
+                release.wait(5)
+            return item
+
+        token = start_request()
+        request_metrics.get().deadline_start = perf_counter() - 4.95
+        with mock.patch("enrichment.logger"):
+            assert executor.map(lookup, [0, 1], default=-1) == [0, -1]
+        release.set()
+
+        request_metrics.get().deadline_start = perf_counter() - 5
+        lookup_mock = mock.Mock()
+        with mock.patch("enrichment.logger") as logger_mock:
+            assert executor.map(lookup_mock, [0, 1], default=-1) == [-1, -1]
+            logger_mock.warn.assert_called_once()
+        lookup_mock.assert_not_called()
+        assert executor.map(lambda item: item, [0, 1], wait_all=True) == [0, 1]
+        end_request(token)
+        executor.shutdown()
+
+    def test_map_wait_all(self) -> None:
+        """Tests that all calls are awaited without a deadline, if requested."""
+        executor = EnrichmentExecutor(max_workers=2, timeout_seconds=0.01)
+
+        def write(item: int) -> int:
+            Event().wait(0.05)
+            return item
+
+        assert executor.map(write, [0, 1], default=-1, wait_all=True) == [0, 1]
+        executor.shutdown()
+
+    def test_map_in_request_context(self, executor) -> None:
+        """Tests that the calls of the lookups are recorded for the request."""
+
+        def lookup(item: int) -> int:
+            with track_rpc(AUTH):
+                return item
+
+        token = start_request()
+        metrics = request_metrics.get()
+        executor.map(lookup, range(3))
+        end_request(token)
+
+        assert metrics.calls == {AUTH: 3}
+
+    def test_gather(self, executor) -> None:
+        """Tests that independent functions run concurrently in the given order."""
+        results = executor.gather(
+            lambda: current_thread().name, lambda: current_thread().name, lambda: 3
+        )
+
+        assert results[0] == current_thread().name
+        assert results[1].startswith("enrichment")
+        assert results[2] == 3
+
+    def test_gather_error(self, executor) -> None:
+        """Tests that errors are raised after all functions finished."""
+        finished = Event()
+
+        def fail() -> None:
+            raise TimeoutError("Timeout")
+
+        with pytest.raises(TimeoutError):
+            executor.gather(fail, finished.set)
+        assert finished.is_set()
+        with pytest.raises(TimeoutError):
+            executor.gather(lambda: None, fail)
@@ -1,10 +1,20 @@
 """
     Testing the logger utility methods.
 """
+from datetime import datetime
+import io
 import json
+import threading
 from unittest import mock
 import pytest
-from logger_utils import Logger, LogLevel
+from logger_utils import (
+    Logger,
+    LogLevel,
+    LogWriter,
+    flush_logs,
+    parse_component_log_levels,
+    parse_log_level,
+)
 
 
 class TestLoggerUtils:
@@ -95,3 +105,151 @@ class TestLoggerUtils:
             assert json_format_args["message"] == "Dummy error Message"
             assert json_format_args["component"] == "different_component"
             assert json_format_args["additional"] == "field"
+
+    def test_log_async(self, logger) -> None:
+        """Tests that log entries are passed to the writer if async logging is enabled."""
+        with mock.patch("logger_utils.ASYNC_LOGGING", True), mock.patch(
+            "logger_utils.log_writer"
+        ) as writer_mock, mock.patch("builtins.print") as print_mock:
+            logger.info("Dummy async Message")
+
+            print_mock.assert_not_called()
+            entry = writer_mock.write.call_args.args[0]
+            assert entry["severity"] == "INFO"
+            assert entry["message"] == "Dummy async Message"
+
+    def test_log_writer_batches(self) -> None:
+        """Tests that the writer writes all entries as JSON lines."""
+        stream = io.StringIO()
+        writer = LogWriter(stream=stream)
+        for index in range(3):
+            writer.write(
+                {"time": datetime.now(), "severity": "INFO", "message": str(index)}
+            )
+
+        assert writer.flush(timeout=5) is True
+        lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+        assert [line["message"] for line in lines] == ["0", "1", "2"]
+        assert writer.stats() == {"queued": 0, "dropped": 0, "failed": 0}
+
+    def test_log_writer_drops_when_full(self) -> None:
+        """Tests that entries are dropped and reported if the queue is full."""
+        writing, release = threading.Event(), threading.Event()
+        stream = mock.Mock()
+        written = []
+
+        def blocking_write(text):
+            written.append(text)
+            writing.set()
+            release.wait(timeout=5)
+
+        stream.write.side_effect = blocking_write
+        writer = LogWriter(max_queue_size=1, stream=stream)
+        writer.write({"time": datetime.now(), "message": "first"})
+        writing.wait(timeout=5)
+        writer.write({"time": datetime.now(), "message": "second"})
+        writer.write({"time": datetime.now(), "message": "dropped"})
+        assert writer.stats() == {"queued": 1, "dropped": 1, "failed": 0}
+
+        release.set()
+        assert writer.flush(timeout=5) is True
+        messages = [
+            json.loads(line)["message"]
+            for text in written
+            for line in text.splitlines()
+        ]
+        assert messages == [
+            "first",
+            "second",
+            "Dropped 1 log message(s), queue was full.",
+        ]
+
+    def test_log_writer_survives_errors(self) -> None:
+        """Tests that failed entries are reported and the writer keeps running."""
+        stream = mock.Mock()
+        written = []
+
+        def write(text):
+            if not written:
+                written.append(None)
+                raise OSError("Broken pipe")
+            written.append(text)
+
+        stream.write.side_effect = write
+        writer = LogWriter(stream=stream)
+        writer.write({"time": datetime.now(), "message": "lost"})
+        assert writer.flush(timeout=5) is True
+
+        writer.write({"time": datetime.now(), "message": object()})
+        writer.write({"time": datetime.now(), "message": "written"})
+        assert writer.flush(timeout=5) is True
+        messages = [
+            json.loads(line)["message"]
+            for text in written[1:]
+            for line in text.splitlines()
+        ]
+        assert "written" in messages
+        assert "Failed to write 1 log message(s)." in messages
+        assert writer.stats()["failed"] == 1
+
+    def test_flush_logs_disabled(self) -> None:
+        """Tests that nothing is flushed if async logging is disabled."""
+        with mock.patch("logger_utils.log_writer") as writer_mock:
+            flush_logs()
+
+            writer_mock.flush.assert_not_called()
+
+    def test_log_format_args(self, logger) -> None:
+        """Tests that the message is formatted with the given args."""
+        with mock.patch("builtins.print") as print_mock:
+            logger.info("Loaded %s element(s) of '%s'", args=(2, "course"))
+
+            json_format_args = json.loads(print_mock.call_args.args[0])
+            assert json_format_args["message"] == "Loaded 2 element(s) of 'course'"
+
+    def test_log_lazy_message(self) -> None:
+        """Tests that lazy messages are only built if the severity is logged."""
+        message_mock = mock.Mock(return_value="Expensive Message")
+        with mock.patch("builtins.print") as print_mock:
+            logger = Logger(LogLevel.INFO, "dummy_component")
+            logger.debug(message_mock)
+            message_mock.assert_not_called()
+
+            logger.error(message_mock)
+            message_mock.assert_called_once()
+            json_format_args = json.loads(print_mock.call_args.args[0])
+            assert json_format_args["message"] == "Expensive Message"
+
+    def test_component_log_levels(self) -> None:
+        """Tests that the log level is taken from the component configuration."""
+        with mock.patch.dict(
+            "logger_utils.COMPONENT_LOG_LEVELS", {"verbose_component": 1}
+        ), mock.patch("logger_utils.LOG_LEVEL", 3):
+            assert Logger(component="verbose_component").log_level == 1
+            assert Logger(component="other_component").log_level == 3
+            assert Logger(2, "verbose_component").log_level == 2
+
+    def test_parse_component_log_levels(self) -> None:
+        """Tests that configured log levels are parsed by name or number."""
+        assert parse_component_log_levels(" db_utils=DEBUG,main=4, invalid,x=") == {
+            "db_utils": 1,
+            "main": 4,
+        }
+        assert parse_log_level("unknown", 2) == 2
+
+    def test_info_sampling(self) -> None:
+        """Tests that sampled INFO messages are logged deterministically every n-th time."""
+        with mock.patch("builtins.print") as print_mock:
+            logger = Logger(LogLevel.INFO, "dummy_component")
+            logger.sample_rate = 0.25
+            for index in range(8):
+                logger.info("Sampled %s", args=(index,), sampled=True)
+            logger.info("Not sampled")
+
+            messages = [
+                json.loads(call.args[0])["message"]
+                for call in print_mock.call_args_list
+            ]
+            assert messages == ["Sampled 0", "Sampled 4", "Not sampled"]
+            first_entry = json.loads(print_mock.call_args_list[0].args[0])
+            assert first_entry["sample_rate"] == 0.25
@@ -1,12 +1,14 @@
 """
     Testing the main handler for the Cloud Function.
 """
+import gzip
 import json
 import os
 from unittest.mock import patch
 import flask
 import pytest
 import main
+from backend.test.fakes import FakeAuth, FakeFirestoreClient, FakeUserRecord
 
 
 class TestMain:  # pylint: disable=R0904
@@ -18,6 +20,12 @@ class TestMain:  # pylint: disable=R0904
         with patch("firebase_admin.initialize_app"):
             yield
 
+    @pytest.fixture(autouse=True)
+    def fixture_warm_up(self):
+        """Mocks the background warm-up, which prefetches the token certificates."""
+        with patch("startup.startup.warm_up"):
+            yield
+
     @pytest.fixture(autouse=True)
     def fixture_init_firestore_client(self):
         """Mocks the firstore client method."""
@@ -33,7 +41,7 @@ class TestMain:  # pylint: disable=R0904
                 == "https://projekt-software-engineering.web.app"
             )
             assert (
-                res[2].get("Access-Control-Allow-Methods") == "GET, PUT, POST, DELETE"
+                res[2].get("Access-Control-Allow-Methods") == "GET, PUT, PATCH, POST, DELETE"
             )
             assert (
                 res[2].get("Access-Control-Allow-Headers")
@@ -42,6 +50,16 @@ class TestMain:  # pylint: disable=R0904
             assert res[2].get("Access-Control-Max-Age") == "3600"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
 
+    def test_preflight_starts_warm_up(self, app) -> None:
+        """Tests that a preflight request prepares the following request."""
+        with app.test_request_context(method="OPTIONS"), patch(
+            "startup.startup.warm_up"
+        ) as warm_up_mock, patch("startup.startup.get_handlers") as handlers_mock:
+            main.request_handler(flask.request)
+
+            warm_up_mock.assert_called_once()
+            handlers_mock.assert_not_called()
+
     def test_cors_enabled_function_auth_preflight_local_testing(
         self, app, _environment_variables
     ) -> None:
@@ -50,7 +68,7 @@ class TestMain:  # pylint: disable=R0904
             res = main.request_handler(flask.request)
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert (
-                res[2].get("Access-Control-Allow-Methods") == "GET, PUT, POST, DELETE"
+                res[2].get("Access-Control-Allow-Methods") == "GET, PUT, PATCH, POST, DELETE"
             )
             assert (
                 res[2].get("Access-Control-Allow-Headers")
@@ -86,22 +104,43 @@ class TestMain:  # pylint: disable=R0904
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
 
+    def test_logs_flushed_after_request(self, app) -> None:
+        """Tests that the buffered logs are written before the response is sent."""
+        with patch("main.flush_logs") as flush_mock, patch.dict(
+            os.environ, {"DISABLE_AUTH": "True"}
+        ), app.test_request_context("/unknown", method="GET"):
+            res = main.request_handler(flask.request)
+            assert res[1] == 400
+            flush_mock.assert_called_once()
+
     def test_data_handler_request(self, app) -> None:
         """Tests a request forward to the data handler."""
         with app.test_request_context("/data/course", method="GET"), patch(
-            "db_operator.DatabaseOperator.read_all"
+            "db_operator.DatabaseOperator.stream_all"
         ) as read_mock:
             read_mock.return_value = 200, [
                 {"id": "my_dummy"},
                 {"id": "my_other_dummy"},
             ]
             res = main.request_handler(flask.request)
-            loaded_res = json.loads(res[0])
+            loaded_res = json.loads(b"".join(res[0]))
             assert len(loaded_res) == 2
             assert res[1] == 200
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
 
+    def test_data_handler_request_compressed(self, app) -> None:
+        """Tests that the response of the data handler is compressed."""
+        with app.test_request_context(
+            "/data/course", method="GET", headers={"Accept-Encoding": "gzip"}
+        ), patch("db_operator.DatabaseOperator.stream_all") as read_mock, patch(
+            "compression.brotli", None
+        ):
+            read_mock.return_value = 200, [{"id": "my_dummy"}]
+            res = main.request_handler(flask.request)
+            assert json.loads(gzip.decompress(b"".join(res[0]))) == [{"id": "my_dummy"}]
+            assert res[2].get("Content-Encoding") == "gzip"
+
     def test_api_handler_request(self, app) -> None:
         """Tests a request forward to the api handler."""
         with app.test_request_context("/api/invalid", method="GET"):
@@ -110,3 +149,68 @@ class TestMain:  # pylint: disable=R0904
             assert res[1] == 400
             assert res[2].get("Access-Control-Allow-Origin") == "*"
             assert res[2].get("Access-Control-Allow-Credentials") == "true"
+
+    def test_requests_against_fakes(self, app) -> None:
+        """Tests a sequence of requests against the in-memory Firestore and auth."""
+        firestore_client, fake_auth = FakeFirestoreClient(), FakeAuth()
+        fake_auth.add_user(
+            FakeUserRecord(
+                "admin_id", display_name="Admin", custom_claims={"admin": True}
+            ),
+            "admin-token",
+        )
+        # Entries are only created in existing collections.
+        firestore_client.add_documents(
+            "course",
+            {"course_1": {"course_abbreviation": "DLBINGDT01", "name": "Data"}},
+        )
+        course = {"course_abbreviation": "ISEF01", "name": "Software Engineering"}
+        headers = {"Authorization": "Bearer admin-token"}
+        with patch.dict(
+            os.environ, {"DISABLE_AUTH": "false"}
+        ), firestore_client.patch(), fake_auth.patch():
+            with app.test_request_context(
+                "/data/course", method="POST", json=course, headers=headers
+            ):
+                res = main.request_handler(flask.request)
+                assert res[1] == 201
+                course_id = json.loads(res[0])["id"]
+
+            with app.test_request_context(
+                "/data/course", method="POST", json=course, headers=headers
+            ):
+                res = main.request_handler(flask.request)
+                assert res[1] == 409
+                assert json.loads(res[0]) == {"id": course_id}
+
+            with app.test_request_context(
+                "/data/course?limit=10", method="GET", headers=headers
+            ):
+                res = main.request_handler(flask.request)
+                assert res[1] == 200
+                items = {item["id"]: item for item in json.loads(res[0])["items"]}
+                assert set(items) == {"course_1", course_id}
+                assert items[course_id]["created_by_name"] == "Admin"
+
+        assert fake_auth.rpc_counts["verify_id_token"] == 1
+        # The duplicate is rejected by the unique key in the second commit.
+        assert firestore_client.rpc_counts["commit"] == 2
+
+    def test_server_timing_for_admins(self, app) -> None:
+        """Tests that admins receive the Server-Timing header, if it is enabled."""
+        firestore_client, fake_auth = FakeFirestoreClient(), FakeAuth()
+        fake_auth.add_user(
+            FakeUserRecord("admin_id", custom_claims={"admin": True}), "a"
+        )
+        fake_auth.add_user(FakeUserRecord("user_id"), "u")
+        with patch.dict(os.environ, {"DISABLE_AUTH": "false"}), patch(
+            "request_context.SERVER_TIMING", True
+        ), firestore_client.patch(), fake_auth.patch():
+            for token, expected in (("a", True), ("u", False)):
+                with app.test_request_context(
+                    "/api/user/admin_id", headers={"Authorization": f"Bearer {token}"}
+                ):
+                    res = main.request_handler(flask.request)
+                    assert ("Server-Timing" in res[2]) is expected
+
+        assert res[1] == 403
@@ -0,0 +1,114 @@
+"""
+    Testing the pagination utility methods.
+"""
+from unittest import mock
+from pagination import (
+    PageRequest,
+    apply_page,
+    decode_cursor,
+    encode_cursor,
+    get_page_response,
+    parse_page_request,
+)
+from data_model import Ticket
+
+
+class TestPagination:
+    """Contains tests for the pagination utilities."""
+
+    def test_parse_page_request_not_paginated(self) -> None:
+        """Tests that requests without limit and cursor are not paginated."""
+        page, error_message = parse_page_request({"order_by": "title"}, Ticket)
+
+        assert page is None
+        assert error_message is None
+
+    def test_parse_page_request(self) -> None:
+        """Tests that the pagination parameters are parsed."""
+        page, error_message = parse_page_request(
+            {"limit": "20", "order_by": "-created_at"}, Ticket
+        )
+
+        assert page == PageRequest(20, "created_at", True)
+        assert page.fetch_size == 21
+        assert error_message is None
+
+    def test_parse_page_request_max_page_size(self) -> None:
+        """Tests that the page size is limited by the server."""
+        page, _ = parse_page_request({"limit": "100000"}, Ticket)
+
+        assert page.limit == 100
+
+    def test_parse_page_request_invalid(self) -> None:
+        """Tests that invalid pagination parameters are rejected."""
+        assert parse_page_request({"limit": "ten"}, Ticket) == (
+            None,
+            "Parameter limit must be a number!",
+        )
+        assert parse_page_request({"limit": "0"}, Ticket) == (
+            None,
+            "Parameter limit must be greater than zero!",
+        )
+        page, error_message = parse_page_request(
+            {"limit": "10", "order_by": "unknown"}, Ticket
+        )
+        assert page is None
+        assert error_message.startswith("Parameter order_by is invalid!")
+        assert parse_page_request({"cursor": "invalid"}, Ticket) == (
+            None,
+            "Parameter cursor is invalid!",
+        )
+
+    def test_cursor_round_trip(self) -> None:
+        """Tests that an encoded cursor points behind the last element."""
+        page = PageRequest(10, "title")
+        cursor = encode_cursor(page, {"id": "ticket_id", "title": "My title"})
+
+        assert decode_cursor(cursor, page) == {
+            "title": "My title",
+            "__name__": "ticket_id",
+        }
+        assert decode_cursor(cursor, PageRequest(10, "status")) is None
+        assert decode_cursor(cursor, PageRequest(10, "title", True)) is None
+
+        page, _ = parse_page_request(
+            {"cursor": encode_cursor(PageRequest(10), {"id": "ticket_id"})}, Ticket
+        )
+        assert page.start_after == {"__name__": "ticket_id"}
+
+    def test_apply_page(self) -> None:
+        """Tests that the query is ordered, started after the cursor and limited."""
+        query = mock.Mock()
+        page = PageRequest(10, "title", True, {"title": "A", "__name__": "id"})
+
+        apply_page(query, page)
+
+        query.order_by.assert_called_once_with("title", direction="DESCENDING")
+        query.order_by().order_by.assert_called_once_with(
+            "__name__", direction="DESCENDING"
+        )
+        query.order_by().order_by().start_after.assert_called_once_with(
+            {"title": "A", "__name__": "id"}
+        )
+        query.order_by().order_by().start_after().limit.assert_called_once_with(11)
+
+    def test_apply_page_not_paginated(self) -> None:
+        """Tests that the query is not changed without a page."""
+        query = mock.Mock()
+
+        assert apply_page(query, None) is query
+        query.order_by.assert_not_called()
+
+    def test_get_page_response(self) -> None:
+        """Tests that the next cursor is only returned if there are more elements."""
+        page = PageRequest(2)
+        elements = [{"id": "first"}, {"id": "second"}, {"id": "third"}]
+
+        response = get_page_response(page, elements)
+        assert response["items"] == [{"id": "first"}, {"id": "second"}]
+        assert decode_cursor(response["next_cursor"], page) == {"__name__": "second"}
+
+        assert get_page_response(page, elements[:2]) == {
+            "items": [{"id": "first"}, {"id": "second"}],
+            "next_cursor": None,
+        }
@@ -0,0 +1,53 @@
+"""
+    Testing the projection utility methods.
+"""
+from projection import (
+    get_source_fields,
+    is_selected,
+    parse_field_selection,
+)
+from data_model import Course, Ticket
+
+
+class TestProjection:
+    """Contains tests for the projection utilities."""
+
+    def test_parse_field_selection_all_fields(self) -> None:
+        """Tests that all fields are requested without the fields parameter."""
+        assert parse_field_selection({}, Ticket) == (None, None)
+        assert parse_field_selection({"fields": ""}, Ticket) == (None, None)
+
+    def test_parse_field_selection(self) -> None:
+        """Tests that the selected fields are parsed."""
+        field_names, error_message = parse_field_selection(
+            {"fields": "title, status,course_name,title,"}, Ticket
+        )
+
+        assert field_names == ["title", "status", "course_name"]
+        assert error_message is None
+
+    def test_parse_field_selection_invalid(self) -> None:
+        """Tests that unknown fields are rejected."""
+        field_names, error_message = parse_field_selection(
+            {"fields": "name,course_name"}, Course
+        )
+
+        assert field_names is None
+        assert error_message == (
+            "Parameter fields is invalid! Allowed fields are: id, course_abbreviation, "
+            + "name, created_at, created_by, modified_at, modified_by, "
+            + "created_by_name, modified_by_name"
+        )
+
+    def test_get_source_fields(self) -> None:
+        """Tests that resolved fields are mapped to the stored fields they are based on."""
+        assert get_source_fields(
+            ["id", "title", "course_name", "course_abbreviation", "modified_by_name"],
+            Ticket,
+        ) == ["title", "course_id", "modified_by", "created_by"]
+
+    def test_is_selected(self) -> None:
+        """Tests the check for selected fields."""
+        assert is_selected(None, "title") is True
+        assert is_selected(["title"], "status", "title") is True
+        assert is_selected(["title"], "status") is False
@@ -0,0 +1,148 @@
+"""
+    Testing the request-scoped accounting of the remote calls.
+"""
+from unittest import mock
+import pytest
+import request_context
+from request_context import (
+    AUTH,
+    FIRESTORE_QUERY,
+    FIRESTORE_READ,
+    RequestMetrics,
+    allow_server_timing,
+    complete_response,
+    end_request,
+    get_remaining_time,
+    get_server_timing,
+    request_metrics,
+    restart_deadline,
+    start_request,
+    track_rpc,
+    track_stream,
+)
+
+
+class TestRequestContext:
+    """Contains tests for the request context."""
+
+    @pytest.fixture(name="metrics")
+    def fixture_metrics(self):
+        """Starts the accounting of a request for the test."""
+        token = start_request()
+        yield request_metrics.get()
+        end_request(token)
+
+    def test_track_rpc(self, metrics) -> None:
+        """Tests that the calls and their durations are summed up per category."""
+        with track_rpc(FIRESTORE_READ):
+            pass
+        with pytest.raises(TimeoutError), track_rpc(FIRESTORE_READ):
+            raise TimeoutError("Timeout")
+        with track_rpc(AUTH):
+            pass
+
+        assert metrics.calls == {FIRESTORE_READ: 2, AUTH: 1}
+        assert set(metrics.summary()["rpc"]) == {FIRESTORE_READ, AUTH}
+
+    def test_track_rpc_without_request(self) -> None:
+        """Tests that calls outside of a request are not recorded."""
+        with track_rpc(FIRESTORE_READ):
+            pass
+
+        assert request_metrics.get() is None
+
+    def test_track_stream(self, metrics) -> None:
+        """Tests that a stream is recorded as one call, once it is consumed."""
+        results = track_stream(FIRESTORE_QUERY, iter([1, 2, 3]))
+
+        assert not metrics.calls
+        assert list(results) == [1, 2, 3]
+        assert metrics.calls == {FIRESTORE_QUERY: 1}
+
+    def test_get_remaining_time(self, metrics) -> None:
+        """Tests that the budget is reduced by the time since the start of the request."""
+        metrics.deadline_start -= 2
+
+        assert 0 < get_remaining_time(3) <= 1
+        assert get_remaining_time(1) <= -1
+        restart_deadline()
+        assert 0 < get_remaining_time(1) <= 1
+
+    def test_get_remaining_time_without_request(self) -> None:
+        """Tests that the whole budget remains outside of a request."""
+        assert get_remaining_time(3) == 3
+
+    def test_get_server_timing(self) -> None:
+        """Tests the format of the Server-Timing header."""
+        metrics = RequestMetrics(start=0)
+        metrics.record(FIRESTORE_QUERY, 0.0125)
+        metrics.record(FIRESTORE_QUERY, 0.0025)
+
+        with mock.patch("request_context.perf_counter", return_value=0.02):
+            assert get_server_timing(metrics) == (
+                'firestore_query;dur=15.0;desc="2 calls", total;dur=20.0'
+            )
+
+    def test_complete_response(self, metrics) -> None:
+        """Tests that only allowed requests receive the Server-Timing header."""
+        with mock.patch("request_context.SERVER_TIMING", True), mock.patch(
+            "request_context.logger"
+        ) as logger_mock:
+            _, _, headers = complete_response(("body", 200, {}), "GET", "/data/ticket")
+            assert "Server-Timing" not in headers
+
+            allow_server_timing(True)
+            _, _, headers = complete_response(("body", 200, {}), "GET", "/data/ticket")
+            assert headers["Server-Timing"].startswith("total;dur=")
+            assert logger_mock.info.call_count == 2
+
+        assert metrics.server_timing_allowed is True
+
+    def test_complete_response_disabled(self, metrics) -> None:
+        """Tests that the Server-Timing header is not sent, if not configured."""
+        allow_server_timing(True)
+        with mock.patch("request_context.SERVER_TIMING", False):
+            _, _, headers = complete_response(("body", 200, {}), "GET", "/data/ticket")
+
+        assert metrics.server_timing_allowed is True
+        assert "Server-Timing" not in headers
+
+    def test_complete_response_not_sampled(self, metrics) -> None:
+        """Tests that the summary of every request is logged, despite the sampling."""
+        with mock.patch.object(
+            request_context.logger, "sample_rate", 0.01
+        ), mock.patch("builtins.print") as print_mock:
+            for _ in range(3):
+                complete_response(("body", 200, {}), "GET", "/data/ticket")
+
+        assert metrics.calls == {}
+        assert print_mock.call_count == 3
+
+    def test_complete_streamed_response(self) -> None:
+        """Tests that calls of a streamed body are recorded after the request ended."""
+
+        def generate_body():
+            with track_rpc(AUTH):
+                yield b"[]"
+
+        token = start_request()
+        metrics = request_metrics.get()
+        with mock.patch("request_context.logger") as logger_mock:
+            body, _, _ = complete_response(
+                (generate_body(), 200, {}), "GET", "/data/ticket"
+            )
+            end_request(token)
+            logger_mock.info.assert_not_called()
+
+            assert list(body) == [b"[]"]
+            assert metrics.calls == {AUTH: 1}
+            logger_mock.info.assert_called_once()
+            assert logger_mock.info.call_args.kwargs["additional_fields"]["rpc"] == {
+                AUTH: {"calls": 1, "duration_ms": mock.ANY}
+            }
+
+    def test_complete_response_without_request(self) -> None:
+        """Tests that responses outside of a request are not changed."""
+        response = ("body", 200, {})
+
+        assert complete_response(response, "GET", "/data/ticket") is response
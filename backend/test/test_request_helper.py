@@ -0,0 +1,20 @@
+"""
+    Testing the request helper methods.
+"""
+import json
+from request_helper import stream_json_array
+
+
+class TestRequestHelper:
+    """Contains tests for the request helper methods."""
+
+    def test_stream_json_array(self) -> None:
+        """Tests that the streamed parts form a valid JSON array."""
+        parts = list(stream_json_array(iter([{"id": "first"}, {"id": "second"}])))
+
+        assert len(parts) == 3
+        assert json.loads(b"".join(parts)) == [{"id": "first"}, {"id": "second"}]
+
+    def test_stream_json_array_empty(self) -> None:
+        """Tests that an empty iterator is streamed as empty JSON array."""
+        assert b"".join(stream_json_array([])) == b"[]"
@@ -0,0 +1,145 @@
+"""
+    Testing the keyword search based on the token index.
+"""
+from unittest import mock
+import pytest
+from backend.test.fakes import FakeFirestoreClient
+from auth_utils import UserInfo
+from data_model import Ticket
+from db_operator import DatabaseOperator
+from enums import Role
+from search_index import (
+    MAX_QUERY_TERMS,
+    SEARCH_TERMS_FIELD,
+    backfill_search_index,
+    get_search_terms,
+    parse_search_query,
+    stem,
+)
+
+
+class TestSearchIndex:
+    """Contains tests for the search index."""
+
+    @pytest.fixture(name="firestore_client")
+    def fixture_firestore_client(self):
+        """Creates a fake Firestore with an existing ticket collection."""
+        firestore_client = FakeFirestoreClient()
+        firestore_client.add_documents(
+            "ticket",
+            {
+                "old_ticket": {
+                    "title": "Wrong formula",
+                    "description": "The formula on page 12 is missing a factor.",
+                    "created_by": "requester_id",
+                }
+            },
+        )
+        with firestore_client.patch(), mock.patch(
+            "firebase_admin.auth.get_users"
+        ) as users_mock:
+            users_mock.return_value.users = []
+            yield firestore_client
+
+    @staticmethod
+    def create_ticket(title: str, description: str) -> dict:
+        """Creates a ticket with the given texts."""
+        return {
+            "title": title,
+            "description": description,
+            "course_id": "course_id",
+            "status": "OPEN",
+            "priority": "HIGH",
+            "assignee_id": "",
+            "type": "ERROR",
+        }
+
+    def test_get_search_terms(self) -> None:
+        """Tests that the terms are normalized, stemmed and unique."""
+        assert get_search_terms("Missing FORMULAS in the Übungen!", None, "formula") == [
+            "miss",
+            "formula",
+            "ubung",
+        ]
+        assert not get_search_terms("", "a the und")
+
+    def test_stem(self) -> None:
+        """Tests that short words are not reduced below the minimum stem length."""
+        assert stem("tickets") == "ticket"
+        assert stem("uses") == "use"
+        assert stem("bus") == "bus"
+
+    def test_parse_search_query(self) -> None:
+        """Tests the validation of the search query."""
+        assert parse_search_query({}, Ticket) == (None, None)
+        assert parse_search_query({"q": "Formula"}, Ticket) == (["formula"], None)
+        terms = " ".join(f"term{index}" for index in range(MAX_QUERY_TERMS + 1))
+        assert parse_search_query({"q": terms}, Ticket)[1] == (
+            f"Parameter q must contain at most {MAX_QUERY_TERMS} terms!"
+        )
+
+    def test_create_and_search(self, firestore_client) -> None:
+        """Tests that created tickets are found and ranked by their matching terms."""
+        database_operator = DatabaseOperator(UserInfo("editor_id", [Role.EDITOR]))
+        _, partial_id = database_operator.create(
+            "ticket",
+            self.create_ticket("Missing factor", "Typo in chapter 2."),
+            search_fields=Ticket.search_fields,
+        )
+        _, full_id = database_operator.create(
+            "ticket",
+            self.create_ticket("Formula is missing a factor", "Chapter 3."),
+            search_fields=Ticket.search_fields,
+        )
+        database_operator.create(
+            "ticket",
+            self.create_ticket("Broken link", "The video does not load."),
+            search_fields=Ticket.search_fields,
+        )
+
+        documents_read = firestore_client.documents_read
+        response_code, elements = database_operator.search(
+            "ticket", Ticket, get_search_terms("missing formula factors")
+        )
+
+        assert response_code == 200
+        assert [element["id"] for element in elements] == [full_id, partial_id]
+        assert SEARCH_TERMS_FIELD not in elements[0]
+        assert firestore_client.documents_read - documents_read == 2
+
+    def test_update_and_search(self, firestore_client) -> None:
+        """Tests that the terms of an updated ticket are replaced."""
+        database_operator = DatabaseOperator(UserInfo("editor_id", [Role.EDITOR]))
+        _, ticket_id = database_operator.create(
+            "ticket",
+            self.create_ticket("Broken link", "The video does not load."),
+            search_fields=Ticket.search_fields,
+        )
+        response_code, _ = database_operator.update(
+            "ticket",
+            self.create_ticket("Broken video", "The video does not load."),
+            ticket_id,
+            search_fields=Ticket.search_fields,
+        )
+
+        assert response_code == 200
+        assert database_operator.search("ticket", Ticket, ["link"]) == (200, [])
+        _, elements = database_operator.search(
+            "ticket", Ticket, get_search_terms("broken"), limit=1, field_names=["title"]
+        )
+        assert elements == [
+            {"id": ticket_id, "title": "Broken video", "created_by": "editor_id"}
+        ]
+        assert firestore_client.rpc_counts["commit"] == 2
+
+    def test_backfill_search_index(self, firestore_client) -> None:
+        """Tests that only entries with missing or outdated terms are updated."""
+        search_fields = Ticket.search_fields
+
+        assert backfill_search_index(firestore_client, "ticket", search_fields) == 1
+        assert backfill_search_index(firestore_client, "ticket", search_fields) == 0
+        assert firestore_client.rpc_counts["commit"] == 1
+        _, elements = DatabaseOperator(
+            UserInfo("editor_id", [Role.EDITOR])
+        ).search("ticket", Ticket, ["formula"])
+        assert [element["id"] for element in elements] == ["old_ticket"]
@@ -0,0 +1,59 @@
+"""
+    Testing the serialization utility methods.
+"""
+from datetime import datetime, timezone
+import json
+import pytest
+from google.api_core.datetime_helpers import DatetimeWithNanoseconds
+from serialization import dumps_orjson, dumps_stdlib, to_dict
+from data_model import Course, TicketHistory
+
+
+class TestSerialization:
+    """Contains tests for the serialization utilities."""
+
+    @pytest.mark.parametrize("dumps", [dumps_stdlib, dumps_orjson])
+    def test_dumps(self, dumps) -> None:
+        """Tests that both backends encode dicts, dataclasses and datetimes equally."""
+        value = {
+            "course": Course("SE", "Software Engineering"),
+            "created_at": datetime(2023, 11, 1, 12, 30, 15, 250, timezone.utc),
+            "modified_at": DatetimeWithNanoseconds(2023, 11, 2, tzinfo=timezone.utc),
+            "name": "Übung",
+        }
+
+        encoded = dumps(value)
+
+        assert isinstance(encoded, bytes)
+        assert json.loads(encoded) == {
+            "course": {"course_abbreviation": "SE", "name": "Software Engineering"},
+            "created_at": "2023-11-01T12:30:15.000250+00:00",
+            "modified_at": "2023-11-02T00:00:00+00:00",
+            "name": "Übung",
+        }
+
+    def test_dumps_backends_equal(self) -> None:
+        """Tests that both backends create the same compact JSON."""
+        value = [{"id": "dummy_id", "values": [1, 2.5, None, True]}]
+
+        assert dumps_stdlib(value) == dumps_orjson(value)
+
+    def test_dumps_unsupported_type(self) -> None:
+        """Tests that unsupported types are rejected."""
+        with pytest.raises(TypeError):
+            dumps_stdlib({"value": object()})
+
+    def test_to_dict(self) -> None:
+        """Tests that dataclasses are converted without copying their values."""
+        changed_values = {"status": "DONE"}
+        history = TicketHistory("ticket_id", changed_values, {})
+
+        history_dict = to_dict(history)
+
+        assert history_dict == {
+            "ticket_id": "ticket_id",
+            "changed_values": {"status": "DONE"},
+            "previous_values": {},
+        }
+        assert history_dict["changed_values"] is changed_values
+        assert to_dict(changed_values) is changed_values
@@ -0,0 +1,86 @@
+"""
+    Testing the lazy initialization of firebase and the handlers.
+"""
+from unittest import mock
+from startup import Startup
+
+
+class TestStartup:
+    """Contains tests for the startup."""
+
+    def test_initialize_firebase(self) -> None:
+        """Tests that the default app is only initialized once, if missing."""
+        startup = Startup()
+        with mock.patch(
+            "firebase_admin.get_app", side_effect=ValueError("No app")
+        ), mock.patch("firebase_admin.initialize_app") as initialize_mock:
+            startup.initialize_firebase()
+            startup.initialize_firebase()
+
+            initialize_mock.assert_called_once()
+
+    def test_initialize_firebase_existing_app(self) -> None:
+        """Tests that an existing default app is reused."""
+        with mock.patch("firebase_admin.get_app"), mock.patch(
+            "firebase_admin.initialize_app"
+        ) as initialize_mock:
+            Startup().initialize_firebase()
+
+            initialize_mock.assert_not_called()
+
+    def test_get_handlers(self) -> None:
+        """Tests that the handlers are loaded once after initializing firebase."""
+        startup = Startup()
+        with mock.patch.object(startup, "initialize_firebase") as initialize_mock:
+            handlers = startup.get_handlers()
+
+            assert startup.get_handlers() is handlers
+            assert handlers.data_handler.__name__ == "data_handler"
+            assert handlers.api_handler.__name__ == "api_handler"
+            initialize_mock.assert_called_once()
+
+    def test_warm_up(self) -> None:
+        """Tests that the warm-up runs once and prefetches the certificates."""
+        startup = Startup()
+        with mock.patch.object(
+            startup, "initialize_firebase"
+        ) as initialize_mock, mock.patch(
+            "db_client.db_client_holder"
+        ) as holder_mock, mock.patch(
+            "auth_utils.prefetch_certificates"
+        ) as prefetch_mock:
+            thread = startup.warm_up()
+            thread.join(timeout=5)
+
+            assert startup.warm_up() is None
+            initialize_mock.assert_called_once()
+            holder_mock.get.assert_called_once()
+            prefetch_mock.assert_called_once()
+
+    def test_warm_up_without_prefetch(self) -> None:
+        """Tests that prefetching the certificates can be disabled."""
+        startup = Startup()
+        with mock.patch.object(startup, "initialize_firebase"), mock.patch(
+            "db_client.db_client_holder"
+        ), mock.patch("startup.PREFETCH_CERTIFICATES", False), mock.patch(
+            "auth_utils.prefetch_certificates"
+        ) as prefetch_mock:
+            startup.warm_up().join(timeout=5)
+
+            prefetch_mock.assert_not_called()
+
+    def test_warm_up_imports_handlers(self) -> None:
+        """Tests that the warm-up imports the handlers before creating the client."""
+        startup = Startup()
+        calls = mock.Mock()
+        with mock.patch.object(
+            startup, "get_handlers", calls.get_handlers
+        ), mock.patch("db_client.db_client_holder", calls.holder), mock.patch(
+            "startup.PREFETCH_CERTIFICATES", False
+        ):
+            startup.warm_up().join(timeout=5)
+
+            assert [call[0] for call in calls.mock_calls] == [
+                "get_handlers",
+                "holder.get",
+            ]
@@ -0,0 +1,153 @@
+"""
+    Testing the ticket statistics counted by aggregation queries.
+"""
+from unittest import mock
+import pytest
+from backend.test.fakes import FakeAuth, FakeFirestoreClient, FakeUserRecord
+from auth_utils import UserInfo
+from db_operator import DatabaseOperator
+from enums import Role
+from ticket_stats import (
+    TICKET_STATUSES,
+    StatsRequest,
+    count_tickets,
+    get_group_values,
+    parse_stats_request,
+)
+
+
+class TestTicketStats:
+    """Contains tests for the ticket statistics."""
+
+    @pytest.fixture(name="firestore_client")
+    def fixture_firestore_client(self):
+        """Creates a fake Firestore with tickets of two requesters."""
+        firestore_client = FakeFirestoreClient()
+        firestore_client.add_documents(
+            "course", {"course_1": {"name": "Data"}, "course_2": {"name": "Web"}}
+        )
+        firestore_client.add_documents(
+            "ticket",
+            {
+                "ticket_1": {
+                    "status": "OPEN",
+                    "course_id": "course_1",
+                    "created_by": "requester_1",
+                },
+                "ticket_2": {
+                    "status": "OPEN",
+                    "course_id": "course_2",
+                    "created_by": "requester_2",
+                },
+                "ticket_3": {
+                    "status": "DONE",
+                    "course_id": "course_1",
+                    "created_by": "requester_1",
+                    "assignee_id": "editor_id",
+                },
+            },
+        )
+        with firestore_client.patch():
+            yield firestore_client
+
+    def test_parse_stats_request(self) -> None:
+        """Tests that the other dimensions are used as filters."""
+        stats_request, error_message = parse_stats_request(
+            {"group_by": "course_id", "status": "OPEN", "course_id": "ignored"}
+        )
+
+        assert error_message is None
+        assert stats_request == StatsRequest("course_id", {"status": "OPEN"})
+        assert parse_stats_request({})[0] == StatsRequest("status", {})
+
+    def test_parse_stats_request_invalid(self) -> None:
+        """Tests that only known dimensions can be grouped."""
+        stats_request, error_message = parse_stats_request({"group_by": "title"})
+
+        assert stats_request is None
+        assert error_message.startswith("Parameter group_by is invalid!")
+
+    def test_get_group_values_assignees(self) -> None:
+        """Tests that only editors and admins are counted as assignees."""
+        fake_auth = FakeAuth()
+        fake_auth.add_user(FakeUserRecord("editor_id", custom_claims={"editor": True}))
+        fake_auth.add_user(FakeUserRecord("admin_id", custom_claims={"admin": True}))
+        fake_auth.add_user(
+            FakeUserRecord("requester_id", custom_claims={"requester": True})
+        )
+        with fake_auth.patch():
+            assert get_group_values("assignee_id") == (["editor_id", "admin_id"], None)
+
+    def test_get_group_values_all_user_pages(self) -> None:
+        """Tests that the assignees of all pages of the user list are counted."""
+        fake_auth = FakeAuth()
+        for index in range(5):
+            fake_auth.add_user(
+                FakeUserRecord(f"editor_{index}", custom_claims={"editor": True})
+            )
+        list_users = fake_auth.list_users
+        with fake_auth.patch(), mock.patch(
+            "firebase_admin.auth.list_users",
+            lambda: list_users(max_results=2),
+        ):
+            values, _ = get_group_values("assignee_id")
+
+        assert values == [f"editor_{index}" for index in range(5)]
+
+    def test_count_tickets(self, firestore_client) -> None:
+        """Tests that every value is counted without reading the tickets."""
+        response_code, stats = count_tickets(
+            DatabaseOperator(UserInfo("editor_id", [Role.EDITOR])),
+            StatsRequest("status", {}),
+        )
+
+        assert response_code == 200
+        assert stats["counts"] == {
+            **{status: 0 for status in TICKET_STATUSES},
+            "OPEN": 2,
+            "DONE": 1,
+        }
+        assert firestore_client.rpc_counts["run_aggregation_query"] == len(
+            TICKET_STATUSES
+        )
+        assert firestore_client.documents_read == 0
+
+    def test_count_tickets_of_requester(self, firestore_client) -> None:
+        """Tests that requesters only count their created tickets."""
+        response_code, stats = count_tickets(
+            DatabaseOperator(UserInfo("requester_1", [Role.REQUESTER])),
+            StatsRequest("course_id", {"status": "OPEN"}),
+        )
+
+        assert response_code == 200
+        assert stats == {
+            "group_by": "course_id",
+            "filters": {"status": "OPEN"},
+            "counts": {"course_1": 1, "course_2": 0},
+        }
+        assert firestore_client.rpc_counts["run_query"] == 1
+
+    def test_count_tickets_failing(self, firestore_client) -> None:
+        """Tests that an error of any count fails the statistics."""
+        with mock.patch(
+            "db_operator.DatabaseOperator.count",
+            return_value=(500, "Timed out while trying to count entries in ticket"),
+        ):
+            response_code, message = count_tickets(
+                DatabaseOperator(UserInfo("editor_id", [Role.EDITOR])),
+                StatsRequest("priority", {}),
+            )
+
+        assert response_code == 500
+        assert message.startswith("Timed out")
+        assert firestore_client.documents_read == 0
+
+    def test_count_tickets_failing_without_courses(self) -> None:
+        """Tests that the courses need to be loaded to group by them."""
+        with mock.patch("course_cache.CourseCache.get_ids", return_value=None):
+            response_code, message = count_tickets(
+                mock.Mock(), StatsRequest("course_id", {})
+            )
+
+        assert response_code == 500
+        assert message == "Could not load the courses!"
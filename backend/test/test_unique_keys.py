@@ -0,0 +1,88 @@
+"""
+    Testing the unique key utility methods.
+"""
+from unittest import mock
+from backend.test.fakes import FakeFirestoreClient
+from unique_keys import (
+    UNIQUE_KEY_COLLECTION,
+    backfill_unique_keys,
+    get_duplication_key,
+    get_unique_fields,
+    get_unique_key,
+)
+from data_model import Course, Ticket
+
+
+class TestUniqueKeys:
+    """Contains tests for the unique key utilities."""
+
+    def test_get_unique_fields(self) -> None:
+        """Tests that only entities declaring unique fields use unique keys."""
+        assert get_unique_fields(Course) == ["course_abbreviation"]
+        assert get_unique_fields(Ticket) is None
+
+    def test_get_unique_key_deterministic(self) -> None:
+        """Tests that the same unique values result in the same key."""
+        course = {"course_abbreviation": "SE", "name": "Software"}
+        unique_key = get_unique_key("course", ["course_abbreviation"], course)
+
+        assert unique_key == get_unique_key(
+            "course", ["course_abbreviation"], {"course_abbreviation": "SE"}
+        )
+        assert len(unique_key) == 64
+
+    def test_get_unique_key_different(self) -> None:
+        """Tests that other unique values or collections result in other keys."""
+        unique_key = get_unique_key(
+            "course", ["course_abbreviation"], {"course_abbreviation": "SE"}
+        )
+
+        assert unique_key != get_unique_key(
+            "course", ["course_abbreviation"], {"course_abbreviation": "DB"}
+        )
+        assert unique_key != get_unique_key(
+            "other", ["course_abbreviation"], {"course_abbreviation": "SE"}
+        )
+
+    def test_get_duplication_key(self) -> None:
+        """Tests that only the duplication fields are compared."""
+        duplication_key = get_duplication_key(
+            ["content", "ticket_id"], {"content": "A", "ticket_id": "t", "id": "1"}
+        )
+
+        assert duplication_key == get_duplication_key(
+            ["content", "ticket_id"], {"ticket_id": "t", "content": "A"}
+        )
+        assert duplication_key != get_duplication_key(
+            ["content", "ticket_id"], {"content": "t", "ticket_id": "A"}
+        )
+
+    def test_backfill_unique_keys(self) -> None:
+        """Tests that only the missing keys are reserved by the first entry."""
+        firestore_client = FakeFirestoreClient()
+        courses = {
+            "keyed": {"course_abbreviation": "SE", "name": "Software"},
+            "old": {"course_abbreviation": "DB", "name": "Databases"},
+            "other": {"course_abbreviation": "DB", "name": "Other"},
+        }
+        firestore_client.add_documents("course", courses)
+        firestore_client.add_documents(
+            UNIQUE_KEY_COLLECTION,
+            {
+                get_unique_key("course", ["course_abbreviation"], courses["keyed"]): {
+                    "collection": "course",
+                    "document_id": "keyed",
+                }
+            },
+        )
+
+        unique_fields = ["course_abbreviation"]
+        with mock.patch("unique_keys.logger") as logger_mock:
+            assert backfill_unique_keys(firestore_client, "course", unique_fields) == 1
+            logger_mock.warn.assert_called_once()
+        assert backfill_unique_keys(firestore_client, "course", unique_fields) == 0
+        key = get_unique_key("course", ["course_abbreviation"], courses["old"])
+        assert firestore_client.collections[UNIQUE_KEY_COLLECTION][key].data == {
+            "collection": "course",
+            "document_id": "old",
+        }
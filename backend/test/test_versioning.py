@@ -0,0 +1,63 @@
+"""
+    Testing the versioning utility methods.
+"""
+from unittest import mock
+from versioning import (
+    create_etag,
+    etag_matches,
+    get_cache_headers,
+    get_random_version_shard,
+    get_version_keys,
+    get_version_shards,
+    parse_version_shards,
+)
+from data_model import Course, Ticket
+
+
+class TestVersioning:
+    """Contains tests for the versioning utilities."""
+
+    def test_get_version_keys(self) -> None:
+        """Tests that the versions of referenced collections and users are checked."""
+        assert get_version_keys("course", Course) == ["course", "user"]
+        assert get_version_keys("ticket", Ticket) == ["ticket", "course", "user"]
+
+    def test_get_version_shards(self) -> None:
+        """Tests that the first shard is the counter from before the sharding."""
+        with mock.patch.dict("versioning.VERSION_SHARDS", {"course": 3}):
+            assert get_version_shards("course") == ["course", "course-1", "course-2"]
+            assert get_random_version_shard("course") in get_version_shards("course")
+            assert get_version_shards("user") == ["user"]
+            assert get_random_version_shard("user") == "user"
+
+    def test_parse_version_shards(self) -> None:
+        """Tests that only collections with a valid number of shards are configured."""
+        assert parse_version_shards(" ticket=10,course=0, invalid,user=x") == {
+            "ticket": 10,
+            "course": 1,
+        }
+        assert not parse_version_shards(None)
+
+    def test_create_etag(self) -> None:
+        """Tests that the entity tag is quoted and only changes with its inputs."""
+        etag = create_etag("/data/course", {"course": 1, "user": 0})
+
+        assert etag.startswith('"') and etag.endswith('"')
+        assert etag == create_etag("/data/course", {"user": 0, "course": 1})
+        assert etag != create_etag("/data/course", {"course": 2, "user": 0})
+
+    def test_etag_matches(self) -> None:
+        """Tests the comparison with the If-None-Match header."""
+        assert etag_matches('"abc"', '"abc"') is True
+        assert etag_matches('"other", W/"abc"', '"abc"') is True
+        assert etag_matches("*", '"abc"') is True
+        assert etag_matches('"other"', '"abc"') is False
+        assert etag_matches(None, '"abc"') is False
+
+    def test_get_cache_headers(self) -> None:
+        """Tests that responses are only revalidated if they have an entity tag."""
+        assert get_cache_headers('"etag"') == {
+            "ETag": '"etag"',
+            "Cache-Control": "private, no-cache",
+        }
+        assert not get_cache_headers(None)
@@ -0,0 +1,132 @@
+"""Utility methods for the ticket statistics, counted by aggregation queries."""
+from dataclasses import dataclass
+from firebase_admin import auth, exceptions
+from google.cloud.firestore_v1.base_query import FieldFilter
+from course_cache import course_cache
+from db_operator import DatabaseOperator
+from enrichment import enrichment_executor
+from enums import Role
+from logger_utils import Logger
+from request_context import AUTH, track_rpc
+
+logger = Logger(component="ticket_stats")
+
+TICKET_STATUSES = ["OPEN", "IN PROGRESS", "FEEDBACK", "IN REVIEW", "DONE", "REJECTED"]
+TICKET_PRIORITIES = ["HIGH", "MEDIUM", "LOW", "UNDEFINED"]
+TICKET_TYPES = ["ERROR", "IMPROVEMENT", "ADDITION", "UNDEFINED"]
+STATS_DIMENSIONS = ["status", "priority", "type", "course_id", "assignee_id"]
+FIXED_GROUP_VALUES = {
+    "status": TICKET_STATUSES,
+    "priority": TICKET_PRIORITIES,
+    "type": TICKET_TYPES,
+}
+
+
+@dataclass
+class StatsRequest:
+    """Class to describe the requested ticket statistics."""
+
+    group_by: str
+    filters: dict[str, str]
+
+
+def parse_stats_request(args: dict) -> tuple[StatsRequest | None, str | None]:
+    """Parses the query parameters of a statistics request.
+    The tickets are grouped by one dimension, the others can restrict them,
+    e.g. `?group_by=course_id&status=OPEN` counts the open tickets per course.
+    Args:
+        args -- The query parameters of the request.
+    Returns:
+        (The requested statistics., The error message if invalid.)
+    """
+    group_by = args.get("group_by", "status")
+    if group_by not in STATS_DIMENSIONS:
+        return None, (
+            "Parameter group_by is invalid! Allowed fields are: "
+            + ", ".join(STATS_DIMENSIONS)
+        )
+    filters = {
+        dimension: args[dimension]
+        for dimension in STATS_DIMENSIONS
+        if dimension != group_by and args.get(dimension)
+    }
+    return StatsRequest(group_by, filters), None
+
+
+def get_group_values(group_by: str) -> tuple[list[str] | None, str | None]:
+    """Gets the values of a dimension, each of them is counted separately.
+    Only editors and admins can be assigned, so only they are counted as assignees.
+    Args:
+        group_by -- The dimension to group the tickets by.
+    Returns:
+        (The values of the dimension., The error message if they cannot be loaded.)
+    """
+    if group_by in FIXED_GROUP_VALUES:
+        return FIXED_GROUP_VALUES[group_by], None
+    if group_by == "course_id":
+        course_ids = course_cache.get_ids()
+        if course_ids is None:
+            return None, "Could not load the courses!"
+        return course_ids, None
+    try:
+        # The users are listed in pages of at most 1000, all of them are loaded.
+        with track_rpc(AUTH):
+            users = list(auth.list_users().iterate_all())
+    except exceptions.FirebaseError as error:
+        logger.error(f"Error while retrieving the assignees: {error}")
+        return None, "Could not load the assignees!"
+    return [
+        user.uid
+        for user in users
+        if user.custom_claims
+        and any(
+            user.custom_claims.get(role.value) is True
+            for role in [Role.ADMIN, Role.EDITOR]
+        )
+    ], None
+
+
+def count_tickets(
+    database_operator: DatabaseOperator, stats_request: StatsRequest
+) -> tuple[int, dict | str]:
+    """Counts the tickets per value of the requested dimension.
+    The values are counted concurrently, each with one aggregation query.
+    Args:
+        database_operator -- The operator of the requester.
+        stats_request -- The requested statistics.
+    Returns:
+        (The response code., The counts per value or on error the reason.)
+    """
+    values, error_message = get_group_values(stats_request.group_by)
+    if error_message:
+        return 500, error_message
+
+    filters = [
+        FieldFilter(dimension, "==", value)
+        for dimension, value in stats_request.filters.items()
+    ]
+    user_info = database_operator.user_info
+    if not any(role in user_info.roles for role in [Role.EDITOR, Role.ADMIN]):
+        # Requesters are only allowed to view their created tickets.
+        filters.append(FieldFilter("created_by", "==", user_info.user_id))
+
+    results = enrichment_executor.map(
+        lambda value: database_operator.count(
+            "ticket", [*filters, FieldFilter(stats_request.group_by, "==", value)]
+        ),
+        values,
+        default=(500, "Timed out while trying to count the tickets!"),
+    )
+    counts = {}
+    for value, (response_code, count_or_error) in zip(values, results):
+        if response_code != 200:
+            return response_code, count_or_error
+        counts[value] = count_or_error
+    logger.info(
+        "Counted tickets grouped by '%s'.", args=(stats_request.group_by,), sampled=True
+    )
+    return 200, {
+        "group_by": stats_request.group_by,
+        "filters": stats_request.filters,
+        "counts": counts,
+    }
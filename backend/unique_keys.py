@@ -0,0 +1,130 @@
+"""Utility methods for the unique keys, which replace the duplication queries.
+
+Entries created before their entity declared unique fields have no unique key.
+Run `python -m unique_keys` in the backend folder to reserve their keys.
+"""
+from hashlib import sha256
+from itertools import islice
+import json
+from google.cloud.firestore_v1.client import Client
+from logger_utils import Logger
+
+logger = Logger(component="unique_keys")
+
+UNIQUE_KEY_COLLECTION = "unique_key"
+# Firestore allows at most 500 writes in a batch.
+BACKFILL_BATCH_SIZE = 500
+
+
+def get_unique_fields(class_type: type) -> list[str] | None:
+    """Gets the fields, which identify an entity.
+    Args:
+        class_type -- The dataclass type of the entity.
+    Returns:
+        The declared unique fields or None if duplicates are detected by query.
+    """
+    return getattr(class_type, "unique_fields", None) or None
+
+
+def get_unique_key(collection: str, unique_fields: list[str], element: dict) -> str:
+    """Derives the id of the companion document reserving the unique fields.
+    Args:
+        collection -- The name of the entity.
+        unique_fields -- The fields, which identify an entity.
+        element -- The entity data containing the unique fields.
+    Returns:
+        The hash of the collection and the values of the unique fields.
+    """
+    key = json.dumps(
+        [collection, [element.get(field_name) for field_name in unique_fields]],
+        sort_keys=True,
+    )
+    return sha256(key.encode("utf-8")).hexdigest()
+
+
+def get_duplication_key(duplication_fields: list[str], element: dict) -> str:
+    """Derives the key, which is equal for duplicates detected by query.
+    Args:
+        duplication_fields -- The fields, which are equal for duplicates.
+        element -- The entity data containing the fields.
+    Returns:
+        The serialized values of the fields.
+    """
+    return json.dumps(
+        [element.get(field_name) for field_name in duplication_fields],
+        sort_keys=True,
+        default=str,
+    )
+
+
+def backfill_unique_keys(
+    db_client: Client, collection: str, unique_fields: list[str]
+) -> int:
+    """Reserves the unique keys of all entries, whose keys are missing.
+    If stored entries are already duplicates, only the first one gets the key.
+    Args:
+        db_client -- The Firestore client.
+        collection -- The name of the entity.
+        unique_fields -- The fields, which identify an entity.
+    Returns:
+        The number of reserved keys.
+    """
+    keys_ref = db_client.collection(UNIQUE_KEY_COLLECTION)
+    documents = db_client.collection(collection).select(unique_fields).stream()
+    reserved = 0
+    while chunk := list(islice(documents, BACKFILL_BATCH_SIZE)):
+        keys = {}
+        for document in chunk:
+            keys.setdefault(
+                get_unique_key(collection, unique_fields, document.to_dict()),
+                document.id,
+            )
+        owners = {
+            snapshot.id: snapshot.to_dict().get("document_id")
+            for snapshot in db_client.get_all(
+                [keys_ref.document(key) for key in keys]
+            )
+            if snapshot.exists
+        }
+        batch, pending_keys = db_client.batch(), 0
+        for key, document_id in keys.items():
+            if key in owners:
+                continue
+            batch.create(
+                keys_ref.document(key),
+                {"collection": collection, "document_id": document_id},
+            )
+            pending_keys += 1
+        for document in chunk:
+            key = get_unique_key(collection, unique_fields, document.to_dict())
+            owner = owners.get(key, keys[key])
+            if owner != document.id:
+                logger.warn(
+                    "Entry '%s' in '%s' is a duplicate of '%s'.",
+                    args=(document.id, collection, owner),
+                )
+        if pending_keys:
+            batch.commit()
+            reserved += pending_keys
+    return reserved
+
+
+def main() -> None:
+    """Reserves the missing unique keys of all entities with unique fields."""
+    # pylint: disable=import-outside-toplevel
+    from data_model import ENTITY_MAPPINGS
+    from db_client import db_client_holder
+    from startup import startup
+
+    startup.initialize_firebase()
+    db_client = db_client_holder.get()
+    for collection, class_type in ENTITY_MAPPINGS.items():
+        unique_fields = get_unique_fields(class_type)
+        if not unique_fields:
+            continue
+        reserved = backfill_unique_keys(db_client, collection, unique_fields)
+        print(f"Reserved {reserved} keys of the collection '{collection}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""Utility methods for conditional requests, based on versions of the collections."""
+from hashlib import sha256
+import json
+from os import getenv
+from random import randrange
+from typing import TYPE_CHECKING
+from flask import Request
+from data_model import ENTITY_MAPPINGS
+
+if TYPE_CHECKING:
+    # The operator loads the versions, but it imports this module itself.
+    from db_operator import DatabaseOperator
+
+VERSION_COLLECTION = "collection_version"
+# Display names and roles of the users are resolved in every entity.
+USER_VERSION = "user"
+
+
+def parse_version_shards(value: str | None) -> dict[str, int]:
+    """Parses the configured number of version shards of the collections.
+    Args:
+        value -- Comma separated list of collection=shards pairs (ex: ticket=10).
+    Returns:
+        A mapping of the collection names to their number of shards.
+    """
+    shards = {}
+    for pair in (value or "").split(","):
+        collection, _, count = pair.partition("=")
+        if collection.strip() and count.strip().isdigit():
+            shards[collection.strip()] = max(1, int(count))
+    return shards
+
+
+# Firestore sustains about one write per second to a single document, so the
+# increments of hot collections are spread over shards, which are summed up on read.
+VERSION_SHARDS = parse_version_shards(getenv("VERSION_SHARDS"))
+
+
+def get_version_keys(collection: str, class_type: type) -> list[str]:
+    """Gets the versions, a response of the given entity depends on.
+    Args:
+        collection -- The name of the entity.
+        class_type -- The dataclass type of the entity.
+    Returns:
+        The names of the collections, whose versions need to be checked.
+    """
+    return list(
+        dict.fromkeys(
+            [collection, *getattr(class_type, "ref_collections", []), USER_VERSION]
+        )
+    )
+
+
+def get_version_shards(collection: str) -> list[str]:
+    """Gets the ids of the counter documents, whose sum is the version of a collection.
+    The first shard is named like the collection, as before the counters were sharded.
+    Args:
+        collection -- The name of the collection.
+    Returns:
+        The ids of all shards in the version collection.
+    """
+    return [
+        collection,
+        *(
+            f"{collection}-{shard}"
+            for shard in range(1, VERSION_SHARDS.get(collection, 1))
+        ),
+    ]
+
+
+def get_random_version_shard(collection: str) -> str:
+    """Gets the counter document, which is incremented by a single write.
+    Args:
+        collection -- The name of the changed collection.
+    Returns:
+        The id of a random shard in the version collection.
+    """
+    shards = get_version_shards(collection)
+    return shards[randrange(len(shards))]
+
+
+def create_etag(*parts: object) -> str:
+    """Creates a strong entity tag for the given response inputs.
+    Args:
+        parts -- JSON serializable values, which identify the response.
+    Returns:
+        The quoted entity tag.
+    """
+    key = json.dumps(parts, sort_keys=True, default=str)
+    return f'"{sha256(key.encode("utf-8")).hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Checks if the If-None-Match header of a request contains the entity tag.
+    Args:
+        if_none_match -- The header value, a comma separated list of entity tags.
+        etag -- The entity tag of the current response.
+    Returns:
+        If the client already has the current response.
+    """
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def get_etag(
+    request: Request, entity_type: str, database_operator: "DatabaseOperator"
+) -> str | None:
+    """Creates the entity tag of a GET request.
+    It changes with every write to the collections the response depends on.
+    Args:
+        request -- The GET request.
+        entity_type -- The requested entity.
+        database_operator -- The operator of the requester, responses depend on the roles.
+    Returns:
+        The entity tag or None if the versions cannot be loaded.
+    """
+    user_info = database_operator.user_info
+    versions = database_operator.get_versions(
+        get_version_keys(entity_type, ENTITY_MAPPINGS[entity_type])
+    )
+    if versions is None:
+        return None
+    return create_etag(
+        request.path,
+        sorted(request.args.items(multi=True)),
+        user_info.user_id,
+        [role.value for role in user_info.roles],
+        versions,
+    )
+
+
+def get_cache_headers(etag: str | None) -> dict:
+    """Gets the headers, which let clients revalidate a response by its entity tag.
+    Args:
+        etag -- The entity tag of the response.
+    Returns:
+        The caching headers, empty if there is no entity tag.
+    """
+    if not etag:
+        return {}
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}